@@ -1,13 +1,33 @@
 import streamlit as st
-import pdfplumber
-import pandas as pd
-import re
-from io import BytesIO
-
-st.set_page_config(page_title="Door Hardware Schedule Extractor", layout="wide")
+from extraction_jobs import cancel_session_job, current_job, load_schedule
+from instrumentation import diagnostics_frame, finish_run, recent_runs, stage, start_run, startup_report
+from vendor_detect import DETECTOR_VERSION, MIN_CONFIDENCE, VENDOR_NAMES, VENDOR_APPS, detect_vendor
+from line_classifier import DOORS_LINES, DOORS_DOOR_CELL, DOORS_PAGE_KEYWORD
+
+# pandas, pdfplumber and the modules built on them are imported where they
+# are used, so the landing page renders without loading them
+
+# Bump whenever the extractor output changes so cached results are not reused
+PARSER_VERSION = "doors-2.4"
+
+# Table finder settings for the schedule grid. Cells are ruled with lines
+# at least a text row apart, so shorter strokes (ticks, hyphens drawn as
+# lines) are not cell borders; everything else is pdfplumber's default.
+DOORS_TABLE_SETTINGS = {
+    'vertical_strategy': 'lines',
+    'horizontal_strategy': 'lines',
+    'snap_tolerance': 3,
+    'join_tolerance': 3,
+    'intersection_tolerance': 3,
+    'edge_min_length': 6,
+}
 
 def extract_door_hardware_data(pdf_path):
     """Extract door hardware data from PDF"""
+    import pdfplumber
+    import pandas as pd
+    from page_triage import SKIP, classify_page
+
     doors_data = []
 
     with pdfplumber.open(pdf_path) as pdf:
@@ -16,32 +36,36 @@ def extract_door_hardware_data(pdf_path):
         current_dr_type = None
 
         for page in pdf.pages:
+            # Pages without the title need no layout
+            if classify_page(page, DOORS_PAGE_KEYWORD) == SKIP:
+                continue
+
             text = page.extract_text()
 
-            if not text or "Doors with hardware" not in text:
+            if not text or DOORS_PAGE_KEYWORD not in text:
                 continue
 
             lines = text.split('\n')
 
             for i, line in enumerate(lines):
-                # Check if this is a door header (e.g., "D0.01 Accessible WC Timber")
-                door_match = re.match(r'^(D\d+\.\d+)\s+(.+?)\s+(Timber|Alum|INAL)\s*$', line.strip())
+                # One combined regex call classifies the line as a door header
+                # or product line
+                kind, line_match = DOORS_LINES.classify(line.strip())
 
-                if door_match:
-                    current_door = door_match.group(1)
-                    current_description = door_match.group(2)
-                    current_dr_type = door_match.group(3)
+                # Check if this is a door header (e.g., "D0.01 Accessible WC Timber")
+                if kind == 'door':
+                    current_door = line_match.group('door_id')
+                    current_description = line_match.group('door_desc')
+                    current_dr_type = line_match.group('door_type')
                     continue
 
                 # Check if this is a product line with code, quantity, description, and finish
                 # Pattern: CODE NUMBER Description FINISH
-                product_match = re.match(r'^([A-Z0-9/-]+)\s+(\d+)\s+(.+?)\s+(SSS|SCP|SIL|PF)\s*$', line.strip())
-
-                if product_match and current_door:
-                    code = product_match.group(1)
-                    quantity = product_match.group(2)
-                    product_desc = product_match.group(3)
-                    finish = product_match.group(4)
+                if kind == 'product' and current_door:
+                    code = line_match.group('code')
+                    quantity = line_match.group('quantity')
+                    product_desc = line_match.group('product_desc')
+                    finish = line_match.group('finish')
 
                     doors_data.append({
                         'Door': current_door,
@@ -56,23 +80,55 @@ def extract_door_hardware_data(pdf_path):
     return pd.DataFrame(doors_data)
 
 
-def extract_door_hardware_data_v2(pdf_path):
-    """Enhanced extraction using table detection"""
-    all_data = []
-
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            # Only process pages with "Doors with hardware"
-            text = page.extract_text()
-            if not text or "Doors with hardware" not in text:
+def iter_door_hardware_pages(pdf):
+    """Parse a "Doors with hardware" PDF page by page using table detection
+
+    Each page's characters are laid out once (see char_lines.py): the same
+    lines answer the title check and fill the table cells.
+
+    Args:
+        pdf: Path to the PDF file, or its contents as a bytes-like object
+            (e.g. the upload's getbuffer(), read without a copy)
+
+    Yields:
+        PageRecords for every page, in page order
+    """
+    from char_lines import page_lines, table_rows
+    from page_triage import SCHEDULE, SKIP, classify_page
+    from pdf_source import open_pdf
+    from records import DoorRecord, ProductRecord, PageRecords
+
+    with stage('pdf_open'):
+        doc = open_pdf(pdf)
+        page_count = len(doc.pages)
+
+    with doc:
+        for page_num, page in enumerate(doc.pages):
+            doors = []
+            products = []
+
+            # Only process pages with "Doors with hardware". The raw content
+            # streams usually tell, otherwise the laid out lines do
+            with stage('triage') as timing:
+                verdict = classify_page(page, DOORS_PAGE_KEYWORD)
+                timing.pages += 1
+            if verdict != SKIP:
+                with stage('extract_text') as timing:
+                    lines = page_lines(page)
+                    timing.pages += 1
+            if verdict == SKIP or (verdict != SCHEDULE and
+                                   not any(DOORS_PAGE_KEYWORD in line.text for line in lines)):
+                page.close()
+                yield PageRecords(page_num, page_count, doors, products)
                 continue
 
-            # Extract tables from the page
-            tables = page.extract_tables()
+            # Extract tables from the page, their cells filled from the lines
+            with stage('extract_tables') as timing:
+                tables = [table_rows(table, lines) for table in page.find_tables(DOORS_TABLE_SETTINGS)]
+                page.close()
+                timing.pages += 1
 
             current_door = None
-            current_description = None
-            current_dr_type = None
 
             for table in tables:
                 for row in table:
@@ -80,13 +136,16 @@ def extract_door_hardware_data_v2(pdf_path):
                         continue
 
                     # Check if this row contains door information (D0.XX pattern)
-                    if row[0] and re.match(r'D\d+\.\d+', str(row[0])):
-                        current_door = row[0]
-                        current_description = row[1] if len(row) > 1 else ""
-                        current_dr_type = row[2] if len(row) > 2 else ""
+                    if row[0] and DOORS_DOOR_CELL.match(str(row[0])):
+                        current_door = DoorRecord(
+                            door=row[0],
+                            description=row[1] if len(row) > 1 else "",
+                            door_type=row[2] if len(row) > 2 else ""
+                        )
+                        doors.append(current_door)
 
                     # Check if this row contains product information
-                    elif current_door and row[0] and not re.match(r'D\d+\.\d+', str(row[0])):
+                    elif current_door and row[0]:
                         code = row[0] if row[0] else ""
 
                         # Try to find quantity (usually a number)
@@ -103,20 +162,38 @@ def extract_door_hardware_data_v2(pdf_path):
 
                         # Only add if we have meaningful data
                         if code and code.strip() and code != 'Code':
-                            all_data.append({
-                                'Door': current_door,
-                                'Description': current_description,
-                                'Dr type': current_dr_type,
-                                'Code': code,
-                                'Quantity Product': quantity,
-                                'Description Product': product_desc,
-                                'Finish': finish
-                            })
+                            products.append(ProductRecord(
+                                door=current_door,
+                                code=code,
+                                product_description=product_desc,
+                                quantity=quantity,
+                                finish=finish
+                            ))
+
+            yield PageRecords(page_num, page_count, doors, products)
+
+
+def extract_door_hardware_data_v2(pdf, progress=None):
+    """Enhanced extraction using table detection
 
-    return pd.DataFrame(all_data)
+    Builds the DataFrame from the iter_door_hardware_pages() record stream.
+
+    Args:
+        pdf: Path to the PDF file, or its contents as a bytes-like object
+            (e.g. the upload's getbuffer(), read without a copy)
+        progress: Optional callback progress(pages_done, page_count)
+    """
+    from records import DOORS_COLUMNS, records_to_dataframe
+
+    return records_to_dataframe(iter_door_hardware_pages(pdf), DOORS_COLUMNS, progress=progress)
 
 
 def main():
+    # Timed from the first line, for the landing page's startup budget
+    landing = start_run('startup', app='doors')
+
+    st.set_page_config(page_title="Door Hardware Schedule Extractor", layout="wide")
+
     st.title("🚪 Door Hardware Schedule Extractor")
     st.markdown("Extract door hardware data from PDF schedules")
 
@@ -124,33 +201,54 @@ def main():
     uploaded_file = st.file_uploader("Upload PDF", type=['pdf'])
 
     if uploaded_file:
-        # Save uploaded file temporarily
-        with open("temp_upload.pdf", "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-        with st.spinner("Extracting data from PDF..."):
-            df = extract_door_hardware_data_v2("temp_upload.pdf")
+        # The upload's own buffer, parsed in place: no copy, no temp file
+        pdf_buffer = uploaded_file.getbuffer()
+        run = start_run('doors', file=uploaded_file.name)
+
+        # Loaded by the first upload in the process, not by the landing page
+        with stage('import'):
+            from extract_cache import cached_extract, dataset_key
+            from exports import csv_bytes, get_export
+            from filter_engine import ALL, get_filter_index
+            from job_catalog import CATALOG_PATH, ingest_job
+            from job_dataset import ARROW_MIME, dataset_filename
+            from summary_engine import get_summary
+            from xlsx_writer import workbook_bytes
+
+        # Check the format on the first pages before committing to a full parse
+        detection = cached_extract(pdf_buffer, DETECTOR_VERSION, lambda: detect_vendor(pdf_buffer))
+        if detection.vendor != 'doors' and detection.confidence >= MIN_CONFIDENCE:
+            st.error(f"⚠️ This schedule looks like {VENDOR_NAMES[detection.vendor]} format "
+                     f"({detection.confidence:.0%} confidence), not \"Doors with hardware\".")
+            st.info(f"Please upload it to the {VENDOR_APPS[detection.vendor]} instead.")
+            st.stop()
+
+        # Reruns with the same schedule are served from the cache; a new one
+        # is parsed by a background job while the app stays responsive
+        with stage('load_schedule'):
+            df = load_schedule(st.session_state, pdf_buffer, PARSER_VERSION, extract_door_hardware_data_v2,
+                               file=uploaded_file.name)
 
         if not df.empty:
             st.success(f"✅ Extracted {len(df)} product entries from {df['Door'].nunique()} doors")
 
-            # Sidebar filters
+            # Sidebar filters, answered from inverted indexes built once per dataset
+            filters = get_filter_index(df, ['Door', 'Dr type'])
             st.sidebar.header("Filters")
 
             # Door filter
-            doors = ['All'] + sorted(df['Door'].unique().tolist())
+            doors = [ALL] + filters.options('Door')
             selected_door = st.sidebar.selectbox("Select Door", doors)
 
             # Door type filter
-            door_types = ['All'] + sorted(df['Dr type'].dropna().unique().tolist())
+            door_types = [ALL] + filters.options('Dr type')
             selected_type = st.sidebar.selectbox("Select Door Type", door_types)
 
             # Filter data
-            filtered_df = df.copy()
-            if selected_door != 'All':
-                filtered_df = filtered_df[filtered_df['Door'] == selected_door]
-            if selected_type != 'All':
-                filtered_df = filtered_df[filtered_df['Dr type'] == selected_type]
+            filtered_df = filters.filter({'Door': selected_door, 'Dr type': selected_type})
+
+            # Rollups shared by the Summary and Export tabs, computed once per dataset
+            summary = get_summary(df)
 
             # Display tabs
             tab1, tab2, tab3 = st.tabs(["📊 Data Table", "📈 Summary", "📥 Export"])
@@ -163,63 +261,72 @@ def main():
 
                 with col1:
                     st.subheader("Doors by Type")
-                    door_type_summary = df.groupby('Dr type')['Door'].nunique().reset_index()
-                    door_type_summary.columns = ['Door Type', 'Count']
+                    door_type_summary = summary.doors_by_type.rename(columns={'Door Count': 'Count'})
                     st.dataframe(door_type_summary, use_container_width=True)
 
                     st.subheader("Products by Door")
-                    products_by_door = df.groupby('Door').size().reset_index()
-                    products_by_door.columns = ['Door', 'Product Count']
-                    st.dataframe(products_by_door, use_container_width=True, height=400)
+                    st.dataframe(summary.products_per_door, use_container_width=True, height=400)
 
                 with col2:
                     st.subheader("Product Quantity Summary")
-                    product_summary = df.groupby(['Code', 'Description Product', 'Finish']).agg({
-                        'Quantity Product': lambda x: x.astype(str).astype(int).sum() if x.notna().any() else 0
-                    }).reset_index()
-                    product_summary.columns = ['Code', 'Description', 'Finish', 'Total Quantity']
-                    st.dataframe(product_summary.sort_values('Total Quantity', ascending=False),
+                    st.dataframe(summary.products_by_finish.sort_values('Total Quantity', ascending=False),
                                use_container_width=True, height=400)
 
             with tab3:
                 st.subheader("Export Options")
 
-                col1, col2 = st.columns(2)
+                col1, col2, col3 = st.columns(3)
 
                 with col1:
-                    # Export to CSV
-                    csv = filtered_df.to_csv(index=False)
+                    # Export to CSV, built only when the download is clicked
                     st.download_button(
                         label="📥 Download as CSV",
-                        data=csv,
+                        data=lambda: csv_bytes(filtered_df),
                         file_name="door_hardware_schedule.csv",
                         mime="text/csv"
                     )
 
                 with col2:
-                    # Export to Excel
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        filtered_df.to_excel(writer, sheet_name='Door Hardware', index=False)
-
-                        # Add summary sheet
-                        product_summary = df.groupby(['Code', 'Description Product', 'Finish']).agg({
-                            'Quantity Product': lambda x: x.astype(str).astype(int).sum() if x.notna().any() else 0
-                        }).reset_index()
-                        product_summary.to_excel(writer, sheet_name='Product Summary', index=False)
-
-                    excel_data = output.getvalue()
+                    # Export to Excel, built only when the download is clicked
                     st.download_button(
                         label="📥 Download as Excel",
-                        data=excel_data,
+                        data=lambda: workbook_bytes({
+                            'Door Hardware': filtered_df,
+                            'Product Summary': summary.products_by_finish,
+                        }),
                         file_name="door_hardware_schedule.xlsx",
                         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                     )
+
+                with col3:
+                    # The whole extracted job, unfiltered, for reopening without the PDF
+                    st.download_button(
+                        label="📥 Arrow Dataset",
+                        data=lambda: get_export(df, 'dataset'),
+                        file_name=dataset_filename(None),
+                        mime=ARROW_MIME,
+                        help="All extracted rows with their column types; open with job_dataset.load_dataset"
+                    )
+
+                # Keep the job for cross-job lookups (see app_catalog.py)
+                if st.button("🗂️ Save to Job Catalog",
+                             help="Adds the job's doors and products to the job catalog, replacing an earlier save of the same job"):
+                    ingest_job(df, vendor='doors', source=uploaded_file.name)
+                    st.success(f"✅ Saved to the job catalog ({CATALOG_PATH})")
         else:
             st.warning("⚠️ No data extracted. Please check the PDF format.")
             st.info("The PDF should contain a 'Doors with hardware' section with door and product information.")
 
+        # Stage timings of this rerun, plus any export downloads built for the dataset
+        finish_run(run)
+        with st.expander("🩺 Diagnostics"):
+            job = current_job(st.session_state)
+            runs = [run] + ([job.run] if job is not None and job.run is not None else [])
+            runs += recent_runs('export', dataset=dataset_key(df)) if not df.empty else []
+            st.dataframe(diagnostics_frame(runs), use_container_width=True, hide_index=True)
     else:
+        # The upload was removed, so its extraction is no longer wanted
+        cancel_session_job(st.session_state)
         st.info("👆 Please upload a PDF file to get started")
 
         # Show example format
@@ -239,6 +346,9 @@ def main():
             - Finish (e.g., SSS, SCP, SIL, PF)
             """)
 
+        finish_run(landing)
+        st.caption(f"⏱️ {startup_report(landing)}")
+
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,22 @@
 import streamlit as st
-import pdfplumber
-import pandas as pd
 import re
-from io import BytesIO
 from hd_theme import apply_hd_theme, add_logo
+from line_classifier import ARA_LINES, ARA_HEADER_LINES, ARA_BLOCK_AREA, ARA_LEVEL_AREA, ARA_PAGE_MARKERS
+from extraction_jobs import cancel_session_job, current_job, load_schedule
+from instrumentation import diagnostics_frame, finish_run, recent_runs, stage, start_run, startup_report
+from vendor_detect import DETECTOR_VERSION, MIN_CONFIDENCE, VENDOR_NAMES, VENDOR_APPS, detect_vendor
 
-st.set_page_config(page_title="ARA Hardware Schedule Extractor", layout="wide")
+# pandas, pdfplumber and the modules built on them are imported where they
+# are used, so the landing page renders without loading them
 
-# Apply Hardware Direct theme
-apply_hd_theme()
-add_logo()
+# Bump whenever the extractor output changes so cached results are not reused
+PARSER_VERSION = "ara-2.3"
 
 def extract_ara_hardware_data(pdf_path):
     """Extract door hardware data from ARA format PDF"""
+    import pdfplumber
+    import pandas as pd
+
     all_data = []
 
     with pdfplumber.open(pdf_path) as pdf:
@@ -128,150 +132,182 @@ def extract_ara_hardware_data(pdf_path):
     return pd.DataFrame(all_data)
 
 
-def extract_ara_hardware_data_v2(pdf_path):
-    """Enhanced extraction using table detection for ARA format"""
-    all_data = []
+def iter_ara_pages(pdf, workers=None, engine='text'):
+    """Parse an ARA format PDF page by page
+
+    Page text is extracted in parallel (see page_text.iter_page_texts),
+    then parsed in page order so door state carries across pages exactly
+    as it does in a serial pass. With the 'chars' engine, product lines
+    under a table header are split by its columns (see char_lines.py).
+
+    Yields:
+        PageRecords for every page, in page order
+    """
+    from char_lines import ColumnLayout, page_line_texts
+    from page_text import iter_page_texts
+    from records import DoorRecord, ProductRecord, JobInfo, PageRecords
+
     job_number = None
     job_name = None
 
-    with pdfplumber.open(pdf_path) as pdf:
-        current_door = None
-        current_area = None
-        current_description = None
-        current_rating = None
-        current_handing = None
-        current_door_type = None
-        current_notes = None
+    current_door = None
+    current_notes = None
+    columns = None
+
+    for page_num, page_count, content in iter_page_texts(pdf, workers=workers, markers=ARA_PAGE_MARKERS,
+                                                         engine=engine):
+        doors = []
+        products = []
+
+        # Extract text lines for parsing
+        lines, char_lines = page_line_texts(content)
+
+        # Extract job number and name from first page header
+        if page_num == 0 and not job_number:
+            for i, line in enumerate(lines[:10]):  # Check first 10 lines
+                # Look for job number pattern at start of line (e.g., "T009014.2: Name" or "T009014.2 - Name")
+                # This pattern looks for alphanumeric code at start, followed by colon or dash, then the name
+                job_line_match = re.match(r'^([A-Z0-9\.]+)\s*[:\-]\s*(.+)', line.strip())
+                if job_line_match and not job_number:
+                    potential_job = job_line_match.group(1)
+                    potential_name = job_line_match.group(2).strip()
+                    # Only accept if it looks like a job number (contains letters/numbers/dots)
+                    if re.match(r'^[A-Z0-9\.]+$', potential_job):
+                        job_number = potential_job
+                        job_name = potential_name
+                        continue
 
-        for page_num, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            if not text:
+                # Fallback: Look for traditional job number patterns
+                if not job_number:
+                    job_match = re.search(r'(?:Job\s+No|Job\s+Number|Project|Job)[\s:]+([A-Z0-9\.\-]+)', line, re.IGNORECASE)
+                    if job_match:
+                        job_number = job_match.group(1)
+
+                # Look for project/job name (often on same or next line)
+                if not job_name:
+                    name_match = re.search(r'(?:Project\s+Name|Job\s+Name|Name)[\s:]+(.+)', line, re.IGNORECASE)
+                    if name_match:
+                        job_name = name_match.group(1).strip()
+
+        for index, line in enumerate(lines):
+            line = line.strip()
+
+            # A product table header's column positions split the lines below it
+            if char_lines is not None and line.startswith('Code '):
+                columns = ColumnLayout.from_header(char_lines[index])
+
+            # Skip empty lines and headers
+            if not line or line in ARA_HEADER_LINES:
                 continue
 
-            # Extract text lines for parsing
-            lines = text.split('\n')
+            # One combined regex call classifies the line as a Block section
+            # header, notes, door header or product line
+            kind, line_match = ARA_LINES.classify(line)
 
-            # Extract job number and name from first page header
-            if page_num == 0 and not job_number:
-                for i, line in enumerate(lines[:10]):  # Check first 10 lines
-                    # Look for job number pattern at start of line (e.g., "T009014.2: Name" or "T009014.2 - Name")
-                    # This pattern looks for alphanumeric code at start, followed by colon or dash, then the name
-                    job_line_match = re.match(r'^([A-Z0-9\.]+)\s*[:\-]\s*(.+)', line.strip())
-                    if job_line_match and not job_number:
-                        potential_job = job_line_match.group(1)
-                        potential_name = job_line_match.group(2).strip()
-                        # Only accept if it looks like a job number (contains letters/numbers/dots)
-                        if re.match(r'^[A-Z0-9\.]+$', potential_job):
-                            job_number = potential_job
-                            job_name = potential_name
-                            continue
-
-                    # Fallback: Look for traditional job number patterns
-                    if not job_number:
-                        job_match = re.search(r'(?:Job\s+No|Job\s+Number|Project|Job)[\s:]+([A-Z0-9\.\-]+)', line, re.IGNORECASE)
-                        if job_match:
-                            job_number = job_match.group(1)
-
-                    # Look for project/job name (often on same or next line)
-                    if not job_name:
-                        name_match = re.search(r'(?:Project\s+Name|Job\s+Name|Name)[\s:]+(.+)', line, re.IGNORECASE)
-                        if name_match:
-                            job_name = name_match.group(1).strip()
-
-            for line in lines:
-                line = line.strip()
+            # Block section headers (e.g., "Block C - 2B-T08-S") carry no data
+            if kind == 'block':
+                continue
 
-                # Skip empty lines and headers
-                if not line or line in ['Code Description Product', 'Door Area Description Rating Handing Door Type']:
-                    continue
+            # Check for notes
+            if kind == 'notes':
+                current_notes = line.replace('Notes:', '').strip()
+                continue
 
-                # Check for Block section headers (e.g., "Block C - 2B-T08-S", "Block E - 3B-ALT-N")
-                if re.match(r'^Block [A-Z] - [\w-]+$', line):
-                    continue
+            # Check if this is a door header
+            # Door IDs: 8.C.ED-02, 14.E.ID-01, 16.B.ID-03, 001.D001A, D005A, etc.
+            if kind == 'door':
+                rest = line_match.group('door_rest')
+
+                # Parse the rest: Area Description [Handing] Door_Type
+                # Look for door types at the end
+                door_types = ['Timber', 'Alum-Ext', 'Cavity Slider', 'Aluminium', 'INAL']
+                door_type = ""
+                handing = ""
+
+                for dt in door_types:
+                    if rest.endswith(dt):
+                        door_type = dt
+                        rest = rest[:-(len(dt))].strip()
+                        break
+                    elif rest.endswith(f'Sliding {dt}'):
+                        handing = "Sliding"
+                        door_type = dt
+                        rest = rest[:-(len(f'Sliding {dt}'))].strip()
+                        break
+
+                # Parse area and description
+                # Area format: "Block C - XXX" or "Block E - XXX" or "001" or "Level 00"
+                area_match = ARA_BLOCK_AREA.match(rest)
+                if area_match:
+                    area = area_match.group(1)
+                    description = area_match.group(2)
+                else:
+                    # Try to match simple numeric area or "Level XX"
+                    level_match = ARA_LEVEL_AREA.match(rest)
+                    if level_match:
+                        area = level_match.group(1)
+                        description = level_match.group(2)
+                    else:
+                        area = rest
+                        description = ""
+
+                current_door = DoorRecord(
+                    door=line_match.group('door_id'),
+                    area=area,
+                    description=description,
+                    rating="",
+                    handing=handing,
+                    door_type=door_type
+                )
+                doors.append(current_door)
+                current_notes = ""
+                continue
 
-                # Check for notes
-                if line.startswith('Notes:'):
-                    current_notes = line.replace('Notes:', '').strip()
-                    continue
+            # Check if this is a product line
+            if kind == 'product' and current_door:
+                fields = columns.split(char_lines[index]) if columns else None
+                if fields is None:
+                    fields = line_match.groupdict()
+                products.append(ProductRecord(
+                    door=current_door,
+                    code=fields['code'],
+                    product_description=fields['product_desc'],
+                    quantity=fields['quantity'],
+                    notes=current_notes
+                ))
 
-                # Check if this is a door header
-                # More flexible pattern to capture various formats
-                # Pattern matches: 8.C.ED-02, 14.E.ID-01, 16.B.ID-03, 001.D001A, D005A, etc.
-                door_pattern = r'^((?:\d+\.[A-Z]\.[EI]D-\d+|\d+\.D\d+[A-Z]?|D\d+[A-Z]{1,2}))\s+'
-                if re.match(door_pattern, line):
-                    # Extract door ID - use flexible pattern
-                    door_id_match = re.match(r'^((?:\d+\.[A-Z]\.[EI]D-\d+|\d+\.D\d+[A-Z]?|D\d+[A-Z]{1,2}))\s+(.+)$', line)
-                    if door_id_match:
-                        current_door = door_id_match.group(1)
-                        rest = door_id_match.group(2)
-
-                        # Parse the rest: Area Description [Handing] Door_Type
-                        # Look for door types at the end
-                        door_types = ['Timber', 'Alum-Ext', 'Cavity Slider', 'Aluminium', 'INAL']
-                        current_door_type = ""
-                        current_handing = ""
-
-                        for dt in door_types:
-                            if rest.endswith(dt):
-                                current_door_type = dt
-                                rest = rest[:-(len(dt))].strip()
-                                break
-                            elif rest.endswith(f'Sliding {dt}'):
-                                current_handing = "Sliding"
-                                current_door_type = dt
-                                rest = rest[:-(len(f'Sliding {dt}'))].strip()
-                                break
-
-                        # Parse area and description
-                        # Area format: "Block C - XXX" or "Block E - XXX" or "001" or "Level 00"
-                        area_match = re.match(r'(Block [A-Z] - [\w-]+)\s+(.+)$', rest)
-                        if area_match:
-                            current_area = area_match.group(1)
-                            current_description = area_match.group(2)
-                        else:
-                            # Try to match simple numeric area or "Level XX"
-                            level_match = re.match(r'((?:Level\s+\d+|\d+))\s+(.+)$', rest)
-                            if level_match:
-                                current_area = level_match.group(1)
-                                current_description = level_match.group(2)
-                            else:
-                                current_area = rest
-                                current_description = ""
-
-                        current_rating = ""
-                        current_notes = ""
-                        continue
+        job = JobInfo(job_number, job_name) if page_num == 0 else None
+        yield PageRecords(page_num, page_count, doors, products, job)
 
-                # Check if this is a product line
-                product_match = re.match(r'^([A-Z0-9\-/\.]+)\s+(.+?)\s+(\d+)$', line)
 
-                if product_match and current_door:
-                    code = product_match.group(1)
-                    product_desc = product_match.group(2)
-                    quantity = product_match.group(3)
+def extract_ara_hardware_data_v2(pdf, workers=None, progress=None, engine='text'):
+    """Enhanced extraction using table detection for ARA format
 
-                    all_data.append({
-                        'Door': current_door,
-                        'Area': current_area,
-                        'Description': current_description,
-                        'Rating': current_rating,
-                        'Handing': current_handing,
-                        'Door Type': current_door_type,
-                        'Notes': current_notes,
-                        'Code': code,
-                        'Product Description': product_desc,
-                        'Quantity': quantity
-                    })
+    Builds the DataFrame from the iter_ara_pages() record stream.
+
+    Args:
+        pdf: Path to the PDF file, or its contents as a bytes-like object
+            (e.g. the upload's getbuffer(), read without a copy)
+        workers: Worker processes for page text extraction (None = per core)
+        progress: Optional callback progress(pages_done, page_count)
+        engine: Page extraction engine, 'text' or 'chars' (see page_text.py)
+    """
+    from records import ARA_COLUMNS, records_to_dataframe
 
-    df = pd.DataFrame(all_data)
-    # Add job info as metadata
-    if not df.empty:
-        df.attrs['job_number'] = job_number
-        df.attrs['job_name'] = job_name
-    return df
+    return records_to_dataframe(iter_ara_pages(pdf, workers=workers, engine=engine), ARA_COLUMNS,
+                                progress=progress)
 
 
 def main():
+    # Timed from the first line, for the landing page's startup budget
+    landing = start_run('startup', app='ara')
+
+    st.set_page_config(page_title="ARA Hardware Schedule Extractor", layout="wide")
+
+    # Apply Hardware Direct theme
+    apply_hd_theme()
+    add_logo()
+
     st.title("🚪 ARA Hardware Schedule Extractor")
     st.markdown("Extract door hardware data from ARA format PDF schedules")
 
@@ -279,12 +315,33 @@ def main():
     uploaded_file = st.file_uploader("Upload ARA Hardware Schedule PDF", type=['pdf'])
 
     if uploaded_file:
-        # Save uploaded file temporarily
-        with open("temp_upload.pdf", "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-        with st.spinner("Extracting data from PDF..."):
-            df = extract_ara_hardware_data_v2("temp_upload.pdf")
+        # The upload's own buffer, parsed in place: no copy, no temp file
+        pdf_buffer = uploaded_file.getbuffer()
+        run = start_run('ara', file=uploaded_file.name)
+
+        # Loaded by the first upload in the process, not by the landing page
+        with stage('import'):
+            from extract_cache import cached_extract, dataset_key
+            from exports import XLSX_MIME, csv_bytes, export_filenames, get_export
+            from filter_engine import ALL, get_filter_index
+            from job_catalog import CATALOG_PATH, ingest_job
+            from job_dataset import ARROW_MIME, dataset_filename
+            from search_index import get_search_index
+            from summary_engine import get_summary
+
+        # Check the format on the first pages before committing to a full parse
+        detection = cached_extract(pdf_buffer, DETECTOR_VERSION, lambda: detect_vendor(pdf_buffer))
+        if detection.vendor != 'ara' and detection.confidence >= MIN_CONFIDENCE:
+            st.error(f"⚠️ This schedule looks like {VENDOR_NAMES[detection.vendor]} format "
+                     f"({detection.confidence:.0%} confidence), not ARA.")
+            st.info(f"Please upload it to the {VENDOR_APPS[detection.vendor]} instead.")
+            st.stop()
+
+        # Reruns with the same schedule are served from the cache; a new one
+        # is parsed by a background job while the app stays responsive
+        with stage('load_schedule'):
+            df = load_schedule(st.session_state, pdf_buffer, PARSER_VERSION, extract_ara_hardware_data_v2,
+                               file=uploaded_file.name)
 
         if not df.empty:
             # Get job info for file naming
@@ -304,35 +361,37 @@ def main():
                 base_filename = "ara_hardware_schedule"
                 st.success(f"✅ Extracted {len(df)} product entries from {df['Door'].nunique()} doors")
 
-            # Sidebar filters
+            # Sidebar filters, answered from inverted indexes built once per dataset
+            filters = get_filter_index(df, ['Area', 'Door', 'Door Type', 'Description'])
             st.sidebar.header("Filters")
 
             # Area filter
-            areas = ['All'] + sorted(df['Area'].dropna().unique().tolist())
+            areas = [ALL] + filters.options('Area')
             selected_area = st.sidebar.selectbox("Select Area", areas)
 
             # Door filter
-            doors = ['All'] + sorted(df['Door'].unique().tolist())
+            doors = [ALL] + filters.options('Door')
             selected_door = st.sidebar.selectbox("Select Door", doors)
 
             # Door type filter
-            door_types = ['All'] + sorted(df['Door Type'].dropna().unique().tolist())
+            door_types = [ALL] + filters.options('Door Type')
             selected_type = st.sidebar.selectbox("Select Door Type", door_types)
 
             # Description filter
-            descriptions = ['All'] + sorted(df['Description'].dropna().unique().tolist())
+            descriptions = [ALL] + filters.options('Description')
             selected_description = st.sidebar.selectbox("Select Room Type", descriptions)
 
             # Filter data
-            filtered_df = df.copy()
-            if selected_area != 'All':
-                filtered_df = filtered_df[filtered_df['Area'] == selected_area]
-            if selected_door != 'All':
-                filtered_df = filtered_df[filtered_df['Door'] == selected_door]
-            if selected_type != 'All':
-                filtered_df = filtered_df[filtered_df['Door Type'] == selected_type]
-            if selected_description != 'All':
-                filtered_df = filtered_df[filtered_df['Description'] == selected_description]
+            filtered_df = filters.filter({
+                'Area': selected_area,
+                'Door': selected_door,
+                'Door Type': selected_type,
+                'Description': selected_description,
+            })
+
+            # Rollups shared by the Summary, Items by Door Type and Export tabs,
+            # computed once per dataset
+            summary = get_summary(df)
 
             # Display tabs
             tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Data Table", "📈 Summary", "🔍 Product Search", "🏷️ Items by Door Type", "📥 Export"])
@@ -345,33 +404,21 @@ def main():
 
                 with col1:
                     st.subheader("Doors by Area")
-                    area_summary = df.groupby('Area')['Door'].nunique().reset_index()
-                    area_summary.columns = ['Area', 'Door Count']
-                    st.dataframe(area_summary, use_container_width=True)
+                    st.dataframe(summary.doors_by_area, use_container_width=True)
 
                     st.subheader("Doors by Type")
-                    door_type_summary = df.groupby('Door Type')['Door'].nunique().reset_index()
-                    door_type_summary.columns = ['Door Type', 'Door Count']
-                    st.dataframe(door_type_summary, use_container_width=True)
+                    st.dataframe(summary.doors_by_type, use_container_width=True)
 
                     st.subheader("Doors by Room Type")
-                    room_summary = df.groupby('Description')['Door'].nunique().reset_index()
-                    room_summary.columns = ['Room Type', 'Door Count']
-                    st.dataframe(room_summary.sort_values('Door Count', ascending=False), use_container_width=True)
+                    st.dataframe(summary.doors_by_room.sort_values('Door Count', ascending=False), use_container_width=True)
 
                 with col2:
                     st.subheader("Product Quantity Summary")
-                    product_summary = df.groupby(['Code', 'Product Description']).agg({
-                        'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum()
-                    }).reset_index()
-                    product_summary.columns = ['Code', 'Description', 'Total Quantity']
-                    product_summary = product_summary.sort_values('Total Quantity', ascending=False)
-                    st.dataframe(product_summary, use_container_width=True, height=400)
+                    st.dataframe(summary.products.sort_values('Total Quantity', ascending=False),
+                               use_container_width=True, height=400)
 
                     st.subheader("Products per Door")
-                    products_by_door = df.groupby('Door').size().reset_index()
-                    products_by_door.columns = ['Door', 'Product Count']
-                    st.dataframe(products_by_door.sort_values('Product Count', ascending=False),
+                    st.dataframe(summary.products_per_door.sort_values('Product Count', ascending=False),
                                use_container_width=True, height=300)
 
             with tab3:
@@ -380,10 +427,8 @@ def main():
                 search_term = st.text_input("Search by product code or description")
 
                 if search_term:
-                    search_results = df[
-                        df['Code'].str.contains(search_term, case=False, na=False) |
-                        df['Product Description'].str.contains(search_term, case=False, na=False)
-                    ]
+                    # Ranked, typo-tolerant lookup; the term is never treated as a regex
+                    search_results = get_search_index(df).search(search_term)
 
                     if not search_results.empty:
                         st.success(f"Found {len(search_results)} matching products")
@@ -392,7 +437,7 @@ def main():
                         col1, col2 = st.columns(2)
                         with col1:
                             st.metric("Total Doors", search_results['Door'].nunique())
-                            st.metric("Total Quantity", pd.to_numeric(search_results['Quantity'], errors='coerce').sum())
+                            st.metric("Total Quantity", int(search_results['Quantity'].sum()))
 
                         with col2:
                             st.metric("Unique Products", search_results['Code'].nunique())
@@ -405,16 +450,12 @@ def main():
             with tab4:
                 st.subheader("🏷️ Items Breakdown by Door Type")
 
-                # Group by Door Type and Product
-                door_type_breakdown = df.groupby(['Door Type', 'Code', 'Product Description']).agg({
-                    'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-                    'Door': 'count'  # Count how many doors use this item
-                }).reset_index()
-                door_type_breakdown.columns = ['Door Type', 'Code', 'Product Description', 'Total Quantity', 'Doors Using Item']
-                door_type_breakdown = door_type_breakdown.sort_values(['Door Type', 'Total Quantity'], ascending=[True, False])
+                # Products by Door Type, with how many doors use each item
+                door_type_breakdown = summary.door_type_products.sort_values(['Door Type', 'Total Quantity'], ascending=[True, False])
+                doors_per_type = summary.doors_by_type.set_index('Door Type')['Door Count']
 
                 # Get unique door types
-                unique_door_types = sorted(df['Door Type'].dropna().unique().tolist())
+                unique_door_types = sorted(doors_per_type.index.dropna().tolist())
 
                 if unique_door_types:
                     # Create selector for door type
@@ -431,7 +472,7 @@ def main():
                             if not door_type_data.empty:
                                 total_items = len(door_type_data)
                                 total_qty = door_type_data['Total Quantity'].sum()
-                                num_doors = df[df['Door Type'] == door_type]['Door'].nunique()
+                                num_doors = doors_per_type[door_type]
 
                                 with st.expander(f"**{door_type}** - {num_doors} doors, {total_items} unique items, {int(total_qty)} total quantity"):
                                     # Show summary metrics
@@ -455,7 +496,7 @@ def main():
                             # Show summary metrics
                             total_items = len(door_type_data)
                             total_qty = door_type_data['Total Quantity'].sum()
-                            num_doors = df[df['Door Type'] == selected_breakdown_type]['Door'].nunique()
+                            num_doors = doors_per_type[selected_breakdown_type]
 
                             col1, col2, col3 = st.columns(3)
                             with col1:
@@ -473,10 +514,9 @@ def main():
                             st.dataframe(display_df, use_container_width=True, height=500)
 
                             # Add download button for this door type
-                            csv_data = display_df.to_csv(index=False)
                             st.download_button(
                                 label=f"📥 Download {selected_breakdown_type} Breakdown CSV",
-                                data=csv_data,
+                                data=lambda: csv_bytes(display_df),
                                 file_name=f"{base_filename}_{selected_breakdown_type.replace(' ', '_').lower()}.csv",
                                 mime="text/csv"
                             )
@@ -489,77 +529,25 @@ def main():
                 # Row 1: Main exports
                 col1, col2, col3 = st.columns(3)
 
-                with col1:
-                    # Export Doors CSV
-                    # Create doors dataframe with unique door information
-                    doors_df = df.groupby('Door').agg({
-                        'Description': 'first',
-                        'Area': 'first',
-                        'Rating': 'first',
-                        'Handing': 'first',
-                        'Door Type': 'first'
-                    }).reset_index()
-
-                    # Reorder and rename columns to match example format
-                    doors_export = pd.DataFrame({
-                        'DoorNumber': doors_df['Door'],
-                        'DoorDescription': doors_df['Description'],
-                        'Area': doors_df['Area'],
-                        'Stage': '',  # Not extracted from current PDF
-                        'Stamping': '',  # Not extracted from current PDF
-                        'IsKeyed': '',  # Not extracted from current PDF
-                        'DoorHeight': '',  # Not extracted from current PDF
-                        'DoorWidth': '',  # Not extracted from current PDF
-                        'DoorThickness': '',  # Not extracted from current PDF
-                        'Rating': doors_df['Rating'],
-                        'HandingShortCode': doors_df['Handing'],
-                        'DoorType': doors_df['Door Type'],
-                        'DoorFinishShortCode': '',  # Not extracted from current PDF
-                        'FrameTypeShortCode': '',  # Not extracted from current PDF
-                        'FrameFinishShortCode': '',  # Not extracted from current PDF
-                        'LockFunctionShortCode': ''  # Not extracted from current PDF
-                    })
+                doors_filename, hardware_filename = export_filenames(job_number)
 
-                    csv_doors = doors_export.to_csv(index=False)
-                    # Use just job number for filename
-                    doors_filename = f"{job_number}_Doors.csv" if job_number else "Doors.csv"
+                # Each file is built only when its download is clicked, then
+                # cached for this dataset
+                with col1:
+                    # Export Doors CSV - one row per door in the standard format
                     st.download_button(
                         label="📥 Doors CSV",
-                        data=csv_doors,
+                        data=lambda: get_export(df, 'doors_csv'),
                         file_name=doors_filename,
                         mime="text/csv",
                         help="Door-level information only"
                     )
 
                 with col2:
-                    # Export Door Hardware CSV
-                    # Create door hardware dataframe matching example format
-                    hardware_export = pd.DataFrame({
-                        'DoorNumber': df['Door'],
-                        'DoorDescription': df['Description'],
-                        'Area': df['Area'],
-                        'Stage': '',  # Not extracted from current PDF
-                        'Stamping': '',  # Not extracted from current PDF
-                        'Rating': df['Rating'],
-                        'HandingShortCode': df['Handing'],
-                        'DoorType': df['Door Type'],
-                        'DoorFinishShortCode': '',  # Not extracted from current PDF
-                        'FrameTypeShortCode': '',  # Not extracted from current PDF
-                        'FrameFinishShortCode': '',  # Not extracted from current PDF
-                        'LockFunctionShortCode': '',  # Not extracted from current PDF
-                        'PartCode': df['Code'],
-                        'Description': df['Product Description'],
-                        'ProductQuantity': df['Quantity'],
-                        'InstallQuantity': '',  # Not extracted from current PDF
-                        'InstallNote': df['Notes']
-                    })
-
-                    csv_hardware = hardware_export.to_csv(index=False)
-                    # Use just job number for filename
-                    hardware_filename = f"{job_number}_DoorHardware.csv" if job_number else "DoorHardware.csv"
+                    # Export Door Hardware CSV - one row per product in the standard format
                     st.download_button(
                         label="📥 Door Hardware CSV",
-                        data=csv_hardware,
+                        data=lambda: get_export(df, 'hardware_csv'),
                         file_name=hardware_filename,
                         mime="text/csv",
                         help="Complete door hardware schedule with products"
@@ -567,76 +555,29 @@ def main():
 
                 with col3:
                     # Export to Excel with multiple sheets
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        # Doors sheet
-                        doors_export.to_excel(writer, sheet_name='Doors', index=False)
-
-                        # Door Hardware sheet
-                        hardware_export.to_excel(writer, sheet_name='Door Hardware', index=False)
-
-                        # Product summary
-                        product_summary = df.groupby(['Code', 'Product Description']).agg({
-                            'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum()
-                        }).reset_index()
-                        product_summary.columns = ['Code', 'Description', 'Total Quantity']
-                        product_summary.to_excel(writer, sheet_name='Product Summary', index=False)
-
-                        # Area summary
-                        area_summary = df.groupby(['Area', 'Door Type'])['Door'].nunique().reset_index()
-                        area_summary.columns = ['Area', 'Door Type', 'Door Count']
-                        area_summary.to_excel(writer, sheet_name='Area Summary', index=False)
-
-                        # Items by Door Type - create a sheet with door type headers
-                        # Filter out empty door types
-                        df_with_door_type = df[df['Door Type'].notna() & (df['Door Type'] != '')].copy()
-
-                        if not df_with_door_type.empty:
-                            door_type_breakdown = df_with_door_type.groupby(['Door Type', 'Code', 'Product Description']).agg({
-                                'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum()
-                            }).reset_index()
-                            door_type_breakdown.columns = ['Door Type', 'Code', 'Product Description', 'Total Quantity']
-
-                            # Get unique door types
-                            unique_door_types = sorted(df_with_door_type['Door Type'].unique().tolist())
-
-                            # Create combined sheet with all door types
-                            all_door_types_data = []
-                            for door_type in unique_door_types:
-                                door_type_data = door_type_breakdown[door_type_breakdown['Door Type'] == door_type]
-                                if not door_type_data.empty:
-                                    # Add header row with door type
-                                    all_door_types_data.append({
-                                        'Code': f'{door_type}',
-                                        'Product Description': '',
-                                        'Total Quantity': ''
-                                    })
-                                    # Add data rows
-                                    for _, row in door_type_data.iterrows():
-                                        all_door_types_data.append({
-                                            'Code': row['Code'],
-                                            'Product Description': row['Product Description'],
-                                            'Total Quantity': int(row['Total Quantity']) if pd.notna(row['Total Quantity']) else 0
-                                        })
-                                    # Add blank row between door types
-                                    all_door_types_data.append({
-                                        'Code': '',
-                                        'Product Description': '',
-                                        'Total Quantity': ''
-                                    })
-
-                            if all_door_types_data:
-                                combined_df = pd.DataFrame(all_door_types_data)
-                                combined_df.to_excel(writer, sheet_name='Items by Door Type', index=False)
-
-                    excel_data = output.getvalue()
                     st.download_button(
                         label="📥 Complete Excel",
-                        data=excel_data,
+                        data=lambda: get_export(df, 'excel'),
                         file_name=f"{base_filename}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        mime=XLSX_MIME
                     )
 
+                # Row 2: The whole extracted job in a columnar file, with its
+                # job details, for reopening without the PDF
+                st.download_button(
+                    label="📥 Arrow Dataset",
+                    data=lambda: get_export(df, 'dataset'),
+                    file_name=dataset_filename(job_number),
+                    mime=ARROW_MIME,
+                    help="All extracted rows with their column types and job details; open with job_dataset.load_dataset"
+                )
+
+                # Keep the job for cross-job lookups (see app_catalog.py)
+                if st.button("🗂️ Save to Job Catalog",
+                             help="Adds the job's doors and products to the job catalog, replacing an earlier save of the same job"):
+                    ingest_job(df, vendor='ara', source=uploaded_file.name)
+                    st.success(f"✅ Saved to the job catalog ({CATALOG_PATH})")
+
                 # Add info about export format
                 st.info("💡 CSV exports match the standard format with job number in filename. Empty columns will be populated when data becomes available from PDF extraction.")
 
@@ -644,7 +585,16 @@ def main():
             st.warning("⚠️ No data extracted. Please check the PDF format.")
             st.info("The PDF should be in ARA Hardware Schedule format with door and product information.")
 
+        # Stage timings of this rerun, plus any export downloads built for the dataset
+        finish_run(run)
+        with st.expander("🩺 Diagnostics"):
+            job = current_job(st.session_state)
+            runs = [run] + ([job.run] if job is not None and job.run is not None else [])
+            runs += recent_runs('export', dataset=dataset_key(df)) if not df.empty else []
+            st.dataframe(diagnostics_frame(runs), use_container_width=True, hide_index=True)
     else:
+        # The upload was removed, so its extraction is no longer wanted
+        cancel_session_job(st.session_state)
         st.info("👆 Please upload a PDF file to get started")
 
         # Show example format
@@ -678,6 +628,9 @@ LW10075LLSSS LW HINGE 100MMX75MMX2.5MM LIFT OFF - LH MOQ=30  3
 5292-MSB     85mm Skirting Doorstop Slimline - Linear Knurl  1
             """)
 
+        finish_run(landing)
+        st.caption(f"⏱️ {startup_report(landing)}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,135 @@
+import streamlit as st
+import time
+from hd_theme import apply_hd_theme, add_logo
+from instrumentation import diagnostics_frame, finish_run, start_run
+from exports import XLSX_MIME, csv_bytes
+from job_catalog import CATALOG_PATH, find_products, list_jobs, product_usage, remove_job
+from procurement_rollup import rollup_catalog, rollup_workbook_bytes
+
+# Lookup fields: filter keyword -> label
+LOOKUP_FIELDS = {
+    'code': "Product Code",
+    'door': "Door",
+    'area': "Area",
+    'door_type': "Door Type",
+}
+
+
+def main():
+    st.set_page_config(page_title="Job Catalog", layout="wide")
+
+    # Apply Hardware Direct theme
+    apply_hd_theme()
+    add_logo()
+
+    st.title("🗂️ Job Catalog")
+    st.markdown("Look up products, doors and areas across every job saved to the catalog")
+
+    run = start_run('catalog')
+
+    jobs = list_jobs()
+    if jobs.empty:
+        st.info("👆 No jobs in the catalog yet. Use **🗂️ Save to Job Catalog** on an app's Export tab, "
+                "or `python job_catalog.py` on saved datasets.")
+        finish_run(run)
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Jobs", len(jobs))
+    col2.metric("Doors", int(jobs['Doors'].sum()))
+    col3.metric("Product Lines", int(jobs['Products'].sum()))
+
+    # Sidebar lookup: every field given must match (case-insensitive)
+    st.sidebar.header("🔍 Lookup")
+    job_numbers = jobs['Job Number'].dropna().drop_duplicates().sort_values().tolist()
+    filters = {'job_number': st.sidebar.selectbox("Job", [''] + job_numbers,
+                                                  format_func=lambda number: number or "All jobs")}
+    for name, label in LOOKUP_FIELDS.items():
+        filters[name] = st.sidebar.text_input(label).strip()
+
+    # Job labels by job key, for pickers
+    labels = dict(zip(jobs['Job Key'], jobs['Job Number'].fillna(jobs['Source']).fillna(jobs['Job Key'])))
+
+    tab1, tab2, tab3 = st.tabs(["🔍 Lookup", "🧾 Procurement Rollup", "📋 Jobs"])
+
+    with tab1:
+        if not any(filters.values()):
+            st.info("Enter a product code, door, area or door type in the sidebar, e.g. a code to see every job using it")
+        else:
+            start = time.perf_counter()
+            usage = product_usage(**filters)
+            lines = find_products(**filters)
+            st.caption(f"⏱️ {(time.perf_counter() - start) * 1000:.0f} ms across {len(jobs)} jobs")
+
+            if usage.empty:
+                st.warning("No product lines match")
+            else:
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Jobs", len(usage))
+                col2.metric("Doors", int(usage['Doors'].sum()))
+                col3.metric("Total Quantity", int(usage['Total Quantity'].sum()))
+
+                st.subheader("By Job")
+                st.dataframe(usage, use_container_width=True, hide_index=True)
+
+                st.subheader("Product Lines")
+                if len(lines) < usage['Product Lines'].sum():
+                    st.caption(f"Showing the first {len(lines)} of {int(usage['Product Lines'].sum())} lines")
+                st.dataframe(lines, use_container_width=True, height=500, hide_index=True)
+
+    with tab2:
+        st.subheader("Procurement Rollup")
+        st.markdown("One consolidated order: every product's quantity in each selected job, and the total")
+
+        keys = st.multiselect("Jobs", list(labels), default=list(labels), format_func=labels.get)
+        if not keys:
+            st.info("Select the jobs to order for")
+        else:
+            start = time.perf_counter()
+            rollup = rollup_catalog(jobs[jobs['Job Key'].isin(keys)])
+            st.caption(f"⏱️ {(time.perf_counter() - start) * 1000:.0f} ms")
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Jobs", len(rollup.jobs))
+            col2.metric("Products", len(rollup.products))
+            col3.metric("Total Quantity", int(rollup.products['Total Quantity'].sum()))
+
+            st.dataframe(rollup.products, use_container_width=True, height=500, hide_index=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    label="📥 Rollup Excel",
+                    data=lambda: rollup_workbook_bytes(rollup),
+                    file_name="procurement_rollup.xlsx",
+                    mime=XLSX_MIME,
+                    help="Product Summary sheet with a quantity column per job, plus a Jobs sheet"
+                )
+            with col2:
+                st.download_button(
+                    label="📥 Rollup CSV",
+                    data=lambda: csv_bytes(rollup.products),
+                    file_name="procurement_rollup.csv",
+                    mime="text/csv"
+                )
+
+    with tab3:
+        st.subheader("Saved Jobs")
+        st.caption(f"Catalog file: {CATALOG_PATH}")
+        st.dataframe(jobs.drop(columns='Job Key'), use_container_width=True, hide_index=True)
+
+        selected = st.selectbox("Job to remove", list(labels), format_func=labels.get)
+        # Removing can't be undone, so it takes a second click to confirm
+        with st.popover("🗑️ Remove from Catalog"):
+            st.warning(f"Remove **{labels[selected]}** and all its doors and products from the catalog?")
+            if st.button("Yes, remove this job"):
+                remove_job(selected)
+                st.rerun()
+
+    finish_run(run)
+    with st.expander("🩺 Diagnostics"):
+        st.dataframe(diagnostics_frame([run]), use_container_width=True, hide_index=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import streamlit as st
+from hd_theme import apply_hd_theme, add_logo
+from extraction_jobs import cancel_session_job, current_job, job_result, start_schedule
+from instrumentation import diagnostics_frame, finish_run, stage, start_run, startup_report
+from vendor_detect import DETECTOR_VERSION, MIN_CONFIDENCE, VENDOR_NAMES, detect_vendor, schedule_extractor
+
+# pandas and the modules built on it are imported once both revisions are
+# uploaded, so the landing page renders without loading them
+
+# The two uploads, by session state slot of their extraction jobs
+REVISIONS = {'diff_old': "Previous revision", 'diff_new': "New revision"}
+
+
+def detect_format(pdf_buffer, label):
+    """Vendor format of an upload; stops the script if it isn't recognised"""
+    from extract_cache import cached_extract
+
+    detection = cached_extract(pdf_buffer, DETECTOR_VERSION, lambda: detect_vendor(pdf_buffer))
+    if detection.confidence < MIN_CONFIDENCE:
+        st.error(f"⚠️ The format of the {label.lower()} couldn't be recognised "
+                 f"({detection.confidence:.0%} confidence).")
+        st.stop()
+    return detection.vendor
+
+
+def show_changes(frame, label, key):
+    """Change table with a filter on the kind of change"""
+    from filter_engine import ALL
+
+    if frame.empty:
+        st.info(f"No {label} changed")
+        return
+    kinds = [ALL] + frame['Change'].drop_duplicates().tolist()
+    selected = st.selectbox("Show", kinds, key=key)
+    if selected != ALL:
+        frame = frame[frame['Change'] == selected]
+    st.dataframe(frame, use_container_width=True, height=600, hide_index=True)
+
+
+def main():
+    # Timed from the first line, for the landing page's startup budget
+    landing = start_run('startup', app='diff')
+
+    st.set_page_config(page_title="Schedule Revision Diff", layout="wide")
+
+    # Apply Hardware Direct theme
+    apply_hd_theme()
+    add_logo()
+
+    st.title("🔀 Schedule Revision Diff")
+    st.markdown("Compare two revisions of a hardware schedule: doors and products added or removed, and quantity changes")
+
+    uploads = {}
+    for column, (slot, label) in zip(st.columns(2), REVISIONS.items()):
+        with column:
+            uploads[slot] = st.file_uploader(f"Upload {label} PDF", type=['pdf'], key=f"{slot}_upload")
+
+    if all(uploads.values()):
+        run = start_run('diff', old=uploads['diff_old'].name, new=uploads['diff_new'].name)
+
+        with stage('import'):
+            from exports import XLSX_MIME, csv_bytes, export_filenames
+            from schedule_diff import (ADDED, REMOVED, CHANGED, HARDWARE_CHANGED, QUANTITY_CHANGED,
+                                       diff_workbook_bytes, get_diff)
+
+        # Start both extractions before waiting on either, so they run side by side
+        results = {}
+        jobs = {}
+        vendors = {}
+        for slot, uploaded_file in uploads.items():
+            pdf_buffer = uploaded_file.getbuffer()
+            vendors[slot] = detect_format(pdf_buffer, REVISIONS[slot])
+            extract, parser_version = schedule_extractor(vendors[slot])
+            with stage('load_schedule'):
+                results[slot], jobs[slot] = start_schedule(st.session_state, pdf_buffer, parser_version, extract,
+                                                           slot=slot, file=uploaded_file.name)
+        for slot, job in jobs.items():
+            if job is not None:
+                results[slot] = job_result(st.session_state, job, slot=slot,
+                                           message=f"Extracting the {REVISIONS[slot].lower()}...")
+
+        old_df, new_df = results['diff_old'], results['diff_new']
+
+        if vendors['diff_old'] != vendors['diff_new']:
+            st.warning(f"⚠️ The revisions are in different formats ({VENDOR_NAMES[vendors['diff_old']]} and "
+                       f"{VENDOR_NAMES[vendors['diff_new']]}); only the columns they share are compared.")
+
+        if not old_df.empty and not new_df.empty:
+            diff = get_diff(old_df, new_df)
+            counts = diff.summary.set_index('Change')
+
+            st.success(f"✅ Compared {len(old_df)} product entries with {len(new_df)} "
+                       f"({old_df['Door'].nunique()} and {new_df['Door'].nunique()} doors)")
+
+            col1, col2, col3, col4, col5, col6 = st.columns(6)
+            col1.metric("Doors Added", int(counts.loc[ADDED, 'Doors']))
+            col2.metric("Doors Removed", int(counts.loc[REMOVED, 'Doors']))
+            col3.metric("Doors Changed", int(counts.loc[CHANGED, 'Doors'] + counts.loc[HARDWARE_CHANGED, 'Doors']))
+            col4.metric("Products Added", int(counts.loc[ADDED, 'Product Lines']))
+            col5.metric("Products Removed", int(counts.loc[REMOVED, 'Product Lines']))
+            col6.metric("Quantity Changes", int(counts.loc[QUANTITY_CHANGED, 'Product Lines']))
+
+            if diff.doors.empty and diff.hardware.empty:
+                st.info("No differences between the two revisions")
+
+            tab1, tab2, tab3 = st.tabs(["🚪 Door Changes", "🔩 Hardware Changes", "📥 Export"])
+
+            with tab1:
+                st.subheader("Door Changes")
+                show_changes(diff.doors, "doors", "door_change_filter")
+
+            with tab2:
+                st.subheader("Hardware Changes")
+                st.caption("ProductQuantity is the quantity in the new revision; lines repeating a code on a door are summed")
+                show_changes(diff.hardware, "products", "hardware_change_filter")
+
+            with tab3:
+                st.subheader("Export Changes")
+
+                job_number = new_df.attrs.get('job_number', '')
+                doors_filename, hardware_filename = export_filenames(job_number)
+                base_filename = f"{job_number}_changes" if job_number else "schedule_changes"
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.download_button(
+                        label="📥 Door Changes CSV",
+                        data=lambda: csv_bytes(diff.doors),
+                        file_name=doors_filename.replace('.csv', '_changes.csv'),
+                        mime="text/csv"
+                    )
+                with col2:
+                    st.download_button(
+                        label="📥 Hardware Changes CSV",
+                        data=lambda: csv_bytes(diff.hardware),
+                        file_name=hardware_filename.replace('.csv', '_changes.csv'),
+                        mime="text/csv"
+                    )
+                with col3:
+                    st.download_button(
+                        label="📥 Changes Excel",
+                        data=lambda: diff_workbook_bytes(diff),
+                        file_name=f"{base_filename}.xlsx",
+                        mime=XLSX_MIME
+                    )
+
+                st.info("💡 Change sheets use the Doors and DoorHardware export layouts with a leading Change column.")
+        else:
+            st.warning("⚠️ No data extracted from one of the revisions. Please check the PDF format.")
+
+        # Stage timings of this rerun and of the two extractions
+        finish_run(run)
+        with st.expander("🩺 Diagnostics"):
+            runs = [run] + [job.run for job in (current_job(st.session_state, slot=slot) for slot in REVISIONS)
+                            if job is not None and job.run is not None]
+            st.dataframe(diagnostics_frame(runs), use_container_width=True, hide_index=True)
+    else:
+        # A removed upload's extraction is no longer wanted
+        for slot, uploaded_file in uploads.items():
+            if not uploaded_file:
+                cancel_session_job(st.session_state, slot)
+        st.info("👆 Please upload both revisions of the schedule to compare them")
+
+        finish_run(landing)
+        st.caption(f"⏱️ {startup_report(landing)}")
+
+
+if __name__ == "__main__":
+    main()
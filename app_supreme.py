@@ -1,118 +1,160 @@
 import streamlit as st
-import pdfplumber
-import pandas as pd
 import re
-from io import BytesIO
 from hd_theme import apply_hd_theme, add_logo
+from extraction_jobs import cancel_session_job, current_job, load_schedule
+from instrumentation import diagnostics_frame, finish_run, recent_runs, stage, start_run, startup_report
+from vendor_detect import DETECTOR_VERSION, MIN_CONFIDENCE, VENDOR_NAMES, VENDOR_APPS, detect_vendor
+from line_classifier import SUPREME_LINES, SUPREME_HEADER_LINES, SUPREME_NOTE_KEYWORDS, SUPREME_PAGE_MARKERS
+
+# pandas, pdfplumber and the modules built on them are imported where they
+# are used, so the landing page renders without loading them
+
+# Bump whenever the extractor output changes so cached results are not reused
+PARSER_VERSION = "supreme-1.3"
+
+def iter_supreme_pages(pdf, workers=None, engine='text'):
+    """Parse a Supreme format PDF page by page
+
+    Args:
+        pdf: Path to the PDF file, or its contents as a bytes-like object
+            (e.g. the upload's getbuffer(), read without a copy)
+        workers: Worker processes for page text extraction (None = per core)
+        engine: Page extraction engine; with 'chars', product lines under a
+            table header are split by its columns (see char_lines.py)
+
+    Yields:
+        PageRecords for every page, in page order
+    """
+    from char_lines import ColumnLayout, page_line_texts
+    from page_text import iter_page_texts
+    from records import DoorRecord, ProductRecord, JobInfo, PageRecords
 
-st.set_page_config(page_title="Supreme Hardware Schedule Extractor", layout="wide")
-
-# Apply Hardware Direct theme
-apply_hd_theme()
-add_logo()
-
-def extract_supreme_hardware_data(pdf_path):
-    """Extract door hardware data from Supreme format PDF"""
-    all_data = []
     job_number = None
     job_name = None
 
-    with pdfplumber.open(pdf_path) as pdf:
-        current_door = None
-        current_area = None
-        current_description = None
-        current_door_type = None
-        current_notes = None
-        in_door_section = False
-
-        for page_num, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            if not text:
-                continue
-
-            lines = text.split('\n')
-
-            # Extract job number and name from first page header
-            if page_num == 0 and not job_number:
-                for i, line in enumerate(lines[:10]):
-                    # Look for pattern like "SLH2410025: Tauranga Intermediate School Block D"
-                    job_line_match = re.match(r'^([A-Z0-9]+)\s*:\s*(.+)', line.strip())
-                    if job_line_match and not job_number:
-                        potential_job = job_line_match.group(1)
-                        potential_name = job_line_match.group(2).strip()
-                        # Only accept if it looks like a job number
-                        if re.match(r'^[A-Z]{2,}[0-9]+', potential_job):
-                            job_number = potential_job
-                            job_name = potential_name
-                            continue
+    current_door = None
+    current_area = None
+    current_notes = None
+    columns = None
+
+    for page_num, page_count, content in iter_page_texts(pdf, workers=workers, markers=SUPREME_PAGE_MARKERS,
+                                                         engine=engine):
+        doors = []
+        products = []
+
+        lines, char_lines = page_line_texts(content)
+
+        # Extract job number and name from first page header
+        if page_num == 0 and not job_number:
+            for i, line in enumerate(lines[:10]):
+                # Look for pattern like "SLH2410025: Tauranga Intermediate School Block D"
+                job_line_match = re.match(r'^([A-Z0-9]+)\s*:\s*(.+)', line.strip())
+                if job_line_match and not job_number:
+                    potential_job = job_line_match.group(1)
+                    potential_name = job_line_match.group(2).strip()
+                    # Only accept if it looks like a job number
+                    if re.match(r'^[A-Z]{2,}[0-9]+', potential_job):
+                        job_number = potential_job
+                        job_name = potential_name
+                        continue
+
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+
+            # A product table header's column positions split the lines below it
+            if char_lines is not None and stripped.startswith('Code '):
+                columns = ColumnLayout.from_header(char_lines[index])
+
+            # One combined regex call classifies the line as an Area
+            # header, door header, product line or other code line
+            kind, line_match = SUPREME_LINES.classify(stripped)
 
             # Check for Area headers (e.g., "Area: Ground Floor")
-            area_match = re.match(r'^Area:\s*(.+)', line.strip())
-            if area_match:
-                current_area = area_match.group(1)
-                in_door_section = True
+            if kind == 'area':
+                current_area = line_match.group('area_name')
+                # Products that follow belong to the new area
+                if current_door:
+                    current_door = current_door._replace(area=current_area)
                 continue
 
             # Check for door header lines
             # Pattern: D0.01 Description Dr type
             # Example: D0.01 Accessible WC Timber
-            door_match = re.match(r'^(D\d+\.\d+)\s+(.+?)\s+(Timber|Alum|INAL|Aluminium|Cavity Slider|Sliding\s+\w+)$', line.strip())
-
-            if door_match:
-                current_door = door_match.group(1)
-                current_description = door_match.group(2).strip()
-                current_door_type = door_match.group(3)
+            if kind == 'door':
+                current_door = DoorRecord(
+                    door=line_match.group('door_id'),
+                    area=current_area if current_area else "",
+                    description=line_match.group('door_desc').strip(),
+                    door_type=line_match.group('door_type')
+                )
+                doors.append(current_door)
                 current_notes = None
                 continue
 
             # Check for notes in the door section
             # Notes appear as multi-line descriptions after door ID
-            if current_door and not re.match(r'^[A-Z0-9\-/\.]+\s+', line.strip()) and line.strip() and not line.startswith('Code'):
+            if current_door and kind is None and stripped and not line.startswith('Code'):
                 # This might be a note line
-                if re.search(r'(supplied|manufacturer|grab rail|mm|track|gear|lock)', line, re.IGNORECASE):
+                if SUPREME_NOTE_KEYWORDS.search(line):
                     if current_notes:
-                        current_notes += ' ' + line.strip()
+                        current_notes += ' ' + stripped
                     else:
-                        current_notes = line.strip()
+                        current_notes = stripped
                     continue
 
-            # Check if this is a product line
-            # Pattern: CODE Description Quantity (with optional Finish at the end)
             # Skip header lines
-            if line.strip() in ['Code Description Finish', 'Code Description Product', 'Quantity Product']:
+            if stripped in SUPREME_HEADER_LINES:
                 continue
 
-            # Product pattern - matches code at start, then description, then number at end
+            # Check if this is a product line
+            # Pattern: CODE Description Quantity (with optional Finish at the end)
             # The finish column appears separately as the last column (SSS, SCP, SIL, PF, etc.)
-            product_match = re.match(r'^([A-Z0-9\-/\.]+)\s+(.+?)\s+(\d+)\s*([A-Z]{2,})?$', line.strip())
-
-            if product_match and current_door:
-                code = product_match.group(1)
-                product_desc = product_match.group(2).strip()
-                quantity = product_match.group(3)
-                finish = product_match.group(4) if product_match.group(4) else ""
-
-                all_data.append({
-                    'Door': current_door,
-                    'Area': current_area if current_area else "",
-                    'Description': current_description if current_description else "",
-                    'Door Type': current_door_type if current_door_type else "",
-                    'Notes': current_notes if current_notes else "",
-                    'Code': code,
-                    'Product Description': product_desc,
-                    'Quantity': quantity,
-                    'Finish': finish
-                })
-
-    df = pd.DataFrame(all_data)
-    # Add job info as metadata
-    if not df.empty:
-        df.attrs['job_number'] = job_number
-        df.attrs['job_name'] = job_name
-    return df
+            if kind == 'product' and current_door:
+                fields = columns.split(char_lines[index]) if columns else None
+                if fields is None:
+                    fields = line_match.groupdict()
+                finish = fields.get('finish')
+                products.append(ProductRecord(
+                    door=current_door,
+                    code=fields['code'],
+                    product_description=fields['product_desc'].strip(),
+                    quantity=fields['quantity'],
+                    notes=current_notes if current_notes else "",
+                    finish=finish if finish else ""
+                ))
+
+        job = JobInfo(job_number, job_name) if page_num == 0 else None
+        yield PageRecords(page_num, page_count, doors, products, job)
+
+
+def extract_supreme_hardware_data(pdf, workers=None, progress=None, engine='text'):
+    """Extract door hardware data from Supreme format PDF
+
+    Builds the DataFrame from the iter_supreme_pages() record stream.
+
+    Args:
+        pdf: Path to the PDF file, or its contents as a bytes-like object
+            (e.g. the upload's getbuffer(), read without a copy)
+        workers: Worker processes for page text extraction (None = per core)
+        progress: Optional callback progress(pages_done, page_count)
+        engine: Page extraction engine, 'text' or 'chars' (see page_text.py)
+    """
+    from records import SUPREME_COLUMNS, records_to_dataframe
+
+    return records_to_dataframe(iter_supreme_pages(pdf, workers=workers, engine=engine), SUPREME_COLUMNS,
+                                progress=progress)
 
 
 def main():
+    # Timed from the first line, for the landing page's startup budget
+    landing = start_run('startup', app='supreme')
+
+    st.set_page_config(page_title="Supreme Hardware Schedule Extractor", layout="wide")
+
+    # Apply Hardware Direct theme
+    apply_hd_theme()
+    add_logo()
+
     st.title("🚪 Supreme Hardware Schedule Extractor")
     st.markdown("Extract door hardware data from Supreme Lock & Hardware PDF schedules")
 
@@ -120,12 +162,33 @@ def main():
     uploaded_file = st.file_uploader("Upload Supreme Hardware Schedule PDF", type=['pdf'])
 
     if uploaded_file:
-        # Save uploaded file temporarily
-        with open("temp_upload_supreme.pdf", "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
-        with st.spinner("Extracting data from PDF..."):
-            df = extract_supreme_hardware_data("temp_upload_supreme.pdf")
+        # The upload's own buffer, parsed in place: no copy, no temp file
+        pdf_buffer = uploaded_file.getbuffer()
+        run = start_run('supreme', file=uploaded_file.name)
+
+        # Loaded by the first upload in the process, not by the landing page
+        with stage('import'):
+            from extract_cache import cached_extract, dataset_key
+            from exports import XLSX_MIME, csv_bytes, export_filenames, get_export
+            from filter_engine import ALL, get_filter_index
+            from job_catalog import CATALOG_PATH, ingest_job
+            from job_dataset import ARROW_MIME, dataset_filename
+            from search_index import get_search_index
+            from summary_engine import get_summary
+
+        # Check the format on the first pages before committing to a full parse
+        detection = cached_extract(pdf_buffer, DETECTOR_VERSION, lambda: detect_vendor(pdf_buffer))
+        if detection.vendor != 'supreme' and detection.confidence >= MIN_CONFIDENCE:
+            st.error(f"⚠️ This schedule looks like {VENDOR_NAMES[detection.vendor]} format "
+                     f"({detection.confidence:.0%} confidence), not Supreme.")
+            st.info(f"Please upload it to the {VENDOR_APPS[detection.vendor]} instead.")
+            st.stop()
+
+        # Reruns with the same schedule are served from the cache; a new one
+        # is parsed by a background job while the app stays responsive
+        with stage('load_schedule'):
+            df = load_schedule(st.session_state, pdf_buffer, PARSER_VERSION, extract_supreme_hardware_data,
+                               file=uploaded_file.name)
 
         if not df.empty:
             # Get job info for file naming
@@ -145,35 +208,37 @@ def main():
                 base_filename = "supreme_hardware_schedule"
                 st.success(f"✅ Extracted {len(df)} product entries from {df['Door'].nunique()} doors")
 
-            # Sidebar filters
+            # Sidebar filters, answered from inverted indexes built once per dataset
+            filters = get_filter_index(df, ['Area', 'Door', 'Door Type', 'Description'])
             st.sidebar.header("Filters")
 
             # Area filter
-            areas = ['All'] + sorted(df['Area'].dropna().unique().tolist())
+            areas = [ALL] + filters.options('Area')
             selected_area = st.sidebar.selectbox("Select Area", areas)
 
             # Door filter
-            doors = ['All'] + sorted(df['Door'].unique().tolist())
+            doors = [ALL] + filters.options('Door')
             selected_door = st.sidebar.selectbox("Select Door", doors)
 
             # Door type filter
-            door_types = ['All'] + sorted(df['Door Type'].dropna().unique().tolist())
+            door_types = [ALL] + filters.options('Door Type')
             selected_type = st.sidebar.selectbox("Select Door Type", door_types)
 
             # Description filter
-            descriptions = ['All'] + sorted(df['Description'].dropna().unique().tolist())
+            descriptions = [ALL] + filters.options('Description')
             selected_description = st.sidebar.selectbox("Select Room Type", descriptions)
 
             # Filter data
-            filtered_df = df.copy()
-            if selected_area != 'All':
-                filtered_df = filtered_df[filtered_df['Area'] == selected_area]
-            if selected_door != 'All':
-                filtered_df = filtered_df[filtered_df['Door'] == selected_door]
-            if selected_type != 'All':
-                filtered_df = filtered_df[filtered_df['Door Type'] == selected_type]
-            if selected_description != 'All':
-                filtered_df = filtered_df[filtered_df['Description'] == selected_description]
+            filtered_df = filters.filter({
+                'Area': selected_area,
+                'Door': selected_door,
+                'Door Type': selected_type,
+                'Description': selected_description,
+            })
+
+            # Rollups shared by the Summary, Items by Door Type and Export tabs,
+            # computed once per dataset
+            summary = get_summary(df)
 
             # Display tabs
             tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Data Table", "📈 Summary", "🔍 Product Search", "🏷️ Items by Door Type", "📥 Export"])
@@ -186,33 +251,21 @@ def main():
 
                 with col1:
                     st.subheader("Doors by Area")
-                    area_summary = df.groupby('Area')['Door'].nunique().reset_index()
-                    area_summary.columns = ['Area', 'Door Count']
-                    st.dataframe(area_summary, use_container_width=True)
+                    st.dataframe(summary.doors_by_area, use_container_width=True)
 
                     st.subheader("Doors by Type")
-                    door_type_summary = df.groupby('Door Type')['Door'].nunique().reset_index()
-                    door_type_summary.columns = ['Door Type', 'Door Count']
-                    st.dataframe(door_type_summary, use_container_width=True)
+                    st.dataframe(summary.doors_by_type, use_container_width=True)
 
                     st.subheader("Doors by Room Type")
-                    room_summary = df.groupby('Description')['Door'].nunique().reset_index()
-                    room_summary.columns = ['Room Type', 'Door Count']
-                    st.dataframe(room_summary.sort_values('Door Count', ascending=False), use_container_width=True)
+                    st.dataframe(summary.doors_by_room.sort_values('Door Count', ascending=False), use_container_width=True)
 
                 with col2:
                     st.subheader("Product Quantity Summary")
-                    product_summary = df.groupby(['Code', 'Product Description']).agg({
-                        'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum()
-                    }).reset_index()
-                    product_summary.columns = ['Code', 'Description', 'Total Quantity']
-                    product_summary = product_summary.sort_values('Total Quantity', ascending=False)
-                    st.dataframe(product_summary, use_container_width=True, height=400)
+                    st.dataframe(summary.products.sort_values('Total Quantity', ascending=False),
+                               use_container_width=True, height=400)
 
                     st.subheader("Products per Door")
-                    products_by_door = df.groupby('Door').size().reset_index()
-                    products_by_door.columns = ['Door', 'Product Count']
-                    st.dataframe(products_by_door.sort_values('Product Count', ascending=False),
+                    st.dataframe(summary.products_per_door.sort_values('Product Count', ascending=False),
                                use_container_width=True, height=300)
 
             with tab3:
@@ -221,10 +274,8 @@ def main():
                 search_term = st.text_input("Search by product code or description")
 
                 if search_term:
-                    search_results = df[
-                        df['Code'].str.contains(search_term, case=False, na=False) |
-                        df['Product Description'].str.contains(search_term, case=False, na=False)
-                    ]
+                    # Ranked, typo-tolerant lookup; the term is never treated as a regex
+                    search_results = get_search_index(df).search(search_term)
 
                     if not search_results.empty:
                         st.success(f"Found {len(search_results)} matching products")
@@ -233,7 +284,7 @@ def main():
                         col1, col2 = st.columns(2)
                         with col1:
                             st.metric("Total Doors", search_results['Door'].nunique())
-                            st.metric("Total Quantity", pd.to_numeric(search_results['Quantity'], errors='coerce').sum())
+                            st.metric("Total Quantity", int(search_results['Quantity'].sum()))
 
                         with col2:
                             st.metric("Unique Products", search_results['Code'].nunique())
@@ -246,16 +297,12 @@ def main():
             with tab4:
                 st.subheader("🏷️ Items Breakdown by Door Type")
 
-                # Group by Door Type and Product
-                door_type_breakdown = df.groupby(['Door Type', 'Code', 'Product Description']).agg({
-                    'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum(),
-                    'Door': 'count'  # Count how many doors use this item
-                }).reset_index()
-                door_type_breakdown.columns = ['Door Type', 'Code', 'Product Description', 'Total Quantity', 'Doors Using Item']
-                door_type_breakdown = door_type_breakdown.sort_values(['Door Type', 'Total Quantity'], ascending=[True, False])
+                # Products by Door Type, with how many doors use each item
+                door_type_breakdown = summary.door_type_products.sort_values(['Door Type', 'Total Quantity'], ascending=[True, False])
+                doors_per_type = summary.doors_by_type.set_index('Door Type')['Door Count']
 
                 # Get unique door types
-                unique_door_types = sorted(df['Door Type'].dropna().unique().tolist())
+                unique_door_types = sorted(doors_per_type.index.dropna().tolist())
 
                 if unique_door_types:
                     # Create selector for door type
@@ -272,7 +319,7 @@ def main():
                             if not door_type_data.empty:
                                 total_items = len(door_type_data)
                                 total_qty = door_type_data['Total Quantity'].sum()
-                                num_doors = df[df['Door Type'] == door_type]['Door'].nunique()
+                                num_doors = doors_per_type[door_type]
 
                                 with st.expander(f"**{door_type}** - {num_doors} doors, {total_items} unique items, {int(total_qty)} total quantity"):
                                     # Show summary metrics
@@ -296,7 +343,7 @@ def main():
                             # Show summary metrics
                             total_items = len(door_type_data)
                             total_qty = door_type_data['Total Quantity'].sum()
-                            num_doors = df[df['Door Type'] == selected_breakdown_type]['Door'].nunique()
+                            num_doors = doors_per_type[selected_breakdown_type]
 
                             col1, col2, col3 = st.columns(3)
                             with col1:
@@ -314,10 +361,9 @@ def main():
                             st.dataframe(display_df, use_container_width=True, height=500)
 
                             # Add download button for this door type
-                            csv_data = display_df.to_csv(index=False)
                             st.download_button(
                                 label=f"📥 Download {selected_breakdown_type} Breakdown CSV",
-                                data=csv_data,
+                                data=lambda: csv_bytes(display_df),
                                 file_name=f"{base_filename}_{selected_breakdown_type.replace(' ', '_').lower()}.csv",
                                 mime="text/csv"
                             )
@@ -330,72 +376,25 @@ def main():
                 # Row 1: Main exports
                 col1, col2, col3 = st.columns(3)
 
+                doors_filename, hardware_filename = export_filenames(job_number)
+
+                # Each file is built only when its download is clicked, then
+                # cached for this dataset
                 with col1:
-                    # Export Doors CSV
-                    doors_df = df.groupby('Door').agg({
-                        'Description': 'first',
-                        'Area': 'first',
-                        'Door Type': 'first'
-                    }).reset_index()
-
-                    # Reorder and rename columns to match standard format
-                    doors_export = pd.DataFrame({
-                        'DoorNumber': doors_df['Door'],
-                        'DoorDescription': doors_df['Description'],
-                        'Area': doors_df['Area'],
-                        'Stage': '',
-                        'Stamping': '',
-                        'IsKeyed': '',
-                        'DoorHeight': '',
-                        'DoorWidth': '',
-                        'DoorThickness': '',
-                        'Rating': '',
-                        'HandingShortCode': '',
-                        'DoorType': doors_df['Door Type'],
-                        'DoorFinishShortCode': '',
-                        'FrameTypeShortCode': '',
-                        'FrameFinishShortCode': '',
-                        'LockFunctionShortCode': ''
-                    })
-
-                    csv_doors = doors_export.to_csv(index=False)
-                    doors_filename = f"{job_number}_Doors.csv" if job_number else "Doors.csv"
+                    # Export Doors CSV - one row per door in the standard format
                     st.download_button(
                         label="📥 Doors CSV",
-                        data=csv_doors,
+                        data=lambda: get_export(df, 'doors_csv'),
                         file_name=doors_filename,
                         mime="text/csv",
                         help="Door-level information only"
                     )
 
                 with col2:
-                    # Export Door Hardware CSV
-                    hardware_export = pd.DataFrame({
-                        'DoorNumber': df['Door'],
-                        'DoorDescription': df['Description'],
-                        'Area': df['Area'],
-                        'Stage': '',
-                        'Stamping': '',
-                        'Rating': '',
-                        'HandingShortCode': '',
-                        'DoorType': df['Door Type'],
-                        'DoorFinishShortCode': '',
-                        'FrameTypeShortCode': '',
-                        'FrameFinishShortCode': '',
-                        'LockFunctionShortCode': '',
-                        'PartCode': df['Code'],
-                        'Description': df['Product Description'],
-                        'ProductQuantity': df['Quantity'],
-                        'InstallQuantity': '',
-                        'InstallNote': df['Notes'],
-                        'Finish': df['Finish']
-                    })
-
-                    csv_hardware = hardware_export.to_csv(index=False)
-                    hardware_filename = f"{job_number}_DoorHardware.csv" if job_number else "DoorHardware.csv"
+                    # Export Door Hardware CSV - one row per product in the standard format
                     st.download_button(
                         label="📥 Door Hardware CSV",
-                        data=csv_hardware,
+                        data=lambda: get_export(df, 'hardware_csv'),
                         file_name=hardware_filename,
                         mime="text/csv",
                         help="Complete door hardware schedule with products"
@@ -403,80 +402,45 @@ def main():
 
                 with col3:
                     # Export to Excel with multiple sheets
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        # Doors sheet
-                        doors_export.to_excel(writer, sheet_name='Doors', index=False)
-
-                        # Door Hardware sheet
-                        hardware_export.to_excel(writer, sheet_name='Door Hardware', index=False)
-
-                        # Product summary
-                        product_summary = df.groupby(['Code', 'Product Description']).agg({
-                            'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum()
-                        }).reset_index()
-                        product_summary.columns = ['Code', 'Description', 'Total Quantity']
-                        product_summary.to_excel(writer, sheet_name='Product Summary', index=False)
-
-                        # Area summary
-                        area_summary = df.groupby(['Area', 'Door Type'])['Door'].nunique().reset_index()
-                        area_summary.columns = ['Area', 'Door Type', 'Door Count']
-                        area_summary.to_excel(writer, sheet_name='Area Summary', index=False)
-
-                        # Items by Door Type
-                        df_with_door_type = df[df['Door Type'].notna() & (df['Door Type'] != '')].copy()
-
-                        if not df_with_door_type.empty:
-                            door_type_breakdown = df_with_door_type.groupby(['Door Type', 'Code', 'Product Description']).agg({
-                                'Quantity': lambda x: pd.to_numeric(x, errors='coerce').sum()
-                            }).reset_index()
-                            door_type_breakdown.columns = ['Door Type', 'Code', 'Product Description', 'Total Quantity']
-
-                            unique_door_types = sorted(df_with_door_type['Door Type'].unique().tolist())
-
-                            all_door_types_data = []
-                            for door_type in unique_door_types:
-                                door_type_data = door_type_breakdown[door_type_breakdown['Door Type'] == door_type]
-                                if not door_type_data.empty:
-                                    # Add header row
-                                    all_door_types_data.append({
-                                        'Code': f'{door_type}',
-                                        'Product Description': '',
-                                        'Total Quantity': ''
-                                    })
-                                    # Add data rows
-                                    for _, row in door_type_data.iterrows():
-                                        all_door_types_data.append({
-                                            'Code': row['Code'],
-                                            'Product Description': row['Product Description'],
-                                            'Total Quantity': int(row['Total Quantity']) if pd.notna(row['Total Quantity']) else 0
-                                        })
-                                    # Add blank row
-                                    all_door_types_data.append({
-                                        'Code': '',
-                                        'Product Description': '',
-                                        'Total Quantity': ''
-                                    })
-
-                            if all_door_types_data:
-                                combined_df = pd.DataFrame(all_door_types_data)
-                                combined_df.to_excel(writer, sheet_name='Items by Door Type', index=False)
-
-                    excel_data = output.getvalue()
                     st.download_button(
                         label="📥 Complete Excel",
-                        data=excel_data,
+                        data=lambda: get_export(df, 'excel'),
                         file_name=f"{base_filename}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        mime=XLSX_MIME
                     )
 
+                # Row 2: The whole extracted job in a columnar file, with its
+                # job details, for reopening without the PDF
+                st.download_button(
+                    label="📥 Arrow Dataset",
+                    data=lambda: get_export(df, 'dataset'),
+                    file_name=dataset_filename(job_number),
+                    mime=ARROW_MIME,
+                    help="All extracted rows with their column types and job details; open with job_dataset.load_dataset"
+                )
+
+                # Keep the job for cross-job lookups (see app_catalog.py)
+                if st.button("🗂️ Save to Job Catalog",
+                             help="Adds the job's doors and products to the job catalog, replacing an earlier save of the same job"):
+                    ingest_job(df, vendor='supreme', source=uploaded_file.name)
+                    st.success(f"✅ Saved to the job catalog ({CATALOG_PATH})")
+
                 st.info("💡 CSV exports match the standard format with job number in filename.")
 
         else:
             st.warning("⚠️ No data extracted. Please check the PDF format.")
             st.info("The PDF should be in Supreme Lock & Hardware schedule format.")
 
+        # Stage timings of this rerun, plus any export downloads built for the dataset
+        finish_run(run)
+        with st.expander("🩺 Diagnostics"):
+            job = current_job(st.session_state)
+            runs = [run] + ([job.run] if job is not None and job.run is not None else [])
+            runs += recent_runs('export', dataset=dataset_key(df)) if not df.empty else []
+            st.dataframe(diagnostics_frame(runs), use_container_width=True, hide_index=True)
     else:
+        # The upload was removed, so its extraction is no longer wanted
+        cancel_session_job(st.session_state)
         st.info("👆 Please upload a PDF file to get started")
 
         # Show example format
@@ -514,6 +478,9 @@ L9D11S         Legge L9D11S Escape Mortice Deadlock.RH            1          SCP
 6649RH/30SSS   dormakaba 6649RH/30SSS Noosa Lever Ext Ind Emr    1          SSS
             """)
 
+        finish_run(landing)
+        st.caption(f"⏱️ {startup_report(landing)}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+"""
+Batch Extract
+Headless command-line extractor for folders of hardware schedules
+
+Detects the vendor format of each PDF, extracts the files in parallel and
+writes the Doors and DoorHardware CSVs in the same layout as the apps'
+Export tab, one output folder per PDF (named after it, with a suffix for
+PDFs of the same name in other folders). With --dataset the extracted job is
+saved as a columnar dataset too (see job_dataset.py), so it can be
+reopened without parsing the PDF again, and with --catalog every job is
+saved to the job catalog (see job_catalog.py) in one transaction.
+
+Usage:
+    python batch_extract.py schedules/ -o exports/
+    python batch_extract.py "tender/**/*.pdf" --workers 8
+    python batch_extract.py schedules/ --dataset parquet
+    python batch_extract.py schedules/ --catalog job_catalog.sqlite
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from exports import build_doors_export, build_hardware_export, export_filenames, write_csv
+from job_catalog import CatalogJob, ingest_jobs
+from job_dataset import DATASET_SUFFIXES, dataset_filename, save_dataset
+from vendor_detect import VENDOR_NAMES, MIN_CONFIDENCE, detect_vendor, extract_schedule
+
+
+def process_file(pdf_path, out_dir, vendor=None, dataset=None, keep_frame=False):
+    """Extract one PDF and write its CSVs (runs in a worker process)
+
+    Args:
+        out_dir: Output folder of the PDF (see output_folders)
+        dataset: Also save the extracted job in this dataset format
+            ('arrow' or 'parquet'), default none
+        keep_frame: Return the extracted DataFrame too, as 'frame'
+
+    Returns:
+        Dict with the file's vendor, counts, output folder and timings
+    """
+    start = time.perf_counter()
+    confidence = 1.0
+    if vendor is None:
+        detection = detect_vendor(pdf_path)
+        vendor, confidence = detection.vendor, detection.confidence
+    detected = time.perf_counter()
+
+    result = {'file': pdf_path, 'vendor': vendor, 'confidence': confidence,
+              'doors': 0, 'rows': 0, 'output': None}
+    if vendor is None or confidence < MIN_CONFIDENCE:
+        result['error'] = f"unrecognised schedule format (confidence {confidence:.0%})"
+    else:
+        # One process per file already, so no nested page-level pool
+        _, df = extract_schedule(pdf_path, vendor=vendor, workers=1)
+        extracted = time.perf_counter()
+
+        if df.empty:
+            result['error'] = "no data extracted"
+        else:
+            os.makedirs(out_dir, exist_ok=True)
+
+            doors_filename, hardware_filename = export_filenames(df.attrs.get('job_number'))
+            write_csv(build_doors_export(df), os.path.join(out_dir, doors_filename))
+            write_csv(build_hardware_export(df), os.path.join(out_dir, hardware_filename))
+            if dataset:
+                save_dataset(df, os.path.join(out_dir, dataset_filename(df.attrs.get('job_number'), f".{dataset}")))
+
+            result.update(doors=df['Door'].nunique(), rows=len(df), output=out_dir)
+            if keep_frame:
+                result['frame'] = df
+        result['extract_seconds'] = extracted - detected
+
+    result['detect_seconds'] = detected - start
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def find_pdfs(inputs):
+    """Expand directories and glob patterns into a sorted list of PDF paths"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.update(os.path.join(root, name) for name in files if name.lower().endswith('.pdf'))
+        else:
+            paths.update(path for path in glob.glob(item, recursive=True) if path.lower().endswith('.pdf'))
+    return sorted(paths)
+
+
+def output_folders(pdf_paths, output_dir):
+    """Output folder of every PDF, named after the file
+
+    PDFs of the same name in different folders (e.g. jobA/schedule.pdf and
+    jobB/schedule.pdf) would write to the same folder, so each repeat gets
+    a "_2", "_3", ... suffix, in path order.
+
+    Returns:
+        Tuple of (dict of output folder by PDF path, list of the paths
+        whose folder got a suffix)
+    """
+    folders = {}
+    renamed = []
+    taken = set()
+    for path in pdf_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem
+        number = 1
+        while name.lower() in taken:
+            number += 1
+            name = f"{stem}_{number}"
+        taken.add(name.lower())
+        folders[path] = os.path.join(output_dir, name)
+        if name != stem:
+            renamed.append(path)
+    return folders, renamed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract door hardware schedules from a folder of PDFs")
+    parser.add_argument('inputs', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='exports', help="Output directory (default: exports)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Parallel worker processes (default: one per CPU core)")
+    parser.add_argument('--vendor', choices=list(VENDOR_NAMES), default=None,
+                        help="Skip detection and use this format for every file")
+    parser.add_argument('--dataset', choices=[suffix.lstrip('.') for suffix in DATASET_SUFFIXES], default=None,
+                        help="Also save each extracted job as a columnar dataset in this format")
+    parser.add_argument('--catalog', default=None,
+                        help="Also save every extracted job to this job catalog file")
+    args = parser.parse_args(argv)
+
+    pdf_paths = find_pdfs(args.inputs)
+    if not pdf_paths:
+        print("No PDF files found", file=sys.stderr)
+        return 1
+
+    folders, renamed = output_folders(pdf_paths, args.output)
+    for path in renamed:
+        print(f"NOTE    {path}: another PDF has the same name, writing to {folders[path]}")
+    # Catalog source of every job: the file name, or its path where the name
+    # is shared, so those jobs don't replace each other (see job_catalog.job_key)
+    name_counts = Counter(os.path.basename(path) for path in pdf_paths)
+    sources = {path: os.path.basename(path) if name_counts[os.path.basename(path)] == 1 else path
+               for path in pdf_paths}
+
+    print(f"Processing {len(pdf_paths)} schedule(s)...")
+    start = time.perf_counter()
+    failures = 0
+    catalog_jobs = []
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(process_file, path, folders[path], args.vendor, args.dataset,
+                               args.catalog is not None): path for path in pdf_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"FAILED  {path}: {e}")
+                continue
+
+            if 'error' in result:
+                failures += 1
+                print(f"SKIPPED {path}: {result['error']} ({result['seconds']:.2f}s)")
+            else:
+                print(f"OK      {path}: {result['vendor']} ({result['confidence']:.0%}), {result['doors']} doors, "
+                      f"{result['rows']} rows -> {result['output']} (detect {result['detect_seconds']:.2f}s, "
+                      f"extract {result['extract_seconds']:.2f}s, total {result['seconds']:.2f}s)")
+                if 'frame' in result:
+                    catalog_jobs.append(CatalogJob(result['frame'], result['vendor'], sources[path]))
+
+    if args.catalog is not None:
+        saved = ingest_jobs(catalog_jobs, path=args.catalog)
+        print(f"Saved {saved} job(s) to the job catalog {args.catalog}")
+
+    print(f"Done: {len(pdf_paths) - failures} of {len(pdf_paths)} schedule(s) in {time.perf_counter() - start:.2f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Benchmark
+Extraction and export benchmarks for every parser on synthetic schedules
+
+Each case renders a synthetic schedule (see synthetic_schedules.py), then
+extracts and exports it in a fresh process so peak memory is measured per
+case. It records pages/sec, rows/sec, peak RSS and export time, and checks
+the row count against what the generator wrote. Results are compared with
+a saved baseline; slowdowns or memory growth beyond the tolerance are
+reported as regressions and make the run exit with status 1.
+
+Baselines are machine specific - record one on the machine you compare on.
+
+Usage:
+    python benchmark.py                          # compare with the baseline
+    python benchmark.py --save                   # record a new baseline
+    python benchmark.py --vendors ara --sizes 10 5000 50000
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import extract_cache
+from exports import build_doors_export, build_excel_export, build_hardware_export, csv_bytes
+from instrumentation import peak_rss_mb
+from synthetic_schedules import VENDORS, generate_schedule
+from vendor_detect import extract_schedule
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Door counts benchmarked by default
+DEFAULT_SIZES = [10, 500, 2000]
+
+# Fractional slowdown or memory growth over the baseline that counts as a regression
+TOLERANCE = 0.25
+
+# Timing differences below this many seconds are treated as noise
+MIN_SECONDS_DELTA = 0.05
+
+
+def run_case(vendor, doors, workers=None, seed=0, engine='text'):
+    """Generate, extract and export one schedule (runs in a fresh process)
+
+    Returns:
+        Dict of the case's measurements
+    """
+    schedule = generate_schedule(vendor, doors, seed=seed)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Start from an empty page text store so every case is a cold parse
+        extract_cache.CACHE_DIR = os.path.join(tmp_dir, 'cache')
+        pdf_path = os.path.join(tmp_dir, f"{vendor}_{doors}.pdf")
+        with open(pdf_path, 'wb') as f:
+            f.write(schedule.pdf)
+
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        _, df = extract_schedule(pdf_path, vendor=vendor, workers=workers, engine=engine)
+        extract_seconds = time.perf_counter() - start
+        extract_cpu_seconds = time.process_time() - cpu_start
+
+    start = time.perf_counter()
+    if not df.empty:
+        csv_bytes(build_doors_export(df))
+        csv_bytes(build_hardware_export(df))
+        build_excel_export(df)
+    export_seconds = time.perf_counter() - start
+
+    return {
+        'vendor': vendor,
+        'doors': doors,
+        'pages': schedule.pages,
+        'rows': len(df),
+        'expected_rows': schedule.products,
+        'extract_seconds': round(extract_seconds, 4),
+        'extract_cpu_seconds': round(extract_cpu_seconds, 4),
+        'pages_per_sec': round(schedule.pages / extract_seconds, 2),
+        'rows_per_sec': round(len(df) / extract_seconds, 1),
+        'export_seconds': round(export_seconds, 4),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def case_key(result):
+    return f"{result['vendor']}-{result['doors']}"
+
+
+def compare(result, baseline, tolerance=TOLERANCE):
+    """Regressions of one case against its baseline measurements
+
+    Returns:
+        List of human-readable regression descriptions (empty if none)
+    """
+    problems = []
+    if result['rows'] != result['expected_rows']:
+        problems.append(f"extracted {result['rows']} rows, expected {result['expected_rows']}")
+    if baseline is None:
+        return problems
+
+    if result['rows_per_sec'] < baseline['rows_per_sec'] * (1 - tolerance):
+        problems.append(f"rows/sec {result['rows_per_sec']:.0f} vs baseline {baseline['rows_per_sec']:.0f}")
+    if (result['export_seconds'] > baseline['export_seconds'] * (1 + tolerance)
+            and result['export_seconds'] - baseline['export_seconds'] > MIN_SECONDS_DELTA):
+        problems.append(f"export {result['export_seconds']:.3f}s vs baseline {baseline['export_seconds']:.3f}s")
+    if result['peak_rss_mb'] > baseline['peak_rss_mb'] * (1 + tolerance):
+        problems.append(f"peak RSS {result['peak_rss_mb']:.0f} MB vs baseline {baseline['peak_rss_mb']:.0f} MB")
+    return problems
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the schedule parsers on synthetic PDFs")
+    parser.add_argument('--vendors', nargs='+', choices=VENDORS, default=list(VENDORS),
+                        help="Formats to benchmark (default: all)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help=f"Door counts to benchmark (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Page extraction worker processes (default: one per CPU core)")
+    parser.add_argument('--engine', choices=['text', 'chars'], default='text',
+                        help="Page extraction engine of the ARA and Supreme parsers (default: text)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file to compare with or save to")
+    parser.add_argument('--save', action='store_true', help="Save the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help=f"Allowed slowdown/growth over the baseline (default: {TOLERANCE})")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    baseline_cases = baseline['cases'] if baseline else {}
+    if baseline is None and not args.save:
+        print(f"No baseline at {args.baseline} - run with --save to record one")
+
+    print(f"{'case':<16}{'pages':>7}{'rows':>9}{'pages/s':>10}{'rows/s':>10}{'export s':>10}{'peak MB':>9}")
+    results = {}
+    failures = 0
+    for vendor in args.vendors:
+        for doors in args.sizes:
+            # A fresh process per case keeps peak RSS per case
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_case, vendor, doors, args.workers, engine=args.engine).result()
+
+            key = case_key(result)
+            results[key] = result
+            print(f"{key:<16}{result['pages']:>7}{result['rows']:>9}{result['pages_per_sec']:>10.1f}"
+                  f"{result['rows_per_sec']:>10.0f}{result['export_seconds']:>10.3f}{result['peak_rss_mb']:>9.0f}")
+
+            problems = compare(result, None if args.save else baseline_cases.get(key), args.tolerance)
+            for problem in problems:
+                print(f"  REGRESSION {key}: {problem}")
+            failures += bool(problems)
+
+    if args.save:
+        cases = dict(baseline_cases)
+        cases.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'workers': args.workers,
+                'recorded': time.strftime('%Y-%m-%d'),
+                'cases': cases,
+            }, f, indent=2)
+            f.write('\n')
+        print(f"Saved baseline to {args.baseline}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+Char Lines Module
+Vectorized line building from page characters, with column splitting
+
+An alternative to page.extract_text() for the ARA and Supreme parsers.
+extract_text() runs pdfplumber's general-purpose text layout and returns
+plain lines, after which the product regex has to guess where the code,
+description and quantity fields end - a description ending in a number
+("Flush Pull 165/50") is indistinguishable from one followed by a
+quantity. Here the page's characters are read into NumPy arrays, sorted
+into lines by their y position and into words by the gaps between them,
+and every word keeps its x position. Product lines under a table header
+("Code  Description  Product") are then split by the x positions of the
+header's column titles instead of by the regex.
+
+Headers typed inline with single spaces, as in hand-made or generated
+schedules, don't define columns; their lines are parsed by the regex as
+before.
+
+The same lines fill the cells of ruled tables (see table_rows), so the
+"Doors with hardware" extractor lays out each page's characters once.
+
+Usage:
+    from char_lines import ColumnLayout, page_lines
+
+    for line in page_lines(page):
+        layout = ColumnLayout.from_header(line) or layout
+        fields = layout.split(line) if layout else None
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+from pdfplumber.utils.text import LIGATURES
+
+# Bump whenever the line building changes so stored page lines are not
+# reused (see page_text.py)
+CHAR_LINES_VERSION = "chars-2"
+
+# pdfplumber's default tolerances: characters whose tops are this close
+# share a line, and a gap this wide between characters ends a word
+Y_TOLERANCE = 3
+X_TOLERANCE = 3
+
+# Column titles of product tables, by field
+COLUMN_TITLES = {
+    'Code': 'code',
+    'Description': 'product_desc',
+    'Quantity': 'quantity',
+    'Product': 'quantity',
+    'Finish': 'finish',
+}
+
+# Column titles further apart than this many font sizes are a table
+# header; closer ones are inline text
+MIN_COLUMN_GAP = 2.0
+
+# Words may start a little left of their column's title
+COLUMN_TOLERANCE = 2.0
+
+_is_space = np.frompyfunc(str.isspace, 1, 1)
+
+
+class CharLine(NamedTuple):
+    """One line of a page, with the position of every word"""
+    text: str     # words joined by single spaces
+    words: tuple  # word texts, left to right
+    x0: tuple     # left edge of every word
+    x1: tuple     # right edge of every word
+    top: tuple    # top of every word
+    bottom: tuple # bottom of every word
+    size: float   # font size of the line's first character
+
+
+def page_lines(page):
+    """Build the lines of a page from its characters
+
+    Args:
+        page: pdfplumber Page
+
+    Returns:
+        List of CharLine, top to bottom
+    """
+    chars = page.chars
+    count = len(chars)
+    if not count:
+        return []
+
+    x0 = np.fromiter((char['x0'] for char in chars), np.float64, count)
+    x1 = np.fromiter((char['x1'] for char in chars), np.float64, count)
+    top = np.fromiter((char['top'] for char in chars), np.float64, count)
+    bottom = np.fromiter((char['bottom'] for char in chars), np.float64, count)
+    size = np.fromiter((char['size'] for char in chars), np.float64, count)
+    text = np.array([LIGATURES.get(char['text'], char['text']) for char in chars], dtype=object)
+
+    # Lines: runs of tops no further apart than the tolerance
+    by_top = np.argsort(top, kind='stable')
+    line_starts = np.ones(count, dtype=bool)
+    line_starts[1:] = np.diff(top[by_top]) > Y_TOLERANCE
+    line_id = np.empty(count, dtype=np.int64)
+    line_id[by_top] = np.cumsum(line_starts) - 1
+
+    # Characters left to right within each line
+    order = np.lexsort((x0, line_id))
+    x0, x1, top, bottom = x0[order], x1[order], top[order], bottom[order]
+    size, text, line_id = size[order], text[order], line_id[order]
+
+    # Words: broken by whitespace characters and by gaps
+    blank = _is_space(text).astype(bool)
+    word_starts = np.ones(count, dtype=bool)
+    word_starts[1:] = ((line_id[1:] != line_id[:-1]) | (x0[1:] - x1[:-1] > X_TOLERANCE)
+                       | blank[1:] | blank[:-1])
+    keep = np.flatnonzero(~blank)
+    if not len(keep):
+        return []
+    word_id = (np.cumsum(word_starts) - 1)[keep]
+    bounds = np.flatnonzero(np.diff(word_id)) + 1
+    firsts = np.concatenate([[0], bounds])
+    lasts = np.concatenate([bounds, [len(keep)]]) - 1
+
+    kept_text = text[keep]
+    words = [''.join(kept_text[first:last + 1]) for first, last in zip(firsts, lasts)]
+    word_x0 = x0[keep][firsts].tolist()
+    word_x1 = x1[keep][lasts].tolist()
+    word_top = top[keep][firsts].tolist()
+    word_bottom = bottom[keep][firsts].tolist()
+    word_size = size[keep][firsts].tolist()
+    word_line = line_id[keep][firsts]
+
+    # Group the words of each line
+    line_bounds = np.concatenate([[0], np.flatnonzero(np.diff(word_line)) + 1, [len(words)]]).tolist()
+    lines = []
+    for start, stop in zip(line_bounds[:-1], line_bounds[1:]):
+        line_words = tuple(words[start:stop])
+        lines.append(CharLine(' '.join(line_words), line_words, tuple(word_x0[start:stop]),
+                              tuple(word_x1[start:stop]), tuple(word_top[start:stop]),
+                              tuple(word_bottom[start:stop]), word_size[start]))
+    return lines
+
+
+def page_line_texts(content):
+    """Text lines of a page, and its CharLines if it has them
+
+    Args:
+        content: What page_text.iter_page_texts yielded for the page: text
+            (the 'text' engine), a list of CharLine (the 'chars' engine), or
+            None
+
+    Returns:
+        Tuple of (list of line strings, list of CharLine or None)
+    """
+    if not content:
+        return [], None
+    if isinstance(content, str):
+        return content.split('\n'), None
+    return [line.text for line in content], content
+
+
+class ColumnLayout:
+    """Field columns of a product table, from the x positions of its header
+
+    Args:
+        columns: List of (field, x0) tuples, left to right
+    """
+
+    def __init__(self, columns):
+        self.fields = [field for field, _ in columns]
+        self._starts = np.array([x0 - COLUMN_TOLERANCE for _, x0 in columns])
+
+    @classmethod
+    def from_header(cls, line):
+        """The layout of a table header line, or None if it isn't one
+
+        A header starts with "Code", names a description column, and has
+        wide gaps between its column titles.
+        """
+        if line is None or not line.words or line.words[0] != 'Code':
+            return None
+        columns = []
+        for word, x0, x1 in zip(line.words, line.x0, line.x1):
+            field = COLUMN_TITLES.get(word)
+            if field is None:
+                return None
+            if columns and x0 - previous_x1 < MIN_COLUMN_GAP * line.size:
+                return None
+            if field not in dict(columns):
+                columns.append((field, x0))
+            previous_x1 = x1
+        if 'product_desc' not in dict(columns):
+            return None
+        return cls(columns)
+
+    def split(self, line):
+        """Split a product line into its fields by column
+
+        Returns:
+            Dict of field -> text ('' for empty columns), or None if the line
+            doesn't fit the columns (words left of the first column, or no
+            single code and a description)
+        """
+        columns = np.searchsorted(self._starts, line.x0, side='right') - 1
+        if columns[0] < 0:
+            return None
+        fields = {field: [] for field in self.fields}
+        for column, word in zip(columns.tolist(), line.words):
+            fields[self.fields[column]].append(word)
+        if len(fields['code']) != 1 or not fields['product_desc']:
+            return None
+        return {field: ' '.join(words) for field, words in fields.items()}
+
+
+def table_rows(table, lines):
+    """Cell texts of a pdfplumber Table, filled from the page's lines
+
+    Gives the rows table.extract() does, without its scan of every
+    character on the page for every cell: each word is placed in the cell
+    containing its center, one vectorized lookup per row and cell.
+
+    Args:
+        table: pdfplumber Table (from page.find_tables())
+        lines: The page's CharLines (see page_lines)
+
+    Returns:
+        List of rows, each a list of cell texts (None for merged cells)
+    """
+    words = [word for line in lines for word in line.words]
+    line_of = np.repeat(np.arange(len(lines)), [len(line.words) for line in lines]).tolist()
+    x0, x1, top, bottom = (np.array([value for line in lines for value in getattr(line, edge)], dtype=np.float64)
+                           for edge in ('x0', 'x1', 'top', 'bottom'))
+    center_x = (x0 + x1) / 2
+    center_y = (top + bottom) / 2
+
+    rows = []
+    for row in table.rows:
+        _, row_top, _, row_bottom = row.bbox
+        in_row = np.flatnonzero((center_y >= row_top) & (center_y < row_bottom))
+        cells = []
+        for bbox in row.cells:
+            if bbox is None:
+                cells.append(None)
+                continue
+            left, cell_top, right, cell_bottom = bbox
+            inside = in_row[(center_x[in_row] >= left) & (center_x[in_row] < right)
+                            & (center_y[in_row] >= cell_top) & (center_y[in_row] < cell_bottom)]
+            # Words of one line are joined by spaces, lines by newlines
+            cell_lines = {}
+            for index in inside.tolist():
+                cell_lines.setdefault(line_of[index], []).append(words[index])
+            cells.append('\n'.join(' '.join(line_words) for line_words in cell_lines.values()))
+        rows.append(cells)
+    return rows
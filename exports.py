@@ -0,0 +1,247 @@
+"""
+Exports Module
+Doors and DoorHardware export layouts shared by the apps and the CLI
+
+Usage:
+    from exports import build_doors_export, build_hardware_export, build_excel_export
+
+    doors_export = build_doors_export(df)
+    hardware_export = build_hardware_export(df)
+    excel_bytes = build_excel_export(df)
+
+The apps don't build anything up front: get_export() builds one download
+artifact when it is requested and caches it against the dataset hash, so
+reruns triggered by filters and other widgets cost nothing.
+
+    st.download_button("Doors CSV", data=lambda: get_export(df, 'doors_csv'), ...)
+"""
+
+import pandas as pd
+
+from extract_cache import dataset_cached, dataset_key
+from instrumentation import record_run, stage
+from job_dataset import dataset_bytes
+from records import normalize_columns
+from summary_engine import get_summary
+from xlsx_writer import workbook_bytes
+
+# Door-level columns carried into the Doors export when the parser provides them
+DOOR_ATTRIBUTES = ['Description', 'Area', 'Rating', 'Handing', 'Door Type']
+
+DOOR_TYPE_SHEET_COLUMNS = ['Code', 'Product Description', 'Total Quantity']
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Rows formatted per CSV chunk
+CSV_ROWS_PER_CHUNK = 10000
+
+
+def _column(frame, name):
+    """Column of frame, or '' (broadcast) if the parser doesn't extract it"""
+    return frame[name] if name in frame.columns else ''
+
+
+def build_doors_export(df):
+    """Build the Doors export (one row per door) in the standard format
+
+    Args:
+        df: Extracted DataFrame from any of the parsers
+
+    Returns:
+        DataFrame with the standard Doors columns
+    """
+    df = normalize_columns(df)
+
+    # Create doors dataframe with unique door information
+    present = [name for name in DOOR_ATTRIBUTES if name in df.columns]
+    doors_df = df.groupby('Door', observed=True).agg({name: 'first' for name in present}).reset_index()
+
+    # Reorder and rename columns to match the standard format. Empty columns
+    # are not extracted from the PDF yet.
+    return pd.DataFrame({
+        'DoorNumber': doors_df['Door'],
+        'DoorDescription': _column(doors_df, 'Description'),
+        'Area': _column(doors_df, 'Area'),
+        'Stage': '',
+        'Stamping': '',
+        'IsKeyed': '',
+        'DoorHeight': '',
+        'DoorWidth': '',
+        'DoorThickness': '',
+        'Rating': _column(doors_df, 'Rating'),
+        'HandingShortCode': _column(doors_df, 'Handing'),
+        'DoorType': _column(doors_df, 'Door Type'),
+        'DoorFinishShortCode': '',
+        'FrameTypeShortCode': '',
+        'FrameFinishShortCode': '',
+        'LockFunctionShortCode': ''
+    })
+
+
+def build_hardware_export(df):
+    """Build the DoorHardware export (one row per product) in the standard format
+
+    Args:
+        df: Extracted DataFrame from any of the parsers
+
+    Returns:
+        DataFrame with the standard DoorHardware columns, plus Finish for
+        formats that extract it
+    """
+    df = normalize_columns(df)
+
+    # Empty columns are not extracted from the PDF yet
+    hardware_export = pd.DataFrame({
+        'DoorNumber': df['Door'],
+        'DoorDescription': _column(df, 'Description'),
+        'Area': _column(df, 'Area'),
+        'Stage': '',
+        'Stamping': '',
+        'Rating': _column(df, 'Rating'),
+        'HandingShortCode': _column(df, 'Handing'),
+        'DoorType': _column(df, 'Door Type'),
+        'DoorFinishShortCode': '',
+        'FrameTypeShortCode': '',
+        'FrameFinishShortCode': '',
+        'LockFunctionShortCode': '',
+        'PartCode': df['Code'],
+        'Description': df['Product Description'],
+        'ProductQuantity': df['Quantity'],
+        'InstallQuantity': '',
+        'InstallNote': _column(df, 'Notes')
+    })
+
+    if 'Finish' in df.columns:
+        hardware_export['Finish'] = df['Finish']
+
+    return hardware_export
+
+
+def build_door_type_sheet(door_type_products):
+    """Build the Items by Door Type sheet: one block per door type
+
+    Each block is a header row holding the door type in the Code column,
+    the door type's products, then a blank separator row. Products without
+    a door type are skipped.
+
+    Args:
+        door_type_products: ScheduleSummary.door_type_products
+
+    Returns:
+        DataFrame with DOOR_TYPE_SHEET_COLUMNS
+    """
+    items = door_type_products[door_type_products['Door Type'].notna() & (door_type_products['Door Type'] != '')]
+    if items.empty:
+        return pd.DataFrame(columns=DOOR_TYPE_SHEET_COLUMNS)
+
+    door_types = items['Door Type'].drop_duplicates()
+    headers = pd.DataFrame({'Door Type': door_types, 'Row': 0, 'Code': door_types,
+                            'Product Description': '', 'Total Quantity': ''})
+    products = pd.DataFrame({'Door Type': items['Door Type'], 'Row': 1, 'Code': items['Code'],
+                             'Product Description': items['Product Description'],
+                             'Total Quantity': items['Total Quantity'].fillna(0).astype(int)})
+    blanks = headers.assign(Row=2, Code='')
+
+    # The summary is already in door type order, so a stable sort on
+    # (door type, row kind) interleaves the blocks without reordering products
+    sheet = pd.concat([headers, products, blanks], ignore_index=True)
+    sheet = sheet.sort_values(['Door Type', 'Row'], kind='stable')
+    return sheet[DOOR_TYPE_SHEET_COLUMNS].reset_index(drop=True)
+
+
+def build_excel_export(df):
+    """Build the Complete Excel workbook of a schedule
+
+    Args:
+        df: Extracted DataFrame from any of the parsers
+
+    Returns:
+        The workbook as bytes, with Doors, Door Hardware, Product Summary,
+        Area Summary and (if any door types were extracted) Items by Door
+        Type sheets
+    """
+    summary = get_summary(df)
+    sheets = {
+        'Doors': build_doors_export(df),
+        'Door Hardware': build_hardware_export(df),
+        'Product Summary': summary.products,
+        'Area Summary': summary.area_by_type,
+    }
+
+    door_type_sheet = build_door_type_sheet(summary.door_type_products)
+    if not door_type_sheet.empty:
+        sheets['Items by Door Type'] = door_type_sheet
+
+    with stage('xlsx_write') as timing:
+        timing.rows += sum(len(frame) for frame in sheets.values())
+        return workbook_bytes(sheets)
+
+
+def iter_csv_chunks(frame, rows_per_chunk=CSV_ROWS_PER_CHUNK):
+    """Format a DataFrame as CSV a chunk of rows at a time
+
+    Args:
+        frame: DataFrame to export
+        rows_per_chunk: Rows formatted per chunk
+
+    Yields:
+        UTF-8 encoded CSV chunks, the first one starting with the header row
+    """
+    yield frame.iloc[:0].to_csv(index=False).encode()
+    for start in range(0, len(frame), rows_per_chunk):
+        chunk = frame.iloc[start:start + rows_per_chunk]
+        yield chunk.to_csv(index=False, header=False).encode()
+
+
+def write_csv(frame, path):
+    """Stream a DataFrame to a CSV file without formatting it in one piece"""
+    with open(path, 'wb') as f:
+        for chunk in iter_csv_chunks(frame):
+            f.write(chunk)
+
+
+def csv_bytes(frame):
+    """Format a DataFrame as CSV bytes (same output as to_csv(index=False))"""
+    with stage('csv_format') as timing:
+        timing.rows += len(frame)
+        return b''.join(iter_csv_chunks(frame))
+
+
+# Download artifacts by name: name -> function(df) returning the file contents
+EXPORT_BUILDERS = {
+    'doors_csv': lambda df: csv_bytes(build_doors_export(df)),
+    'hardware_csv': lambda df: csv_bytes(build_hardware_export(df)),
+    'excel': build_excel_export,
+    'dataset': dataset_bytes,
+}
+
+
+def get_export(df, name):
+    """Return a download artifact of a schedule, building it on first request
+
+    Args:
+        df: Extracted DataFrame from any of the parsers
+        name: Artifact name, one of EXPORT_BUILDERS
+
+    Returns:
+        The file contents as bytes, cached per dataset
+    """
+    build = EXPORT_BUILDERS[name]
+
+    def timed_build():
+        # Downloads are built on their own thread, so each build is its own run
+        with record_run('export', artifact=name, dataset=dataset_key(df)):
+            return build(df)
+
+    return dataset_cached(df, f'export:{name}', timed_build)
+
+
+def export_filenames(job_number):
+    """File names of the Doors and DoorHardware CSVs for a job
+
+    Returns:
+        Tuple of (doors_filename, hardware_filename)
+    """
+    if job_number:
+        return f"{job_number}_Doors.csv", f"{job_number}_DoorHardware.csv"
+    return "Doors.csv", "DoorHardware.csv"
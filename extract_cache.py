@@ -0,0 +1,300 @@
+"""
+Extraction Cache Module
+Content-hash result cache for uploaded schedules
+
+Streamlit reruns the whole app script on every widget change, which used
+to mean a full pdfplumber pass for every sidebar filter click. Results are
+keyed by the SHA-256 of the PDF bytes plus the parser version, held in an
+in-memory LRU (shared by all sessions of the server process) and backed by
+an on-disk layer that is trimmed to a size budget.
+
+Usage:
+    from extract_cache import cached_extract
+
+    df = cached_extract(pdf_buffer, PARSER_VERSION, lambda: extract(pdf_buffer))
+
+Bump the parser version whenever an extractor's output changes so stale
+results are never served.
+
+Results derived from an extracted DataFrame (summaries, exports, indexes)
+are memoized per dataset with dataset_cached(), keyed by a content hash of
+the frame.
+
+The text of individual pages is stored on disk too, keyed by a hash of the
+page's content (see page_text.py), so a revised schedule only has its
+changed pages extracted again.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from instrumentation import stage
+
+CACHE_DIR = os.environ.get("EXTRACT_CACHE_DIR", ".extract_cache")
+
+# Number of DataFrames kept in memory
+MEMORY_CACHE_ENTRIES = 16
+
+# Size budget for the on-disk layer, least recently used files go first
+DISK_CACHE_MAX_BYTES = int(os.environ.get("EXTRACT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Number of derived results (summaries, exports, ...) kept in memory
+DATASET_CACHE_ENTRIES = 64
+
+_memory_cache = OrderedDict()
+_dataset_cache = OrderedDict()
+_dataset_keys = {}
+_lock = threading.Lock()
+
+
+def cache_key(pdf_bytes, parser_version):
+    """Build the cache key for a PDF and parser version
+
+    Args:
+        pdf_bytes: Raw bytes of the uploaded PDF (any bytes-like object)
+        parser_version: Version string of the extractor, e.g. 'ara-2'
+
+    Returns:
+        Key string safe to use as a file name
+    """
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    safe_version = "".join(c if c.isalnum() or c in "-_." else "_" for c in parser_version)
+    return f"{safe_version}-{digest}"
+
+
+def _disk_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.pkl")
+
+
+def _memory_get(key):
+    with _lock:
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            return _memory_cache[key]
+    return None
+
+
+def _memory_put(key, result):
+    with _lock:
+        _memory_cache[key] = result
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+
+def _disk_get(key):
+    path = _disk_path(key)
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    # Touch the file so eviction treats it as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return result
+
+
+def _disk_write(key, result):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _disk_path(key)
+        # Write to a temp file first so readers never see a partial pickle
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The disk layer is best effort - a read-only or full disk must not
+        # break extraction
+        return False
+    return True
+
+
+def _disk_put(key, result):
+    if _disk_write(key, result):
+        _evict_disk()
+
+
+def _evict_disk():
+    """Delete least recently used cache files until under the size budget"""
+    try:
+        entries = []
+        for name in os.listdir(CACHE_DIR):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(CACHE_DIR, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= DISK_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _lookup(key):
+    result = _memory_get(key)
+    if result is None:
+        result = _disk_get(key)
+        if result is not None:
+            _memory_put(key, result)
+    return result
+
+
+def cached_result(pdf_bytes, parser_version):
+    """Return the cached extraction result for a PDF without extracting
+
+    Args:
+        pdf_bytes: Raw bytes of the uploaded PDF (any bytes-like object)
+        parser_version: Version string of the extractor
+
+    Returns:
+        The cached result, or None on a miss
+    """
+    with stage('cache_lookup'):
+        return _lookup(cache_key(pdf_bytes, parser_version))
+
+
+def cached_extract(pdf_bytes, parser_version, extract_fn):
+    """Return the extraction result for a PDF, running the parser only on a miss
+
+    Args:
+        pdf_bytes: Raw bytes of the uploaded PDF (any bytes-like object)
+        parser_version: Version string of the extractor
+        extract_fn: Zero-argument callable that runs the extraction
+
+    Returns:
+        The (possibly cached) result of extract_fn. Cached results are shared,
+        so callers must not modify them in place.
+    """
+    with stage('cache_lookup'):
+        key = cache_key(pdf_bytes, parser_version)
+        result = _lookup(key)
+    if result is not None:
+        return result
+
+    result = extract_fn()
+    with stage('cache_store'):
+        _disk_put(key, result)
+    _memory_put(key, result)
+    return result
+
+
+def get_page_texts(page_keys):
+    """Look up stored page texts by page content key
+
+    Args:
+        page_keys: One content key per page (see page_text.page_key); None
+            for pages that can't be looked up
+
+    Returns:
+        Dict of page number -> stored text, for the pages found
+    """
+    texts = {}
+    for page_num, key in enumerate(page_keys):
+        if key is None:
+            continue
+        # Stored wrapped in a tuple, since a page without text is None
+        entry = _disk_get(f"page-{key}")
+        if entry is not None:
+            texts[page_num] = entry[0]
+    return texts
+
+
+def put_page_texts(texts):
+    """Store extracted page texts
+
+    Args:
+        texts: Dict of page content key -> extracted text (or None)
+    """
+    written = False
+    for key, text in texts.items():
+        written |= _disk_write(f"page-{key}", (text,))
+    if written:
+        _evict_disk()
+
+
+def clear_cache():
+    """Drop every cached result, in memory and on disk"""
+    with _lock:
+        _memory_cache.clear()
+        _dataset_cache.clear()
+    try:
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(CACHE_DIR, name))
+    except OSError:
+        pass
+
+
+def dataset_key(df):
+    """Content hash of a DataFrame and its job details (df.attrs), remembered
+    for as long as the object lives
+
+    Args:
+        df: DataFrame to identify. It must not be modified in place after
+            the first call.
+
+    Returns:
+        Hex digest string
+    """
+    entry = _dataset_keys.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode())
+    # Exports embed the job number and name, so identical rows of two jobs
+    # must not share their cached exports
+    digest.update(repr(sorted(df.attrs.items())).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    key = digest.hexdigest()
+
+    df_id = id(df)
+    ref = weakref.ref(df, lambda _: _dataset_keys.pop(df_id, None))
+    _dataset_keys[df_id] = (ref, key)
+    return key
+
+
+def dataset_cached(df, name, build_fn):
+    """Return a result derived from df, building it once per dataset
+
+    Args:
+        df: Source DataFrame
+        name: Name of the derived result, e.g. 'summary'
+        build_fn: Zero-argument callable that builds the result
+
+    Returns:
+        The (possibly cached) result of build_fn. Cached results are shared,
+        so callers must not modify them in place.
+    """
+    key = (dataset_key(df), name)
+    with _lock:
+        if key in _dataset_cache:
+            _dataset_cache.move_to_end(key)
+            return _dataset_cache[key]
+
+    result = build_fn()
+
+    with _lock:
+        _dataset_cache[key] = result
+        while len(_dataset_cache) > DATASET_CACHE_ENTRIES:
+            _dataset_cache.popitem(last=False)
+    return result
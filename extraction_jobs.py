@@ -0,0 +1,248 @@
+"""
+Extraction Jobs Module
+Background extraction with page-level progress and cancellation
+
+Extraction used to run inside st.spinner, freezing the session for the
+whole parse: a corrected upload had to wait for the previous parse to
+finish. A schedule that isn't cached is now parsed by a job on a shared
+thread pool (page text extraction still fans out to worker processes, see
+page_text.py). The job is kept in the session state; the script shows its
+progress and stops, a fragment polls the job and reruns the app once it
+is done, and the next rerun picks up the result. A newer upload, or the
+Cancel button, cancels the job at the next page boundary.
+
+Usage:
+    from extraction_jobs import load_schedule
+
+    # Stops the script (showing progress) until the result is available
+    df = load_schedule(st.session_state, pdf_buffer, PARSER_VERSION, extract)
+"""
+
+import threading
+import uuid
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import streamlit as st
+
+from instrumentation import record_run
+
+# Extractions running at once across all sessions; more are queued
+JOB_WORKERS = 2
+
+# Seconds between progress refreshes while a job runs
+POLL_SECONDS = 1.0
+
+# Session state entry holding the session's current job
+SESSION_KEY = 'extraction_job'
+
+# Job states
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+
+_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='extraction')
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's extraction once the job has been cancelled"""
+
+
+class ExtractionJob:
+    """One background extraction
+
+    Args:
+        key: Identifies what is extracted, e.g. the cache key of the PDF
+        extract_fn: Callable extract_fn(progress) returning the result; it
+            must call progress(pages_done, page_count) after every page
+        label: Diagnostics run label (see instrumentation.record_run)
+        **tags: Extra diagnostics fields
+    """
+
+    def __init__(self, key, extract_fn, label='extraction', **tags):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.pages_done = 0
+        self.page_count = None
+        self.run = None
+        self._started = threading.Event()
+        self._cancelled = threading.Event()
+        self._future = _pool.submit(self._work, extract_fn, label, tags)
+
+    def _work(self, extract_fn, label, tags):
+        self._started.set()
+        with record_run(label, job=self.id, **tags) as run:
+            self.run = run
+            try:
+                return extract_fn(self.progress)
+            except JobCancelled:
+                pass
+            # Raised afresh outside the handler: the future keeps the error
+            # for as long as the job stays in the session, and the original
+            # traceback would keep the extraction's frames and data alive
+            raise JobCancelled(self.id)
+
+    def progress(self, pages_done, page_count):
+        """Progress callback for the extractor; raises JobCancelled once cancelled"""
+        if self._cancelled.is_set():
+            raise JobCancelled(self.id)
+        self.pages_done = pages_done
+        self.page_count = page_count
+
+    def cancel(self):
+        """Stop the job: a queued job never starts, a running one stops at the next page"""
+        self._cancelled.set()
+        self._future.cancel()
+
+    @property
+    def status(self):
+        if self._future.done():
+            if self._future.cancelled():
+                return CANCELLED
+            error = self._future.exception()
+            if error is None:
+                return DONE
+            return CANCELLED if isinstance(error, JobCancelled) else FAILED
+        if self._cancelled.is_set():
+            return CANCELLED
+        return RUNNING if self._started.is_set() else QUEUED
+
+    @property
+    def error(self):
+        """The exception a failed job raised, else None"""
+        return self._future.exception() if self.status == FAILED else None
+
+    def result(self):
+        """The extraction result of a finished job"""
+        try:
+            return self._future.result()
+        except (CancelledError, JobCancelled):
+            raise JobCancelled(self.id) from None
+
+
+def current_job(state, key=None, slot=SESSION_KEY):
+    """The session's job, optionally only if it is for key
+
+    Args:
+        slot: Session state entry of the job, for sessions running several
+    """
+    job = state.get(slot)
+    if job is None or (key is not None and job.key != key):
+        return None
+    return job
+
+
+def cancel_session_job(state, slot=SESSION_KEY):
+    """Cancel and forget the session's job, if any"""
+    job = state.pop(slot, None)
+    if job is not None:
+        job.cancel()
+
+
+def session_job(state, key, extract_fn, slot=SESSION_KEY, **tags):
+    """The session's job for key, started if needed
+
+    A job the session started for another upload is cancelled first.
+
+    Args:
+        state: st.session_state (or any dict-like)
+        key: Identifies the upload, e.g. extract_cache.cache_key(...)
+        extract_fn: See ExtractionJob
+        slot: Session state entry of the job (see current_job)
+        **tags: See ExtractionJob
+
+    Returns:
+        ExtractionJob
+    """
+    job = current_job(state, key, slot)
+    if job is None:
+        cancel_session_job(state, slot)
+        job = state[slot] = ExtractionJob(key, extract_fn, **tags)
+    return job
+
+
+def job_result(state, job, message="Extracting data from PDF...", slot=SESSION_KEY):
+    """Return a finished job's result, or show the job's state and stop the script
+
+    While the job is queued or running a progress bar with a Cancel button
+    is shown and refreshed in place; the app reruns once the job finishes.
+    """
+    status = job.status
+    if status == DONE:
+        return job.result()
+
+    if status == FAILED:
+        st.error(f"⚠️ Extraction failed: {job.error}")
+        if st.button("Retry extraction", key=f"{slot}_retry"):
+            state.pop(slot, None)
+            st.rerun()
+        st.stop()
+
+    if status == CANCELLED:
+        st.info("Extraction cancelled.")
+        if st.button("Restart extraction", key=f"{slot}_restart"):
+            state.pop(slot, None)
+            st.rerun()
+        st.stop()
+
+    @st.fragment(run_every=POLL_SECONDS)
+    def show_progress():
+        if job.status != RUNNING and job.status != QUEUED:
+            st.rerun()
+
+        if job.page_count:
+            st.progress(job.pages_done / job.page_count,
+                        text=f"{message} Page {job.pages_done} of {job.page_count}")
+        else:
+            st.progress(0.0, text=message if job.status == RUNNING else "Waiting for another extraction to finish...")
+        if st.button("Cancel", key=f"{slot}_cancel"):
+            job.cancel()
+            st.rerun()
+
+    show_progress()
+    st.stop()
+
+
+def start_schedule(state, pdf_bytes, parser_version, extract, slot=SESSION_KEY, **tags):
+    """Start extracting a schedule in the background unless it is cached
+
+    Args:
+        state: st.session_state
+        pdf_bytes: The uploaded PDF (any bytes-like object)
+        parser_version: Version string of the extractor
+        extract: Extractor called as extract(pdf_bytes, progress=callback)
+        slot: Session state entry of the job (see current_job)
+        **tags: Extra diagnostics fields for the job, e.g. file=name
+
+    Returns:
+        Tuple of (result, job): the cached result and None, or None and
+        the job extracting it
+    """
+    # The cache needs pandas; the landing page only cancels jobs
+    from extract_cache import cache_key, cached_extract, cached_result
+
+    result = cached_result(pdf_bytes, parser_version)
+    key = cache_key(pdf_bytes, parser_version)
+    if result is not None:
+        # Cached already, so a job for an earlier upload is no longer wanted
+        if current_job(state, key, slot) is None:
+            cancel_session_job(state, slot)
+        return result, None
+
+    def run_extraction(progress):
+        return cached_extract(pdf_bytes, parser_version, lambda: extract(pdf_bytes, progress=progress))
+
+    return None, session_job(state, key, run_extraction, slot=slot, parser=parser_version, **tags)
+
+
+def load_schedule(state, pdf_bytes, parser_version, extract, slot=SESSION_KEY, **tags):
+    """Return the extracted schedule, from the cache or a background job
+
+    Args:
+        See start_schedule
+
+    Returns:
+        The extraction result. Until it is available the job's progress is
+        shown and the script stops (see job_result).
+    """
+    result, job = start_schedule(state, pdf_bytes, parser_version, extract, slot=slot, **tags)
+    if job is None:
+        return result
+    return job_result(state, job, slot=slot)
@@ -0,0 +1,119 @@
+"""
+Filter Engine Module
+Inverted indexes behind the sidebar filters
+
+Every widget change reruns the app, which used to copy the whole dataset
+and run a full-column string comparison per filter. The index is built
+once per dataset: each filter column maps every value to the sorted row
+positions holding it, and the option lists come sorted for free. A filter
+combination is answered by intersecting those position arrays, smallest
+first, and only the matching rows are taken from the DataFrame.
+
+Usage:
+    from filter_engine import ALL, get_filter_index
+
+    filters = get_filter_index(df, ['Area', 'Door'])
+    areas = [ALL] + filters.options('Area')
+    filtered_df = filters.filter({'Area': selected_area, 'Door': ALL})
+"""
+
+import numpy as np
+import pandas as pd
+
+from extract_cache import dataset_cached
+from instrumentation import stage
+
+# Selection value meaning "don't filter on this column"
+ALL = 'All'
+
+
+class FilterIndex:
+    """Inverted indexes of a DataFrame's filter columns
+
+    Args:
+        df: DataFrame to index. It must not be modified afterwards.
+        columns: Names of the columns to index; missing ones are skipped
+    """
+
+    def __init__(self, df, columns):
+        self.df = df
+        self._positions = {}
+        self._options = {}
+
+        with stage('filter_index') as timing:
+            timing.rows += len(df)
+            self._index(columns)
+
+    def _index(self, columns):
+        df = self.df
+        for column in columns:
+            if column not in df.columns:
+                continue
+
+            # Missing values get code -1 and are left out of the index,
+            # like dropna() did for the option lists
+            codes, values = pd.factorize(df[column], sort=True)
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            start = np.count_nonzero(codes < 0)
+            bounds = start + np.concatenate(([0], np.cumsum(counts)))
+
+            values = np.asarray(values, dtype=object).tolist()
+            self._options[column] = values
+            self._positions[column] = {
+                value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(values)
+            }
+
+    def options(self, column):
+        """Sorted distinct non-missing values of an indexed column"""
+        return list(self._options.get(column, []))
+
+    def positions(self, selections):
+        """Row positions matching every selection
+
+        Args:
+            selections: Dict of column -> selected value; ALL (or None)
+                leaves a column unfiltered
+
+        Returns:
+            Sorted array of row positions, or None if nothing is filtered
+        """
+        empty = np.empty(0, dtype=np.intp)
+        matches = []
+        for column, value in selections.items():
+            if value is None or value == ALL:
+                continue
+            if column not in self._positions:
+                raise KeyError(f"Column is not indexed: {column}")
+            matches.append(self._positions[column].get(value, empty))
+
+        if not matches:
+            return None
+
+        matches.sort(key=len)
+        result = matches[0]
+        for other in matches[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+    def filter(self, selections):
+        """Rows of the DataFrame matching every selection
+
+        Returns:
+            The indexed DataFrame itself when nothing is filtered (no copy),
+            otherwise just the matching rows
+        """
+        with stage('filter') as timing:
+            rows = self.positions(selections)
+            if rows is None:
+                timing.rows += len(self.df)
+                return self.df
+            timing.rows += len(rows)
+            return self.df.take(rows)
+
+
+def get_filter_index(df, columns):
+    """Return the FilterIndex of df for columns, built once per dataset"""
+    return dataset_cached(df, f"filter_index:{','.join(columns)}", lambda: FilterIndex(df, columns))
@@ -0,0 +1,295 @@
+"""
+Instrumentation Module
+Per-stage timing and memory diagnostics for the extraction and export paths
+
+Stages (opening the PDF, page text extraction, regex parsing, DataFrame
+construction, summaries, exports, ...) are timed with stage() blocks in the
+modules that run them. A stage records its wall time and CPU time exclusive
+of any nested stage, the process's peak RSS, and the page and row counts
+it reports. Stages only record while a run is active in the current
+context, so instrumented code costs a context variable lookup otherwise.
+
+Each finished run is written to the "diagnostics" logger as one JSON line
+per stage plus one for the run, to stderr by default or to the file named
+by the DIAGNOSTICS_LOG environment variable.
+
+The apps time their landing page as a 'startup' run and check it against
+a budget (see startup_report), so a new replica that has to import its
+dependencies before it can answer shows up in the logs. This module is
+imported by the landing page and so doesn't import pandas itself.
+
+Usage:
+    from instrumentation import record_run, stage
+
+    with record_run('ara', file='schedule.pdf') as run:
+        with stage('parse') as timing:
+            ...
+            timing.pages += 1
+            timing.rows += len(products)
+
+    diagnostics_frame([run])
+"""
+
+import contextvars
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# Finished runs kept for the Diagnostics panel (e.g. exports built on the
+# download thread)
+RECENT_RUNS = 50
+
+# Seconds a landing page may take to render, imports included; set the
+# STARTUP_BUDGET environment variable to change it
+STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET', '0.5'))
+
+# Dependencies the landing page should not load: they are only needed
+# once a schedule is uploaded or exported
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'pdfplumber', 'pdfminer', 'openpyxl')
+
+logger = logging.getLogger('diagnostics')
+if not logger.handlers:
+    _log_path = os.environ.get('DIAGNOSTICS_LOG')
+    _handler = logging.FileHandler(_log_path) if _log_path else logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current_run = contextvars.ContextVar('diagnostics_run', default=None)
+_recent_runs = deque(maxlen=RECENT_RUNS)
+_lock = threading.Lock()
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process and its finished children, in MB"""
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageTiming:
+    """Accumulated measurements of one named stage within a run"""
+    __slots__ = ('name', 'calls', 'wall_seconds', 'cpu_seconds', 'peak_rss_mb', 'pages', 'rows')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_mb = 0.0
+        self.pages = 0
+        self.rows = 0
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'wall_s': round(self.wall_seconds, 4),
+            'cpu_s': round(self.cpu_seconds, 4),
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'pages': self.pages,
+            'rows': self.rows,
+        }
+
+
+class Run:
+    """One instrumented unit of work, e.g. an app rerun or an export build"""
+
+    def __init__(self, label, tags):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.tags = tags
+        self.stages = {}
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.finished = False
+        self._stack = []
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    def finish(self):
+        """Stop the clock, log the run and keep it for recent_runs() (idempotent)"""
+        if self.finished:
+            return
+        self.finished = True
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        self.cpu_seconds = time.process_time() - self._cpu_start
+
+        base = {'run': self.id, 'label': self.label, **self.tags}
+        for timing in self.stages.values():
+            logger.info(json.dumps({'event': 'stage', **base, **timing.as_dict()}, default=str))
+        logger.info(json.dumps({
+            'event': 'run', **base,
+            'wall_s': round(self.wall_seconds, 4),
+            'cpu_s': round(self.cpu_seconds, 4),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }, default=str))
+
+        with _lock:
+            _recent_runs.append(self)
+
+
+def start_run(label, **tags):
+    """Start a run and make it the active one in this context
+
+    Any run left active by an interrupted script (e.g. st.stop()) is replaced.
+
+    Args:
+        label: What the run is, e.g. 'ara' or 'export'
+        **tags: Extra fields for the log lines, e.g. file='schedule.pdf'
+
+    Returns:
+        The Run; pass it to finish_run() when done
+    """
+    run = Run(label, tags)
+    _current_run.set(run)
+    return run
+
+
+def finish_run(run):
+    """Finish a run started with start_run() and deactivate it"""
+    if _current_run.get() is run:
+        _current_run.set(None)
+    run.finish()
+
+
+@contextmanager
+def record_run(label, **tags):
+    """Record a run around a block (see start_run)
+
+    Inside another run the block is recorded as a stage of that run instead.
+    """
+    if _current_run.get() is not None:
+        with stage(label):
+            yield _current_run.get()
+        return
+
+    run = Run(label, tags)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        run.finish()
+
+
+@contextmanager
+def stage(name):
+    """Time a block as the named stage of the active run
+
+    Yields:
+        The stage's StageTiming, whose pages and rows counts the block can
+        add to. Without an active run a throwaway StageTiming is yielded.
+    """
+    run = _current_run.get()
+    if run is None:
+        yield StageTiming(name)
+        return
+
+    timing = run.stages.get(name)
+    if timing is None:
+        timing = run.stages[name] = StageTiming(name)
+
+    # Time spent in nested stages, subtracted so each stage's time is its own
+    nested = [0.0, 0.0]
+    run._stack.append(nested)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield timing
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        run._stack.pop()
+        if run._stack:
+            run._stack[-1][0] += wall
+            run._stack[-1][1] += cpu
+
+        timing.calls += 1
+        timing.wall_seconds += wall - nested[0]
+        timing.cpu_seconds += cpu - nested[1]
+        timing.peak_rss_mb = max(timing.peak_rss_mb, peak_rss_mb())
+
+
+def recent_runs(label=None, **tags):
+    """Finished runs, oldest first, optionally filtered by label and tags"""
+    with _lock:
+        runs = list(_recent_runs)
+    return [run for run in runs
+            if (label is None or run.label == label)
+            and all(run.tags.get(key) == value for key, value in tags.items())]
+
+
+def diagnostics_frame(runs):
+    """One row per stage of the given runs, for display
+
+    Returns:
+        DataFrame with Run, Stage, Calls, Wall (s), CPU (s), Peak RSS (MB),
+        Pages and Rows columns, plus a total row per finished run
+    """
+    import pandas as pd
+
+    rows = []
+    for run in runs:
+        name = run.label
+        if 'artifact' in run.tags:
+            name = f"{run.label}: {run.tags['artifact']}"
+        for timing in run.stages.values():
+            rows.append({
+                'Run': name,
+                'Stage': timing.name,
+                'Calls': timing.calls,
+                'Wall (s)': round(timing.wall_seconds, 4),
+                'CPU (s)': round(timing.cpu_seconds, 4),
+                'Peak RSS (MB)': round(timing.peak_rss_mb, 1),
+                'Pages': timing.pages,
+                'Rows': timing.rows,
+            })
+        if run.finished:
+            rows.append({
+                'Run': name,
+                'Stage': 'total',
+                'Calls': 1,
+                'Wall (s)': round(run.wall_seconds, 4),
+                'CPU (s)': round(run.cpu_seconds, 4),
+                'Peak RSS (MB)': round(max((t.peak_rss_mb for t in run.stages.values()), default=0.0), 1),
+                'Pages': max((t.pages for t in run.stages.values()), default=0),
+                'Rows': max((t.rows for t in run.stages.values()), default=0),
+            })
+    return pd.DataFrame(rows, columns=['Run', 'Stage', 'Calls', 'Wall (s)', 'CPU (s)',
+                                       'Peak RSS (MB)', 'Pages', 'Rows'])
+
+
+def startup_report(run):
+    """Check a finished landing page run against the startup budget
+
+    Logs a 'startup' line with the run's time, the budget and the heavy
+    dependencies already loaded in the process (none, on a replica's
+    first page load, unless something imports them too early).
+
+    Args:
+        run: The finished run of the landing page
+
+    Returns:
+        One-line summary for the page
+    """
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    within_budget = run.wall_seconds <= STARTUP_BUDGET_SECONDS
+    logger.info(json.dumps({
+        'event': 'startup', 'run': run.id, 'label': run.label, **run.tags,
+        'wall_s': round(run.wall_seconds, 4),
+        'budget_s': STARTUP_BUDGET_SECONDS,
+        'within_budget': within_budget,
+        'heavy_modules': loaded,
+    }, default=str))
+    status = "within" if within_budget else "over"
+    return f"Page ready in {run.wall_seconds:.2f}s ({status} the {STARTUP_BUDGET_SECONDS:.2f}s startup budget)"
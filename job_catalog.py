@@ -0,0 +1,351 @@
+"""
+Job Catalog Module
+Local SQLite catalog of extracted jobs for cross-job queries
+
+An extraction lived only as long as its session, so questions across
+jobs ("how many 8492-MSB over every active job", "which jobs use
+LW10075LLSSS") meant uploading every PDF again. Jobs saved to the catalog
+keep their door and product records in a SQLite file, normalized like
+records.RecordStore: a jobs table, a doors table with the door-level
+columns, and a products table pointing at its door. Code, Door, Area,
+Door Type and job number are indexed (case-insensitively), so a lookup
+across hundreds of jobs is a few index probes.
+
+Saving a job replaces the earlier version of the same job: by job number,
+else by source file name (a schedule without a job number re-extracted
+from a revised PDF of the same name), else by content. Each call to
+ingest_jobs() is a single transaction, however many jobs it saves.
+
+Usage:
+    from job_catalog import find_products, ingest_job, product_usage
+
+    ingest_job(df, vendor='ara', source='schedule.pdf')
+    product_usage(code='8492-MSB')    # per job: doors and total quantity
+    find_products(code='LW10075LLSSS', area='Block C')
+
+    python job_catalog.py exports/*/*.arrow    # saved datasets, see job_dataset.py
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from extract_cache import dataset_key
+from instrumentation import stage
+from records import normalize_columns
+
+CATALOG_PATH = os.environ.get("JOB_CATALOG", "job_catalog.sqlite")
+
+# Rows returned by find_products() unless asked for more
+QUERY_ROW_LIMIT = 5000
+
+# Catalog column by extracted column, for door-level and product-level data
+DOOR_COLUMNS = {
+    'Door': 'door',
+    'Area': 'area',
+    'Description': 'description',
+    'Door Type': 'door_type',
+    'Rating': 'rating',
+    'Handing': 'handing',
+}
+PRODUCT_COLUMNS = {
+    'Code': 'code',
+    'Product Description': 'product_description',
+    'Quantity': 'quantity',
+    'Finish': 'finish',
+    'Notes': 'notes',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY,
+    job_key TEXT NOT NULL UNIQUE,
+    job_number TEXT COLLATE NOCASE,
+    job_name TEXT,
+    vendor TEXT,
+    source TEXT,
+    doors INTEGER NOT NULL,
+    products INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS doors (
+    door_id INTEGER PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    door TEXT COLLATE NOCASE,
+    area TEXT COLLATE NOCASE,
+    description TEXT,
+    door_type TEXT COLLATE NOCASE,
+    rating TEXT,
+    handing TEXT
+);
+CREATE TABLE IF NOT EXISTS products (
+    door_id INTEGER NOT NULL REFERENCES doors(door_id) ON DELETE CASCADE,
+    job_id INTEGER NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    code TEXT COLLATE NOCASE,
+    product_description TEXT,
+    quantity INTEGER,
+    finish TEXT,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_job_number ON jobs(job_number);
+CREATE INDEX IF NOT EXISTS doors_job ON doors(job_id);
+CREATE INDEX IF NOT EXISTS doors_door ON doors(door);
+CREATE INDEX IF NOT EXISTS doors_area ON doors(area);
+CREATE INDEX IF NOT EXISTS doors_door_type ON doors(door_type);
+CREATE INDEX IF NOT EXISTS products_code ON products(code);
+CREATE INDEX IF NOT EXISTS products_door ON products(door_id);
+CREATE INDEX IF NOT EXISTS products_job ON products(job_id);
+"""
+
+# Query filters: keyword -> column they match
+FILTERS = {
+    'code': 'p.code',
+    'door': 'd.door',
+    'area': 'd.area',
+    'door_type': 'd.door_type',
+    'job_number': 'j.job_number',
+}
+
+
+class CatalogJob(NamedTuple):
+    """An extracted job to save in the catalog"""
+    frame: pd.DataFrame            # extracted DataFrame, job info in attrs
+    vendor: Optional[str] = None   # vendor key, e.g. 'ara'
+    source: Optional[str] = None   # file it was extracted from
+
+
+def connect(path=None):
+    """Open the catalog, creating its tables on first use
+
+    Args:
+        path: Catalog file, default CATALOG_PATH
+
+    Returns:
+        sqlite3.Connection; use `with closing(...)` to close it
+    """
+    connection = sqlite3.connect(path or CATALOG_PATH, timeout=30)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _values(frame, columns):
+    """Rows of the given columns as tuples of Python values (None for missing)"""
+    present = {name: column for name, column in columns.items() if name in frame.columns}
+    values = pd.DataFrame({
+        column: frame[name].astype(object).where(frame[name].notna(), None)
+        for name, column in present.items()
+    })
+    return list(present.values()), values
+
+
+def job_key(df, source=None):
+    """Catalog identity of a job: its job number, else its source file, else its content"""
+    job_number = df.attrs.get('job_number')
+    if job_number:
+        return f"job:{job_number}"
+    return f"source:{source}" if source else f"dataset:{dataset_key(df)}"
+
+
+def _insert_job(connection, job, ingested_at):
+    df = normalize_columns(job.frame)
+    key = job_key(job.frame, job.source)
+    connection.execute("DELETE FROM jobs WHERE job_key = ?", (key,))
+
+    door_codes, door_labels = pd.factorize(df['Door'], use_na_sentinel=False)
+    cursor = connection.execute(
+        "INSERT INTO jobs (job_key, job_number, job_name, vendor, source, doors, products, ingested_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, df.attrs.get('job_number') or None, df.attrs.get('job_name') or None, job.vendor, job.source,
+         len(door_labels), len(df), ingested_at))
+    job_id = cursor.lastrowid
+
+    # Door ids are allotted as one block after the highest in use, so
+    # products can point at theirs by factorized door code
+    first_id = connection.execute("SELECT COALESCE(MAX(door_id), 0) + 1 FROM doors").fetchone()[0]
+    _, first_rows = np.unique(door_codes, return_index=True)
+    door_columns, door_values = _values(df.iloc[first_rows], DOOR_COLUMNS)
+    door_values.insert(0, 'door_id', first_id + door_codes[first_rows])
+    door_values.insert(1, 'job_id', job_id)
+    connection.executemany(
+        f"INSERT INTO doors (door_id, job_id, {', '.join(door_columns)}) "
+        f"VALUES ({', '.join('?' * (len(door_columns) + 2))})",
+        door_values.itertuples(index=False, name=None))
+
+    product_columns, product_values = _values(df, PRODUCT_COLUMNS)
+    product_values.insert(0, 'door_id', first_id + door_codes)
+    product_values.insert(1, 'job_id', job_id)
+    connection.executemany(
+        f"INSERT INTO products (door_id, job_id, {', '.join(product_columns)}) "
+        f"VALUES ({', '.join('?' * (len(product_columns) + 2))})",
+        product_values.itertuples(index=False, name=None))
+    return len(df)
+
+
+def ingest_jobs(jobs, path=None):
+    """Save extracted jobs in the catalog, in one transaction
+
+    Args:
+        jobs: Iterable of CatalogJob; empty frames are skipped
+        path: Catalog file, default CATALOG_PATH
+
+    Returns:
+        Number of jobs saved
+    """
+    ingested_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    saved = 0
+    with stage('catalog_ingest') as timing, closing(connect(path)) as connection:
+        with connection:
+            for job in jobs:
+                if job.frame.empty:
+                    continue
+                timing.rows += _insert_job(connection, job, ingested_at)
+                saved += 1
+    return saved
+
+
+def ingest_job(df, vendor=None, source=None, path=None):
+    """Save one extracted job in the catalog (see ingest_jobs)"""
+    return ingest_jobs([CatalogJob(df, vendor, source)], path=path)
+
+
+def remove_job(key, path=None):
+    """Remove a job, with its doors and products, from the catalog"""
+    with closing(connect(path)) as connection, connection:
+        connection.execute("DELETE FROM jobs WHERE job_key = ?", (key,))
+
+
+def list_jobs(path=None):
+    """The jobs in the catalog, most recently saved first
+
+    Returns:
+        DataFrame with Job Key, Job Number, Job Name, Vendor, Source, Doors,
+        Products and Saved columns
+    """
+    with closing(connect(path)) as connection:
+        return pd.read_sql_query(
+            "SELECT job_key AS 'Job Key', job_number AS 'Job Number', job_name AS 'Job Name', "
+            "vendor AS 'Vendor', source AS 'Source', doors AS 'Doors', products AS 'Products', "
+            "ingested_at AS 'Saved' FROM jobs ORDER BY ingested_at DESC, job_id DESC",
+            connection)
+
+
+def _where(filters):
+    """SQL condition and parameters of query filters; empty filters are ignored"""
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        raise TypeError(f"Unknown catalog filter(s): {', '.join(sorted(unknown))}")
+    conditions = [(FILTERS[name], value) for name, value in filters.items() if value not in (None, '')]
+    if not conditions:
+        return "1", []
+    return " AND ".join(f"{column} = ?" for column, _ in conditions), [value for _, value in conditions]
+
+
+_JOINS = "products p JOIN doors d ON d.door_id = p.door_id JOIN jobs j ON j.job_id = p.job_id"
+
+
+def _query(sql, params, path):
+    with stage('catalog_query') as timing, closing(connect(path)) as connection:
+        result = pd.read_sql_query(sql, connection, params=params)
+        timing.rows += len(result)
+    return result
+
+
+def find_products(path=None, limit=QUERY_ROW_LIMIT, **filters):
+    """Product lines across all jobs, matching every given filter
+
+    Args:
+        path: Catalog file, default CATALOG_PATH
+        limit: Maximum number of rows returned
+        **filters: Exact values (case-insensitive) for code, door, area,
+            door_type and job_number
+
+    Returns:
+        DataFrame with Job Number (the source file for jobs without one),
+        Job Name, Door, Area, Door Type, Code, Product Description and
+        Quantity columns
+    """
+    where, params = _where(filters)
+    return _query(
+        "SELECT COALESCE(j.job_number, j.source) AS 'Job Number', j.job_name AS 'Job Name', d.door AS 'Door', d.area AS 'Area', "
+        "d.door_type AS 'Door Type', p.code AS 'Code', p.product_description AS 'Product Description', "
+        f"p.quantity AS 'Quantity' FROM {_JOINS} WHERE {where} "
+        "ORDER BY 1, d.door_id, p.rowid LIMIT ?",
+        params + [limit], path)
+
+
+def product_usage(path=None, **filters):
+    """Doors and total quantity per job of the product lines matching the filters
+
+    Args:
+        path: Catalog file, default CATALOG_PATH
+        **filters: See find_products
+
+    Returns:
+        DataFrame with Job Number (as in find_products), Job Name, Doors,
+        Product Lines and Total Quantity columns, one row per job that has
+        matching lines
+    """
+    where, params = _where(filters)
+    return _query(
+        "SELECT COALESCE(j.job_number, j.source) AS 'Job Number', j.job_name AS 'Job Name', COUNT(DISTINCT p.door_id) AS 'Doors', "
+        "COUNT(*) AS 'Product Lines', COALESCE(SUM(p.quantity), 0) AS 'Total Quantity' "
+        f"FROM {_JOINS} WHERE {where} GROUP BY j.job_id ORDER BY 1",
+        params, path)
+
+
+def job_product_lines(keys, path=None):
+    """Every product line of the given jobs, for rollups across jobs
+
+    Args:
+        keys: Job keys (see list_jobs)
+        path: Catalog file, default CATALOG_PATH
+
+    Returns:
+        DataFrame with Job Key, Code, Product Description and Quantity
+        columns
+    """
+    keys = list(keys)
+    return _query(
+        "SELECT j.job_key AS 'Job Key', p.code AS 'Code', p.product_description AS 'Product Description', "
+        "p.quantity AS 'Quantity' FROM products p JOIN jobs j ON j.job_id = p.job_id "
+        f"WHERE j.job_key IN ({', '.join('?' * len(keys))})",
+        keys, path)
+
+
+def _dataset_source(path):
+    """Source name of a saved dataset: its file name, with its folder when
+    that is the generic one (batch_extract.py names the folder after the PDF)"""
+    from job_dataset import DATASET_SUFFIXES, dataset_filename
+
+    name = os.path.basename(path)
+    if name in (dataset_filename(None, suffix) for suffix in DATASET_SUFFIXES):
+        folder = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        return f"{folder}/{name}" if folder else name
+    return name
+
+
+def main(argv=None):
+    from job_dataset import dataset_filename, load_dataset
+
+    parser = argparse.ArgumentParser(description="Save extracted job datasets in the job catalog")
+    parser.add_argument('datasets', nargs='+', help=f"Saved datasets, e.g. {dataset_filename('T012345')}")
+    parser.add_argument('--catalog', default=None, help=f"Catalog file (default: {CATALOG_PATH})")
+    args = parser.parse_args(argv)
+
+    jobs = (CatalogJob(load_dataset(path), source=_dataset_source(path)) for path in args.datasets)
+    saved = ingest_jobs(jobs, path=args.catalog)
+    print(f"Saved {saved} of {len(args.datasets)} job(s) to {args.catalog or CATALOG_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
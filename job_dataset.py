@@ -0,0 +1,168 @@
+"""
+Job Dataset Module
+Columnar save and load of extracted schedules (Arrow IPC and Parquet)
+
+CSV and xlsx exports are slow to write and to read back, and they lose
+the column types and the job details, so reopening a past job meant
+parsing its PDF again. A job's extracted DataFrame is saved here in a
+columnar file instead: text columns stay dictionary encoded, like the
+categoricals the extractors produce, Quantity stays an integer column,
+and df.attrs (job_number, job_name) is written to the file's schema
+metadata.
+
+The format follows the file suffix:
+
+    .arrow    Arrow IPC file, uncompressed. Read through a memory map, so
+              opening even a large job only maps the file, and the pages
+              of the columns that are used are the only ones read.
+    .parquet  Parquet, compressed. Smaller, and readable by most data
+              tools; read with a memory map too, but decoded on load.
+
+Either way only the requested columns are loaded.
+
+Usage:
+    from job_dataset import dataset_attrs, load_dataset, save_dataset
+
+    save_dataset(df, "T012345_schedule.arrow")
+    df = load_dataset("T012345_schedule.arrow")
+    codes = load_dataset("T012345_schedule.arrow", columns=['Code', 'Quantity'])
+    dataset_attrs("T012345_schedule.arrow")  # job details, without the data
+"""
+
+import json
+import os
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Schema metadata key holding df.attrs as JSON
+ATTRS_KEY = b'schedule.attrs'
+
+# File suffixes by format
+ARROW_SUFFIX = '.arrow'
+PARQUET_SUFFIX = '.parquet'
+DATASET_SUFFIXES = (ARROW_SUFFIX, PARQUET_SUFFIX)
+
+ARROW_MIME = "application/vnd.apache.arrow.file"
+
+PARQUET_COMPRESSION = 'zstd'
+
+
+def _format(path):
+    """Dataset format of a path, from its suffix"""
+    suffix = os.path.splitext(str(path))[1].lower()
+    if suffix not in DATASET_SUFFIXES:
+        raise ValueError(f"Unknown dataset format '{suffix}', expected one of {', '.join(DATASET_SUFFIXES)}")
+    return suffix
+
+
+def dataset_filename(job_number, suffix=ARROW_SUFFIX):
+    """File name of a job's saved dataset"""
+    return f"{job_number}_schedule{suffix}" if job_number else f"schedule{suffix}"
+
+
+def to_table(df):
+    """Arrow table of an extracted DataFrame, with df.attrs in its metadata
+
+    Args:
+        df: Extracted DataFrame from any of the parsers
+
+    Returns:
+        pyarrow.Table
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[ATTRS_KEY] = json.dumps(df.attrs, default=str).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def _table_attrs(schema):
+    """df.attrs stored in a schema's metadata ({} if there are none)"""
+    raw = (schema.metadata or {}).get(ATTRS_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def to_dataframe(table):
+    """DataFrame of an Arrow table written by to_table, with its attrs restored"""
+    df = table.to_pandas()
+    df.attrs = _table_attrs(table.schema)
+    return df
+
+
+def _write(table, sink, suffix):
+    if suffix == PARQUET_SUFFIX:
+        pq.write_table(table, sink, compression=PARQUET_COMPRESSION)
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def save_dataset(df, path):
+    """Save an extracted DataFrame, with its job details
+
+    Args:
+        df: Extracted DataFrame from any of the parsers
+        path: Output file; the suffix (.arrow or .parquet) picks the format
+    """
+    suffix = _format(path)
+    table = to_table(df)
+    # Write to a temp file first so readers never see a partial dataset
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        _write(table, tmp_path, suffix)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def dataset_bytes(df, suffix=ARROW_SUFFIX):
+    """A saved dataset as bytes, e.g. for a download button"""
+    sink = pa.BufferOutputStream()
+    _write(to_table(df), sink, suffix)
+    return sink.getvalue().to_pybytes()
+
+
+def read_table(path, columns=None):
+    """Open a saved dataset as an Arrow table, memory mapped
+
+    Args:
+        path: Saved dataset (.arrow or .parquet)
+        columns: Names of the columns to read, default all
+
+    Returns:
+        pyarrow.Table. For .arrow files its buffers point into the mapped
+        file, so nothing is read until the data is used.
+    """
+    if _format(path) == PARQUET_SUFFIX:
+        return pq.read_table(path, columns=columns, memory_map=True)
+    with pa.memory_map(str(path), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def load_dataset(path, columns=None):
+    """Load a saved dataset as the DataFrame it was saved from
+
+    Args:
+        path: Saved dataset (.arrow or .parquet)
+        columns: Names of the columns to load, default all
+
+    Returns:
+        DataFrame with the saved column types and df.attrs
+    """
+    return to_dataframe(read_table(path, columns))
+
+
+def dataset_schema(path):
+    """Arrow schema of a saved dataset (column names and types), without the data"""
+    if _format(path) == PARQUET_SUFFIX:
+        return pq.read_schema(path)
+    with pa.memory_map(str(path), 'r') as source:
+        return pa.ipc.open_file(source).schema
+
+
+def dataset_attrs(path):
+    """Job details (df.attrs) of a saved dataset, read from its schema only"""
+    return _table_attrs(dataset_schema(path))
@@ -0,0 +1,113 @@
+"""
+Line Classifier Module
+Precompiled, single-pass line classification shared by all three parsers
+
+Each vendor's line patterns are compiled once into a single alternation of
+named groups, so every line of a schedule is classified with one regex
+call instead of a chain of re.match() calls. Alternatives are tried in the
+order given, which keeps the same precedence as the old if/continue chains.
+
+Usage:
+    from line_classifier import ARA_LINES
+
+    kind, match = ARA_LINES.classify(line)
+    if kind == 'door':
+        door_id = match.group('door_id')
+"""
+
+import re
+
+
+class LineClassifier:
+    """Classify text lines against an ordered set of named patterns"""
+
+    def __init__(self, rules):
+        """
+        Args:
+            rules: List of (kind, pattern) tuples in priority order. Patterns
+                are matched from the start of the line and may contain their
+                own named groups, which must be unique across all rules.
+        """
+        self.kinds = [kind for kind, _ in rules]
+        self._regex = re.compile('|'.join(f'(?P<{kind}>{pattern})' for kind, pattern in rules))
+
+    def classify(self, line):
+        """Classify a single (already stripped) line
+
+        Returns:
+            Tuple of (kind, match), or (None, None) if no rule matches
+        """
+        match = self._regex.match(line)
+        if match is None:
+            return None, None
+        # The outer group of a rule closes after its inner groups, so
+        # lastgroup is always the rule name
+        return match.lastgroup, match
+
+
+# ---------------------------------------------------------------------------
+# ARA format (app_ara.py)
+# ---------------------------------------------------------------------------
+
+# Door IDs: 8.C.ED-02, 14.E.ID-01, 16.B.ID-03, 001.D001A, D005A, etc.
+ARA_DOOR_ID = r'(?:\d+\.[A-Z]\.[EI]D-\d+|\d+\.D\d+[A-Z]?|D\d+[A-Z]{1,2})'
+
+ARA_HEADER_LINES = frozenset(['Code Description Product', 'Door Area Description Rating Handing Door Type'])
+
+ARA_LINES = LineClassifier([
+    # Block section headers (e.g., "Block C - 2B-T08-S", "Block E - 3B-ALT-N")
+    ('block', r'Block [A-Z] - [\w-]+$'),
+    ('notes', r'Notes:'),
+    ('door', rf'(?P<door_id>{ARA_DOOR_ID})\s+(?P<door_rest>.+)$'),
+    ('product', r'(?P<code>[A-Z0-9\-/\.]+)\s+(?P<product_desc>.+?)\s+(?P<quantity>\d+)$'),
+])
+
+# Page triage (see page_triage.py): every ARA door header shows a door ID
+ARA_PAGE_MARKERS = re.compile(ARA_DOOR_ID)
+
+# Area forms in the rest of an ARA door header
+ARA_BLOCK_AREA = re.compile(r'(Block [A-Z] - [\w-]+)\s+(.+)$')
+ARA_LEVEL_AREA = re.compile(r'((?:Level\s+\d+|\d+))\s+(.+)$')
+
+
+# ---------------------------------------------------------------------------
+# Supreme format (app_supreme.py)
+# ---------------------------------------------------------------------------
+
+SUPREME_HEADER_LINES = frozenset(['Code Description Finish', 'Code Description Product', 'Quantity Product'])
+
+SUPREME_LINES = LineClassifier([
+    # Area headers (e.g., "Area: Ground Floor")
+    ('area', r'Area:\s*(?P<area_name>.+)'),
+    # Door headers (e.g., "D0.01 Accessible WC Timber")
+    ('door', r'(?P<door_id>D\d+\.\d+)\s+(?P<door_desc>.+?)\s+'
+             r'(?P<door_type>Timber|Alum|INAL|Aluminium|Cavity Slider|Sliding\s+\w+)$'),
+    # Product lines - code, description, quantity, optional finish (SSS, SCP, ...)
+    ('product', r'(?P<code>[A-Z0-9\-/\.]+)\s+(?P<product_desc>.+?)\s+(?P<quantity>\d+)\s*(?P<finish>[A-Z]{2,})?$'),
+    # Anything else that starts with a code token can never be a note line
+    ('code_start', r'[A-Z0-9\-/\.]+\s+'),
+])
+
+# Page triage: door headers and Area headers, the lines that start state
+SUPREME_PAGE_MARKERS = re.compile(r'Area:|D\d+\.\d+')
+
+# Words that mark a free-text line under a door as a note
+SUPREME_NOTE_KEYWORDS = re.compile(r'(supplied|manufacturer|grab rail|mm|track|gear|lock)', re.IGNORECASE)
+
+
+# ---------------------------------------------------------------------------
+# "Doors with hardware" format (app.py)
+# ---------------------------------------------------------------------------
+
+DOORS_LINES = LineClassifier([
+    # Door headers (e.g., "D0.01 Accessible WC Timber")
+    ('door', r'(?P<door_id>D\d+\.\d+)\s+(?P<door_desc>.+?)\s+(?P<door_type>Timber|Alum|INAL)\s*$'),
+    # Product lines - code, quantity, description, finish
+    ('product', r'(?P<code>[A-Z0-9/-]+)\s+(?P<quantity>\d+)\s+(?P<product_desc>.+?)\s+(?P<finish>SSS|SCP|SIL|PF)\s*$'),
+])
+
+# Title of every schedule page
+DOORS_PAGE_KEYWORD = "Doors with hardware"
+
+# Door cell in the table-based extractor
+DOORS_DOOR_CELL = re.compile(r'D\d+\.\d+')
@@ -0,0 +1,267 @@
+"""
+Page Text Module
+Parallel, incremental per-page text extraction for large PDF schedules
+
+pdfplumber's page.extract_text() is the slowest step of every extractor.
+Pages are independent at this stage, so their text is extracted in a
+process pool and returned in page order for the (serial) parsing pass.
+The PDF can be a path or an in-memory buffer (see pdf_source.py).
+
+Suppliers reissue schedules as revisions B, C, D... with only a few pages
+changed. Each page is identified by a hash of its content streams and the
+resources they use (fonts, forms), which is cheap to compute without any
+layout analysis, and extracted texts are stored under that key (see
+extract_cache.get_page_texts). On re-upload only the changed pages are
+extracted. The parsers still run over every page in order, which is fast,
+so door state carried across page boundaries is rebuilt at the seams
+exactly as in a full pass.
+
+Given the markers of a format, cover and legend pages ahead of the
+schedule are triaged from their raw content streams and not extracted at
+all (see page_triage.py).
+
+Besides extract_text(), pages can be read by the 'chars' engine, which
+builds positioned lines from the page characters (see char_lines.py).
+
+Usage:
+    from page_text import iter_page_texts
+
+    for page_num, page_count, text in iter_page_texts("schedule.pdf"):
+        ...
+"""
+
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+from pdfminer.pdftypes import PDFObjRef, PDFStream
+from pdfminer.psparser import PSLiteral
+
+from char_lines import CHAR_LINES_VERSION, page_lines
+from extract_cache import get_page_texts, put_page_texts
+from instrumentation import stage
+from page_triage import leading_skip_pages
+from pdf_source import open_pdf, shareable_source
+
+# Bump whenever the text extraction settings change so stored page texts
+# are not reused
+PAGE_TEXT_VERSION = "text-1"
+
+# Page extraction engines: name -> (version, function of a pdfplumber Page)
+ENGINES = {
+    'text': (PAGE_TEXT_VERSION, lambda page: page.extract_text()),
+    'chars': (CHAR_LINES_VERSION, page_lines),
+}
+
+# Below this many pages the cost of starting workers outweighs the gain
+PARALLEL_MIN_PAGES = 16
+
+# Pages handed to a worker at a time - small enough to balance the load,
+# large enough that re-opening the PDF in the worker is negligible
+PAGES_PER_CHUNK = 8
+
+# Start method of the worker processes. The pool is created from threads
+# of a multi-threaded server (see extraction_jobs.py), and a forked worker
+# can deadlock on a lock another thread held at fork time, so workers are
+# started from a clean forkserver process instead
+POOL_START_METHOD = 'forkserver'
+
+# Keys that don't affect a page's text: back references, and stream
+# encodings (the decoded data is hashed)
+_UNHASHED_KEYS = {'Parent', 'P', 'Length', 'Filter', 'DecodeParms'}
+
+# The PDF a worker process extracts from, sent once when the worker starts
+# rather than with every chunk
+_worker_source = None
+
+
+def _init_worker(source):
+    global _worker_source
+    _worker_source = source
+
+
+def _extract_pages(page_nums, engine='text'):
+    """Extract the text of the given pages (runs in a worker process)"""
+    _, extract = ENGINES[engine]
+    with open_pdf(_worker_source) as pdf:
+        return [extract(pdf.pages[i]) for i in page_nums]
+
+
+def _feed(digest, obj, memo):
+    """Add a PDF object to a hash, independent of object numbering"""
+    if isinstance(obj, PDFObjRef):
+        # Shared objects (fonts, forms) are hashed once per document
+        key = memo.get(obj.objid)
+        if key is None:
+            memo[obj.objid] = b'cycle'
+            sub = hashlib.sha256()
+            _feed(sub, obj.resolve(), memo)
+            key = memo[obj.objid] = sub.digest()
+        digest.update(b'R' + key)
+    elif isinstance(obj, PDFStream):
+        data = obj.get_data()
+        digest.update(b'S')
+        _feed(digest, obj.attrs, memo)
+        digest.update(len(data).to_bytes(8, 'little') + data)
+    elif isinstance(obj, dict):
+        digest.update(b'D')
+        for name in sorted(obj, key=str):
+            if name not in _UNHASHED_KEYS:
+                digest.update(str(name).encode() + b'\0')
+                _feed(digest, obj[name], memo)
+        digest.update(b'd')
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b'L')
+        for item in obj:
+            _feed(digest, item, memo)
+        digest.update(b'l')
+    elif isinstance(obj, PSLiteral):
+        name = obj.name if isinstance(obj.name, bytes) else str(obj.name).encode()
+        digest.update(b'N' + name + b'\0')
+    elif isinstance(obj, bytes):
+        digest.update(b'B' + len(obj).to_bytes(8, 'little') + obj)
+    else:
+        digest.update(b'V' + repr(obj).encode() + b'\0')
+
+
+def page_key(page, memo=None, version=PAGE_TEXT_VERSION):
+    """Content key of a page: equal keys mean equal extracted text
+
+    Args:
+        page: pdfplumber Page
+        memo: Dict shared by the pages of one document, so shared fonts
+            are hashed once
+        version: Version of the extraction engine
+
+    Returns:
+        Hex digest string, or None if the page can't be hashed
+    """
+    page_obj = page.page_obj
+    digest = hashlib.sha256(f"{version}/{pdfplumber.__version__}".encode())
+    try:
+        _feed(digest, [page_obj.contents, page_obj.resources, page_obj.mediabox,
+                       page_obj.cropbox, page_obj.rotate], {} if memo is None else memo)
+    except Exception:
+        # A malformed page is just extracted every time
+        return None
+    return digest.hexdigest()
+
+
+def iter_page_texts(source, workers=None, markers=None, engine='text'):
+    """Yield the text of every page, in page order, as it becomes available
+
+    Args:
+        source: Path to the PDF file, or its contents as a bytes-like
+            object (bytes, memoryview, mmap)
+        workers: Number of worker processes. None uses one per CPU core,
+            1 forces a serial pass in the current process.
+        markers: Optional compiled regex of the format's page markers (see
+            page_triage.leading_skip_pages); pages before the first page
+            showing one are skipped without extracting their text
+        engine: 'text' for page.extract_text(), 'chars' for a list of
+            char_lines.CharLine per page
+
+    Pages whose text was stored by an earlier call (for this or another
+    revision of the PDF) are not extracted again; newly extracted texts
+    are stored.
+
+    Yields:
+        Tuples of (page_num, page_count, text); text is None for pages
+        without any (or skipped), and a list of CharLine for 'chars'
+    """
+    version, extract = ENGINES[engine]
+
+    with stage('pdf_open'):
+        pdf = open_pdf(source)
+        page_count = len(pdf.pages)
+
+    with pdf:
+        # Cover and legend pages have no text worth extracting
+        skipped = set()
+        if markers is not None:
+            with stage('triage') as timing:
+                skipped = leading_skip_pages(pdf.pages, markers)
+                timing.pages += len(skipped)
+
+        # Texts of pages unchanged since an earlier upload
+        with stage('page_lookup') as timing:
+            memo = {}
+            keys = [None if page_num in skipped else page_key(page, memo, version)
+                    for page_num, page in enumerate(pdf.pages)]
+            stored = get_page_texts(keys)
+            stored.update(dict.fromkeys(skipped))
+            timing.pages += len(stored) - len(skipped)
+        missing = [page_num for page_num in range(page_count) if page_num not in stored]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, max(1, len(missing) // PAGES_PER_CHUNK))
+
+        if workers <= 1 or len(missing) < PARALLEL_MIN_PAGES:
+            extracted = {}
+            try:
+                for page_num, page in enumerate(pdf.pages):
+                    if page_num in stored:
+                        text = stored[page_num]
+                    else:
+                        with stage('extract_text') as timing:
+                            text = extract(page)
+                            timing.pages += 1
+                        extracted[keys[page_num]] = text
+                    # Drop the page's cached layout objects before moving on
+                    page.close()
+                    yield page_num, page_count, text
+            finally:
+                _store(extracted)
+            return
+
+    chunks = [missing[start:start + PAGES_PER_CHUNK] for start in range(0, len(missing), PAGES_PER_CHUNK)]
+
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(POOL_START_METHOD),
+                               initializer=_init_worker, initargs=(shareable_source(source),))
+    extracted = {}
+    try:
+        futures = [pool.submit(_extract_pages, chunk, engine) for chunk in chunks]
+        # Collect in submission order so pages stay in document order
+        texts = dict(stored)
+        next_chunk = 0
+        for page_num in range(page_count):
+            while page_num not in texts:
+                # Wall time here is the wait for the workers; their CPU time
+                # is not part of this process's
+                with stage('extract_text') as timing:
+                    chunk_texts = futures[next_chunk].result()
+                    timing.pages += len(chunk_texts)
+                for chunk_page, text in zip(chunks[next_chunk], chunk_texts):
+                    texts[chunk_page] = text
+                    extracted[keys[chunk_page]] = text
+                next_chunk += 1
+            yield page_num, page_count, texts.pop(page_num)
+    finally:
+        # Don't wait for queued chunks if the consumer stopped early
+        pool.shutdown(cancel_futures=True)
+        _store(extracted)
+
+
+def _store(extracted):
+    extracted.pop(None, None)
+    if extracted:
+        with stage('page_store') as timing:
+            put_page_texts(extracted)
+            timing.pages += len(extracted)
+
+
+def extract_page_texts(source, workers=None, engine='text'):
+    """Extract the text of every page, in page order
+
+    Args:
+        source: PDF path or buffer (see iter_page_texts)
+        workers: Number of worker processes (see iter_page_texts)
+        engine: Extraction engine (see iter_page_texts)
+
+    Returns:
+        List with one entry per page (None for pages without text)
+    """
+    return [text for _, _, text in iter_page_texts(source, workers=workers, engine=engine)]
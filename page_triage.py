@@ -0,0 +1,181 @@
+"""
+Page Triage Module
+Cheap schedule / non-schedule classification of PDF pages
+
+page.extract_text() runs pdfminer's full layout analysis, and the "Doors
+with hardware" extractor ran it on every page only to look for its title,
+before running the table finder on the pages that have it. Cover, legend
+and summary pages paid for a layout that was thrown away.
+
+Triage reads the strings of a page's text-showing operators (Tj, TJ, ',
+") straight from its content streams, including form XObjects, without
+computing any glyph positions. When every font on the page maps bytes to
+characters through a standard encoding, those strings are the page's
+text, so a keyword that isn't in them can't be in the extracted text
+either and the page is skipped. Pages with composite, Type3 or remapped
+(ToUnicode, Differences) fonts can't be read this way and are left to
+the full extraction, as are pages that can't be parsed.
+
+Usage:
+    from page_triage import SKIP, classify_page
+
+    if classify_page(page, "Doors with hardware") == SKIP:
+        ...  # no layout needed
+"""
+
+import re
+from typing import NamedTuple
+
+from pdfminer.pdfinterp import PDFContentParser
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import PSEOF, PSKeyword, PSLiteral
+
+# Verdicts of classify_page()
+SCHEDULE, SKIP, UNKNOWN = 'schedule', 'skip', 'unknown'
+
+# Encodings that map printable ASCII bytes to the same characters
+_STANDARD_ENCODINGS = {'WinAnsiEncoding', 'MacRomanEncoding', 'StandardEncoding', 'PDFDocEncoding'}
+
+# Standard 14 fonts that use StandardEncoding when no encoding is given
+# (Symbol and ZapfDingbats have their own)
+_STANDARD_FONTS = re.compile(r'(?:[A-Z]{6}\+)?(?:Times|Helvetica|Courier|Arial)')
+
+_TEXT_OPERATORS = {b'Tj', b"'", b'"', b'TJ'}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class PageScan(NamedTuple):
+    """The strings a page shows, read from its content streams"""
+    strings: list   # str per text-showing operand, in stream order
+    readable: bool  # the strings are the page's text (all fonts standard-encoded)
+
+
+def _name(obj):
+    """Name of a PDF name object (or plain string)"""
+    obj = resolve1(obj)
+    if isinstance(obj, PSLiteral):
+        return obj.name.decode('latin-1') if isinstance(obj.name, bytes) else str(obj.name)
+    return obj.decode('latin-1') if isinstance(obj, bytes) else obj
+
+
+def _plain_font(font):
+    """Whether a font shows printable ASCII bytes as the same characters"""
+    font = resolve1(font)
+    if not isinstance(font, dict):
+        return False
+    if _name(font.get('Subtype')) not in ('Type1', 'MMType1', 'TrueType') or 'ToUnicode' in font:
+        return False
+    encoding = resolve1(font.get('Encoding'))
+    if isinstance(encoding, dict):
+        if 'Differences' in encoding:
+            return False
+        encoding = encoding.get('BaseEncoding')
+    if encoding is None:
+        return bool(_STANDARD_FONTS.match(_name(font.get('BaseFont')) or ''))
+    return _name(encoding) in _STANDARD_ENCODINGS
+
+
+def _scan_streams(streams, resources, strings, seen):
+    """Collect the shown strings of content streams; False if a font isn't plain"""
+    resources = resolve1(resources) or {}
+    readable = all(_plain_font(font) for font in (resolve1(resources.get('Font')) or {}).values())
+    xobjects = resolve1(resources.get('XObject')) or {}
+
+    parser = PDFContentParser(streams)
+    operands = []
+    while True:
+        try:
+            _, obj = parser.nextobject()
+        except PSEOF:
+            break
+        if not isinstance(obj, PSKeyword):
+            operands.append(obj)
+            continue
+        if obj.name in _TEXT_OPERATORS and operands:
+            shown = operands[-1]
+            for item in (shown if isinstance(shown, list) else [shown]):
+                if isinstance(item, bytes):
+                    strings.append(item.decode('latin-1'))
+        elif obj.name == b'Do' and operands:
+            # Form XObjects have their own content stream and resources
+            xobject = resolve1(xobjects.get(_name(operands[-1])))
+            if (isinstance(xobject, PDFStream) and _name(xobject.get('Subtype')) == 'Form'
+                    and id(xobject) not in seen):
+                seen.add(id(xobject))
+                form_resources = xobject.get('Resources', resources)
+                readable &= _scan_streams([xobject], form_resources, strings, seen)
+        operands.clear()
+    return readable
+
+
+def scan_page(page):
+    """Read the strings a page shows, without layout analysis
+
+    Args:
+        page: pdfplumber Page
+
+    Returns:
+        PageScan; readable is False if the page can't be triaged
+    """
+    page_obj = page.page_obj
+    strings = []
+    try:
+        readable = _scan_streams(page_obj.contents, page_obj.resources, strings, set())
+    except Exception:
+        # Malformed content is left to the full extraction
+        return PageScan([], False)
+    return PageScan(strings, readable)
+
+
+def _squeeze(text):
+    return _WHITESPACE.sub('', text)
+
+
+def classify_page(page, keyword):
+    """Triage a page by a keyword its extracted text must contain
+
+    Args:
+        page: pdfplumber Page
+        keyword: Text every schedule page contains, e.g. its title
+
+    Returns:
+        SCHEDULE if one string shows the keyword, SKIP if the page's text
+        can't contain it, else UNKNOWN (extract the text to find out)
+    """
+    scan = scan_page(page)
+    if not scan.readable:
+        return UNKNOWN
+    if any(keyword in string for string in scan.strings):
+        return SCHEDULE
+    # Layout may join or split strings and add spaces, so compare without
+    # whitespace
+    if _squeeze(keyword) not in _squeeze(''.join(scan.strings)):
+        return SKIP
+    return UNKNOWN
+
+
+def leading_skip_pages(pages, markers):
+    """Pages before the first schedule page, which a parser can skip
+
+    The first page is never skipped, since the parsers read the job
+    details from it. Pages after the first schedule page are always
+    parsed: they may continue a door from the page before.
+
+    Args:
+        pages: pdfplumber Pages in document order
+        markers: Compiled regex matching (whitespace removed) text every
+            line that starts a parser's state has, e.g. door numbers
+
+    Returns:
+        Set of page numbers to skip
+    """
+    skipped = set()
+    for page_num, page in enumerate(pages):
+        if page_num == 0:
+            continue
+        scan = scan_page(page)
+        if not scan.readable or markers.search(_squeeze(''.join(scan.strings))):
+            break
+        skipped.add(page_num)
+    return skipped
@@ -0,0 +1,139 @@
+"""
+PDF Source Module
+Open PDFs from paths or in-memory buffers, without temp files
+
+Uploads used to be written to a fixed temp_upload.pdf in the working
+directory and re-opened from there: a disk round trip per upload, and two
+sessions uploading at once overwrote each other's file mid-parse. The
+extractors now take the PDF as any of:
+
+    - a path, which is memory-mapped rather than read through a buffer
+    - a bytes-like object (bytes, memoryview, mmap, Streamlit's
+      uploaded_file.getbuffer()), read in place without a copy
+    - a binary file object, used as is
+
+Usage:
+    from pdf_source import open_pdf
+
+    with open_pdf(uploaded_file.getbuffer()) as pdf:
+        for page in pdf.pages:
+            ...
+"""
+
+import io
+import mmap
+import os
+
+import pdfplumber
+
+
+class BufferReader(io.RawIOBase):
+    """Read-only, seekable binary stream over a bytes-like object
+
+    Reads copy only the bytes asked for; the buffer itself is never copied.
+
+    Args:
+        buffer: Any object supporting the buffer protocol
+        owner: Optional object to close() along with the stream, e.g. the
+            mmap the buffer belongs to
+    """
+
+    def __init__(self, buffer, owner=None):
+        super().__init__()
+        self._view = memoryview(buffer).cast('B')
+        self._owner = owner
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self._pos = position
+        return position
+
+    def read(self, size=-1):
+        stop = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:stop].tobytes() if stop > self._pos else b''
+        self._pos = max(self._pos, stop)
+        return data
+
+    def readinto(self, target):
+        data = self.read(len(target))
+        target[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+            if self._owner is not None:
+                self._owner.close()
+        super().close()
+
+
+def _map_file(path):
+    """Memory-map a PDF file read-only"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # An empty file can't be mapped; let pdfplumber report it
+            return io.BytesIO()
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return BufferReader(mapping, owner=mapping)
+
+
+def open_pdf(source):
+    """Open a PDF with pdfplumber from a path, buffer or file object
+
+    Args:
+        source: Path to the PDF file, its contents as a bytes-like object
+            (bytes, memoryview, mmap), or a binary file object
+
+    Returns:
+        pdfplumber.PDF; closing it also releases the mapping or buffer
+    """
+    if hasattr(source, 'read'):
+        return pdfplumber.open(source)
+
+    stream = _map_file(source) if isinstance(source, (str, os.PathLike)) else BufferReader(source)
+    try:
+        pdf = pdfplumber.open(stream)
+    except Exception:
+        stream.close()
+        raise
+    # The stream is ours, so closing the PDF should close it too
+    pdf.stream_is_external = False
+    return pdf
+
+
+def shareable_source(source):
+    """The source in a form that can be sent to worker processes
+
+    Paths are passed as they are, each worker maps the file itself. Buffers
+    and file objects can't be shared across processes, so their contents
+    are sent as bytes (bytes objects are sent without another copy here).
+    """
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    if hasattr(source, 'read'):
+        position = source.tell()
+        source.seek(0)
+        data = source.read()
+        source.seek(position)
+        return data
+    with memoryview(source) as view:
+        return view.tobytes()
@@ -0,0 +1,232 @@
+"""
+Procurement Rollup Module
+One consolidated order across many extracted schedules
+
+The Product Quantity Summary covers a single schedule. A rollup takes any
+number of extracted jobs and totals every product over all of them, in the
+Product Summary sheet layout (Code, Description, ..., Total Quantity) with
+one quantity column per job before the total.
+
+The jobs' product lines are concatenated column-wise into one frame with a
+categorical Job column: the code and description categoricals are merged
+with union_categoricals (pd.concat would fall back to object columns when
+the jobs' categories differ), so no row is touched in Python. A single
+groupby on (Code, Product Description, Job) then gives every per-job total,
+unstacked into the job columns.
+
+Usage:
+    from procurement_rollup import build_rollup, rollup_datasets, rollup_workbook_bytes
+
+    rollup = build_rollup([df1, df2, df3])
+    rollup.products   # Code, Description, <one column per job>, Total Quantity
+    rollup.jobs       # Job, Job Name, Product Lines, Total Quantity
+
+    rollup = rollup_datasets(glob.glob("exports/*/*.arrow"))   # saved datasets
+    rollup = rollup_catalog(list_jobs())                        # jobs in the job catalog
+    data = rollup_workbook_bytes(rollup)
+
+    python procurement_rollup.py exports/*/*.arrow -o order.xlsx
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from instrumentation import stage
+from job_catalog import job_product_lines
+from job_dataset import dataset_filename, dataset_schema, load_dataset
+from records import CANONICAL_RENAMES, normalize_columns
+from xlsx_writer import workbook_bytes
+
+# Columns a rollup reads from each job
+ROLLUP_COLUMNS = ['Code', 'Product Description', 'Quantity']
+
+
+class ProcurementRollup(NamedTuple):
+    """Product totals over many jobs"""
+    products: pd.DataFrame  # Code, Description, one quantity column per job, Total Quantity
+    jobs: pd.DataFrame      # Job, Job Name, Product Lines, Total Quantity
+
+
+def job_labels(frames, fallbacks=None):
+    """Column label of every job: its job number, else the fallback name
+
+    Repeated labels get a " (2)", " (3)", ... suffix so every job keeps
+    its own column.
+
+    Args:
+        frames: Extracted DataFrames, job info in attrs
+        fallbacks: Optional names (e.g. file names) for jobs without a
+            job number, one per frame
+
+    Returns:
+        List of unique labels, one per frame
+    """
+    return _unique_labels([df.attrs.get('job_number') or (fallbacks[index] if fallbacks else None)
+                           for index, df in enumerate(frames)])
+
+
+def _unique_labels(names):
+    """Names made unique, with "Job N" for missing ones"""
+    labels = []
+    seen = {}
+    for index, name in enumerate(names):
+        label = name or f"Job {index + 1}"
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(label if seen[label] == 1 else f"{label} ({seen[label]})")
+    return labels
+
+
+def _categorical(values):
+    """A column as a Categorical, without copying one that already is"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.array
+    return pd.Categorical(values)
+
+
+def rollup_products(lines, job_names=None):
+    """Total the product lines of many jobs per product and per job
+
+    Args:
+        lines: DataFrame with a categorical Job column (its categories are
+            the jobs, in column order) and Code, Product Description and
+            Quantity columns
+        job_names: Optional job name per job label, for the jobs table
+
+    Returns:
+        ProcurementRollup
+    """
+    with stage('rollup') as timing:
+        timing.rows += len(lines)
+        jobs = list(lines['Job'].cat.categories)
+
+        # Lines without a code or description keep a product row of their
+        # own, so the per-job columns add up to the Jobs sheet's totals
+        totals = lines.groupby(['Code', 'Product Description', 'Job'], observed=True, dropna=False)['Quantity'].sum()
+        per_job = totals.unstack('Job', fill_value=0).reindex(columns=jobs, fill_value=0)
+        per_job.columns = jobs
+        per_job['Total Quantity'] = per_job.sum(axis=1)
+        products = per_job.reset_index().rename(columns={'Product Description': 'Description'})
+
+        job_totals = lines.groupby('Job', observed=False).agg(
+            **{'Product Lines': ('Quantity', 'size'), 'Total Quantity': ('Quantity', 'sum')}
+        ).reset_index()
+        job_totals.insert(1, 'Job Name', [(job_names or {}).get(job) for job in jobs])
+        job_totals['Job'] = job_totals['Job'].astype(object)
+
+    return ProcurementRollup(products, job_totals)
+
+
+def build_rollup(frames, labels=None):
+    """Roll up the products of many extracted jobs
+
+    Args:
+        frames: Extracted DataFrames from any of the parsers
+        labels: Optional column label per job, default job_labels(frames)
+
+    Returns:
+        ProcurementRollup
+    """
+    labels = labels or job_labels(frames)
+    # Jobs nothing was extracted from have no product columns to roll up
+    jobs = {label: df for label, df in zip(labels, frames) if not df.empty}
+    if not jobs:
+        return ProcurementRollup(pd.DataFrame(columns=['Code', 'Description', 'Total Quantity']),
+                                 pd.DataFrame(columns=['Job', 'Job Name', 'Product Lines', 'Total Quantity']))
+    job_names = {label: df.attrs.get('job_name') for label, df in jobs.items()}
+    frames = [normalize_columns(df) for df in jobs.values()]
+
+    with stage('rollup_concat') as timing:
+        sizes = [len(df) for df in frames]
+        timing.rows += sum(sizes)
+        lines = pd.DataFrame({
+            'Job': pd.Categorical.from_codes(np.repeat(np.arange(len(frames)), sizes), categories=list(jobs)),
+            'Code': union_categoricals([_categorical(df['Code']) for df in frames]),
+            'Product Description': union_categoricals([_categorical(df['Product Description']) for df in frames]),
+            'Quantity': pd.concat([df['Quantity'] for df in frames], ignore_index=True),
+        })
+    return rollup_products(lines, job_names)
+
+
+def load_rollup_frame(path):
+    """Load only the columns a rollup needs from a saved dataset (see job_dataset.py)"""
+    columns = [name for name in dataset_schema(path).names if CANONICAL_RENAMES.get(name, name) in ROLLUP_COLUMNS]
+    return load_dataset(path, columns=columns)
+
+
+def _dataset_name(path):
+    """Label of a saved dataset without a job number
+
+    Its file name, unless that is the generic one, in which case the
+    folder it is in (batch_extract.py names the folder after the PDF).
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == os.path.splitext(dataset_filename(None))[0]:
+        return os.path.basename(os.path.dirname(os.path.abspath(path))) or stem
+    return stem
+
+
+def rollup_datasets(paths):
+    """Roll up the products of saved datasets
+
+    Args:
+        paths: Saved datasets (.arrow or .parquet)
+
+    Returns:
+        ProcurementRollup; jobs without a job number are labelled by file
+        (or folder) name
+    """
+    frames = [load_rollup_frame(path) for path in paths]
+    return build_rollup(frames, job_labels(frames, [_dataset_name(path) for path in paths]))
+
+
+def rollup_catalog(jobs, path=None):
+    """Roll up the products of jobs saved in the job catalog
+
+    Args:
+        jobs: Rows of job_catalog.list_jobs() to roll up
+        path: Catalog file, default job_catalog.CATALOG_PATH
+
+    Returns:
+        ProcurementRollup; jobs without a job number are labelled by source
+        file
+    """
+    labels = _unique_labels([number if pd.notna(number) else source
+                             for number, source in zip(jobs['Job Number'], jobs['Source'])])
+    lines = job_product_lines(jobs['Job Key'], path=path)
+    lines.insert(0, 'Job', pd.Categorical(lines.pop('Job Key').map(dict(zip(jobs['Job Key'], labels))),
+                                          categories=labels))
+    lines['Quantity'] = lines['Quantity'].astype('Int64')
+    return rollup_products(lines, dict(zip(labels, jobs['Job Name'])))
+
+
+def rollup_workbook_bytes(rollup):
+    """Excel workbook of a rollup: Product Summary and Jobs sheets"""
+    return workbook_bytes({'Product Summary': rollup.products, 'Jobs': rollup.jobs})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consolidated product order across saved job datasets")
+    parser.add_argument('datasets', nargs='+', help="Saved datasets (.arrow or .parquet, see job_dataset.py)")
+    parser.add_argument('-o', '--output', default='procurement_rollup.xlsx',
+                        help="Output workbook (default: procurement_rollup.xlsx)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rollup = rollup_datasets(args.datasets)
+    with open(args.output, 'wb') as f:
+        f.write(rollup_workbook_bytes(rollup))
+
+    print(f"Rolled up {int(rollup.jobs['Product Lines'].sum())} product lines from {len(rollup.jobs)} job(s) "
+          f"into {len(rollup.products)} products -> {args.output} ({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Records Module
+Typed door and product records streamed by the extractors
+
+Each extractor has an iter_*_pages() generator that yields one PageRecords
+batch per PDF page as soon as that page is parsed. The DataFrame returned
+by the extract_* functions is built on top of that stream, column by
+column, so no list of per-row dicts is ever held in memory.
+
+In memory the records are kept normalized in a RecordStore: a doors table
+and a products table joined by an integer door key, with the text columns
+dictionary-encoded as categoricals. The wide frame every app works with is
+a view rebuilt from the two tables, in which each door attribute is just
+an array of category codes rather than a string per product row.
+
+Usage:
+    from records import records_to_dataframe, records_to_store, ARA_COLUMNS
+
+    for page in iter_ara_pages("schedule.pdf"):
+        for product in page.products:
+            print(product.door.door, product.code, product.quantity)
+
+    df = records_to_dataframe(iter_ara_pages("schedule.pdf"), ARA_COLUMNS)
+
+    store = records_to_store(iter_ara_pages("schedule.pdf"), ARA_COLUMNS)
+    store.doors        # one row per door, indexed by door key
+    store.products     # one row per product, with a door_key column
+"""
+
+from operator import attrgetter
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+
+class DoorRecord(NamedTuple):
+    """Door-level attributes from a door header line"""
+    door: str
+    area: str = ""
+    description: str = ""
+    rating: str = ""
+    handing: str = ""
+    door_type: str = ""
+
+
+class ProductRecord(NamedTuple):
+    """One product line, linked to the door it belongs to"""
+    door: DoorRecord
+    code: str
+    product_description: str
+    quantity: str
+    notes: str = ""
+    finish: str = ""
+
+
+class JobInfo(NamedTuple):
+    """Job number and name found in the schedule header"""
+    job_number: Optional[str]
+    job_name: Optional[str]
+
+
+class PageRecords(NamedTuple):
+    """Everything parsed from one PDF page"""
+    page_num: int
+    page_count: int
+    doors: list
+    products: list
+    job: Optional[JobInfo] = None
+
+
+# Column layouts of the wide DataFrame for each vendor format, mapping
+# column name -> ProductRecord attribute (dotted for door attributes)
+ARA_COLUMNS = {
+    'Door': 'door.door',
+    'Area': 'door.area',
+    'Description': 'door.description',
+    'Rating': 'door.rating',
+    'Handing': 'door.handing',
+    'Door Type': 'door.door_type',
+    'Notes': 'notes',
+    'Code': 'code',
+    'Product Description': 'product_description',
+    'Quantity': 'quantity',
+}
+
+SUPREME_COLUMNS = {
+    'Door': 'door.door',
+    'Area': 'door.area',
+    'Description': 'door.description',
+    'Door Type': 'door.door_type',
+    'Notes': 'notes',
+    'Code': 'code',
+    'Product Description': 'product_description',
+    'Quantity': 'quantity',
+    'Finish': 'finish',
+}
+
+DOORS_COLUMNS = {
+    'Door': 'door.door',
+    'Description': 'door.description',
+    'Dr type': 'door.door_type',
+    'Code': 'code',
+    'Quantity Product': 'quantity',
+    'Description Product': 'product_description',
+    'Finish': 'finish',
+}
+
+# app.py's column names -> the names used by the ARA and Supreme frames
+CANONICAL_RENAMES = {
+    'Dr type': 'Door Type',
+    'Quantity Product': 'Quantity',
+    'Description Product': 'Product Description',
+}
+
+
+def to_quantity(values):
+    """Convert quantity strings to a nullable integer column ('' becomes <NA>)"""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype('Int64')
+
+
+def normalize_columns(df):
+    """Return df with the ARA/Supreme column names, whatever parser made it"""
+    if any(name in df.columns for name in CANONICAL_RENAMES):
+        df = df.rename(columns=CANONICAL_RENAMES)
+    return df
+
+
+class RecordStore(NamedTuple):
+    """Normalized, dictionary-encoded form of an extracted schedule"""
+    doors: pd.DataFrame     # Door-level columns, one row per door key
+    products: pd.DataFrame  # door_key plus the product-level columns
+    columns: list           # Column order of the wide frame
+    job: Optional[JobInfo] = None
+
+    def to_wide(self):
+        """Build the wide one-row-per-product frame the apps work with
+
+        Door attributes are gathered through the door key, which for
+        categorical columns only copies the integer codes.
+
+        Returns:
+            DataFrame in the vendor's column layout, with job info in df.attrs
+        """
+        if self.products.empty:
+            return pd.DataFrame()
+
+        with stage('build_dataframe') as timing:
+            door_keys = self.products['door_key'].to_numpy()
+            data = {}
+            for name in self.columns:
+                if name in self.doors.columns:
+                    data[name] = self.doors[name].array.take(door_keys)
+                else:
+                    data[name] = self.products[name].array
+
+            df = pd.DataFrame(data)
+            timing.rows += len(df)
+        # Add job info as metadata
+        if self.job is not None:
+            df.attrs['job_number'] = self.job.job_number
+            df.attrs['job_name'] = self.job.job_name
+        return df
+
+
+def records_to_store(pages, columns, progress=None):
+    """Build a RecordStore from a stream of PageRecords
+
+    Args:
+        pages: Iterable of PageRecords, e.g. from iter_ara_pages()
+        columns: Column layout, e.g. ARA_COLUMNS
+        progress: Optional callback progress(pages_done, page_count),
+            called after each page
+
+    Returns:
+        RecordStore with categorical text columns and an integer (Int64)
+        quantity column
+    """
+    door_getters = {name: attrgetter(path.split('.', 1)[1])
+                    for name, path in columns.items() if path.startswith('door.')}
+    product_getters = {name: attrgetter(path)
+                       for name, path in columns.items() if not path.startswith('door.')}
+
+    # Each distinct door record gets the next integer key
+    door_index = {}
+    door_records = []
+    door_keys = []
+    product_data = {name: [] for name in product_getters}
+    job = None
+
+    pages = iter(pages)
+    try:
+        while True:
+            # Pulling the next page runs the extractor's generator: its own time
+            # is the regex parsing, text extraction is timed as a nested stage
+            with stage('parse') as timing:
+                page = next(pages, None)
+                if page is not None:
+                    timing.pages += 1
+                    timing.rows += len(page.products)
+            if page is None:
+                break
+
+            with stage('build_dataframe'):
+                if job is None and page.job is not None:
+                    job = page.job
+
+                for product in page.products:
+                    key = door_index.get(product.door)
+                    if key is None:
+                        key = door_index[product.door] = len(door_records)
+                        door_records.append(product.door)
+                    door_keys.append(key)
+
+                for name, getter in product_getters.items():
+                    product_data[name].extend(map(getter, page.products))
+
+            if progress:
+                progress(page.page_num + 1, page.page_count)
+    finally:
+        # A generator left suspended (the progress callback raised, e.g. for a
+        # cancelled job) would keep its PDF open and its page workers busy
+        # until it is garbage collected
+        close = getattr(pages, 'close', None)
+        if close is not None:
+            close()
+
+    with stage('build_dataframe'):
+        doors = pd.DataFrame({name: pd.Categorical(list(map(getter, door_records)))
+                              for name, getter in door_getters.items()})
+
+        products = {'door_key': np.array(door_keys, dtype=np.int32)}
+        for name, values in product_data.items():
+            if columns[name] == 'quantity':
+                # Quantities become integers once here, so summaries can use
+                # the built-in aggregators
+                products[name] = to_quantity(values).array
+            else:
+                products[name] = pd.Categorical(values)
+
+        return RecordStore(doors, pd.DataFrame(products), list(columns), job)
+
+
+def records_to_dataframe(pages, columns, progress=None):
+    """Build the wide DataFrame from a stream of PageRecords
+
+    Args:
+        pages: Iterable of PageRecords, e.g. from iter_ara_pages()
+        columns: Column layout, e.g. ARA_COLUMNS
+        progress: Optional callback progress(pages_done, page_count),
+            called after each page
+
+    Returns:
+        DataFrame with one row per product, categorical text columns, an
+        integer (Int64) quantity column and job info in df.attrs
+    """
+    return records_to_store(pages, columns, progress=progress).to_wide()
@@ -0,0 +1,175 @@
+"""
+Schedule Diff Module
+What changed between two revisions of a schedule
+
+Product lines of both revisions are keyed by (Door, Code): door and code
+values are looked up in hash indexes shared by the two revisions and
+packed into one integer key per line, lines repeating a code on a door
+are summed, and the revisions are joined on that key. Quantity deltas are
+computed on whole columns, so tens of thousands of rows diff in a
+fraction of a second.
+
+The change sheets use the Doors and DoorHardware layouts of the Export
+tab (see exports.py) with a leading Change column; the hardware sheet
+also carries the previous quantity and the change.
+
+Usage:
+    from schedule_diff import diff_schedules, diff_workbook_bytes
+
+    diff = diff_schedules(old_df, new_df)
+    diff.summary     # change counts
+    diff.doors       # Doors layout, one row per added/removed/changed door
+    diff.hardware    # DoorHardware layout, one row per changed product line
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from exports import DOOR_ATTRIBUTES, build_doors_export, build_hardware_export
+from extract_cache import dataset_cached, dataset_key
+from instrumentation import stage
+from records import normalize_columns
+from xlsx_writer import workbook_bytes
+
+# Values of the Change column
+ADDED = 'Added'
+REMOVED = 'Removed'
+CHANGED = 'Changed'                      # door attributes differ
+HARDWARE_CHANGED = 'Hardware changed'    # same door, different product lines
+QUANTITY_CHANGED = 'Quantity changed'
+
+# Product-level columns kept from the first line of a (Door, Code) group
+_LINE_COLUMNS = ['Product Description', 'Finish', 'Notes']
+
+
+class ScheduleDiff(NamedTuple):
+    """Changes from an old to a new revision of a schedule"""
+    summary: pd.DataFrame   # Change, Doors, Product Lines counts
+    doors: pd.DataFrame     # Change + Doors export layout
+    hardware: pd.DataFrame  # Change + DoorHardware export layout + PreviousQuantity, QuantityChange
+
+
+def _values(column):
+    """Values of a column as a NumPy object array, '' for missing values"""
+    return column.to_numpy(dtype=object, na_value='')
+
+
+def _contains(values, pool):
+    """Which values are in pool, by hash lookup"""
+    return pd.Index(pool).unique().get_indexer(values) >= 0
+
+
+def _product_lines(frame, line_keys):
+    """One row per (Door, Code) key: summed quantity, the first line's other columns"""
+    columns = ['Door', *[name for name in DOOR_ATTRIBUTES if name in frame.columns],
+               'Code', *[name for name in _LINE_COLUMNS if name in frame.columns]]
+    quantity = frame['Quantity'] if 'Quantity' in frame.columns else 0
+    lines = frame[columns].assign(Quantity=quantity, _key=line_keys)
+    grouped = lines.groupby('_key', sort=False)
+    result = grouped[columns].first()
+    result['Quantity'] = grouped['Quantity'].sum()
+    return result
+
+
+def _changed_doors(old_doors, new_doors):
+    """Door numbers present in both revisions whose Doors export rows differ"""
+    common = old_doors.merge(new_doors, on='DoorNumber', suffixes=('_old', '_new'))
+    changed = np.zeros(len(common), dtype=bool)
+    for name in old_doors.columns.drop('DoorNumber'):
+        changed |= _values(common[f'{name}_old']) != _values(common[f'{name}_new'])
+    return _values(common['DoorNumber'])[changed]
+
+
+def diff_schedules(old_df, new_df):
+    """Compare two extracted schedules
+
+    Args:
+        old_df: Extracted DataFrame of the earlier revision
+        new_df: Extracted DataFrame of the later revision (any parser)
+
+    Returns:
+        ScheduleDiff
+    """
+    with stage('diff') as timing:
+        timing.rows += len(old_df) + len(new_df)
+        old = normalize_columns(old_df)
+        new = normalize_columns(new_df)
+
+        # Shared hash indexes of door numbers and codes, so a (Door, Code)
+        # pair gets the same integer key in both revisions
+        doors = pd.Index(np.concatenate([_values(old['Door']), _values(new['Door'])])).unique()
+        codes = pd.Index(np.concatenate([_values(old['Code']), _values(new['Code'])])).unique()
+
+        def line_keys(frame):
+            door_codes = doors.get_indexer(_values(frame['Door'])).astype(np.int64)
+            return door_codes * len(codes) + codes.get_indexer(_values(frame['Code']))
+
+        old_lines = _product_lines(old, line_keys(old))
+        new_lines = _product_lines(new, line_keys(new))
+
+        # Hash join of the two revisions' lines
+        joined = pd.concat({'old': old_lines['Quantity'].astype('Int64'),
+                            'new': new_lines['Quantity'].astype('Int64')}, axis=1)
+        in_old = joined.index.isin(old_lines.index)
+        in_new = joined.index.isin(new_lines.index)
+        old_quantity = joined['old'].fillna(0)
+        new_quantity = joined['new'].fillna(0)
+        delta = new_quantity - old_quantity
+
+        change = np.select([~in_old, ~in_new, (delta != 0).to_numpy(dtype=bool)],
+                           [ADDED, REMOVED, QUANTITY_CHANGED], default='')
+        changed = joined.index[change != '']
+        change = pd.Series(change, index=joined.index)[changed]
+
+        # Changed lines in the DoorHardware layout, described by the revision
+        # they appear in (the old one for removed lines)
+        removed = change.index[change == REMOVED]
+        kept = change.index[change != REMOVED]
+        lines = pd.concat([new_lines.loc[kept], old_lines.loc[removed]])
+        hardware = build_hardware_export(lines.reset_index(drop=True))
+        hardware.insert(0, 'Change', change.loc[lines.index].to_numpy())
+        hardware['ProductQuantity'] = new_quantity.loc[lines.index].to_numpy()
+        hardware['PreviousQuantity'] = old_quantity.loc[lines.index].to_numpy()
+        hardware['QuantityChange'] = delta.loc[lines.index].to_numpy()
+        hardware = hardware.iloc[np.argsort(_values(hardware['DoorNumber']).astype(str), kind='stable')]
+
+        # Doors added, removed, with different attributes, or with changed lines
+        old_doors = build_doors_export(old)
+        new_doors = build_doors_export(new)
+        old_numbers = _values(old_doors['DoorNumber'])
+        new_numbers = _values(new_doors['DoorNumber'])
+        door_rows = pd.concat([new_doors, old_doors[~_contains(old_numbers, new_numbers)]], ignore_index=True)
+        numbers = _values(door_rows['DoorNumber'])
+        door_changes = np.select(
+            [~_contains(numbers, old_numbers), ~_contains(numbers, new_numbers),
+             _contains(numbers, _changed_doors(old_doors, new_doors)),
+             _contains(numbers, _values(hardware['DoorNumber']))],
+            [ADDED, REMOVED, CHANGED, HARDWARE_CHANGED], default='')
+        door_sheet = door_rows[door_changes != '']
+        door_sheet.insert(0, 'Change', door_changes[door_changes != ''])
+        door_sheet = door_sheet.iloc[np.argsort(_values(door_sheet['DoorNumber']).astype(str), kind='stable')]
+
+        kinds = [ADDED, REMOVED, CHANGED, HARDWARE_CHANGED, QUANTITY_CHANGED]
+        summary = pd.DataFrame({
+            'Change': kinds,
+            'Doors': door_sheet['Change'].value_counts().reindex(kinds, fill_value=0).to_numpy(),
+            'Product Lines': hardware['Change'].value_counts().reindex(kinds, fill_value=0).to_numpy(),
+        })
+
+        return ScheduleDiff(summary, door_sheet.reset_index(drop=True), hardware.reset_index(drop=True))
+
+
+def get_diff(old_df, new_df):
+    """Return the ScheduleDiff of two datasets, computed once per pair"""
+    return dataset_cached(new_df, f'diff:{dataset_key(old_df)}', lambda: diff_schedules(old_df, new_df))
+
+
+def diff_workbook_bytes(diff):
+    """The change sheets as an Excel workbook (Summary, Doors, Door Hardware)"""
+    return workbook_bytes({
+        'Summary': diff.summary,
+        'Doors': diff.doors,
+        'Door Hardware': diff.hardware,
+    })
@@ -0,0 +1,242 @@
+"""
+Search Index Module
+Token and trigram index behind the Product Search tab
+
+The tab used to run str.contains() over every row on each keystroke, with
+the search term interpreted as a regex (so input like "100X75(" raised an
+error). The index is built once per dataset over the distinct
+(Code, Product Description) pairs, which are far fewer than the rows, and
+a query is answered in tiers:
+
+    1. exact product code
+    2. code prefix
+    3. every query word is a prefix of a word in the code or description
+    4. literal substring of the code or description (the old behaviour,
+       but without regex interpretation)
+    5. every query word is within one or two typos of a word in the code
+       or description (words with digits must match exactly or by prefix)
+
+Products are ranked by the best tier they reach, and the rows of each
+product follow in schedule order.
+
+Usage:
+    from search_index import get_search_index
+
+    search_results = get_search_index(df).search("lever set")
+"""
+
+import re
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from extract_cache import dataset_cached
+from instrumentation import stage
+from records import normalize_columns
+
+# Score of each match tier, higher ranks first
+EXACT_CODE, CODE_PREFIX, WORD_PREFIX, LITERAL, FUZZY = 5, 4, 3, 2, 1
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+# Separates code and description in the literal-search text; it can't be
+# typed into the search box, so a match never spans the two
+_FIELD_SEPARATOR = '\n'
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _max_typos(word):
+    """Typos tolerated in a query word
+
+    None for short words, so 'sc' doesn't match everything, and none for
+    words with digits, where VSR1 and VSR0 are different products.
+    """
+    if len(word) < 4 or not word.isalpha():
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def _edit_distance(a, b, limit):
+    """Levenshtein distance of a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Search index over the products of a DataFrame
+
+    Args:
+        df: Extracted DataFrame. It must not be modified afterwards.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        with stage('search_index') as timing:
+            timing.rows += len(df)
+            self._index(normalize_columns(df))
+
+    def _index(self, frame):
+        # One entry per distinct product, with the row positions holding it
+        product_ids = frame.groupby(['Code', 'Product Description'], observed=True, sort=False,
+                                    dropna=False).ngroup().to_numpy()
+        order = np.argsort(product_ids, kind='stable')
+        counts = np.bincount(product_ids[product_ids >= 0])
+        bounds = np.concatenate(([0], np.cumsum(counts))) + np.count_nonzero(product_ids < 0)
+        self._rows = [order[bounds[i]:bounds[i + 1]] for i in range(len(counts))]
+
+        codes = frame['Code'].to_numpy(dtype=object)
+        descriptions = frame['Product Description'].to_numpy(dtype=object)
+        first_rows = [rows[0] for rows in self._rows]
+        # Missing values come out as None or NaN, depending on the column type
+        self._codes = [str(codes[row]).lower() if not pd.isna(codes[row]) else '' for row in first_rows]
+        self._texts = [
+            code + _FIELD_SEPARATOR + (str(descriptions[row]).lower() if not pd.isna(descriptions[row]) else '')
+            for code, row in zip(self._codes, first_rows)
+        ]
+
+        # Exact codes, word -> products, trigram -> products (literal
+        # search) and trigram -> words (typo-tolerant search)
+        self._code_products = {}
+        self._word_products = {}
+        self._text_trigrams = {}
+        word_trigrams = {}
+        for product, (code, text) in enumerate(zip(self._codes, self._texts)):
+            self._code_products.setdefault(code, set()).add(product)
+            for word in set(_words(text)):
+                self._word_products.setdefault(word, set()).add(product)
+            for gram in _trigrams(text):
+                self._text_trigrams.setdefault(gram, set()).add(product)
+
+        for word in self._word_products:
+            for gram in _trigrams(f' {word} '):
+                word_trigrams.setdefault(gram, set()).add(word)
+        self._word_trigrams = word_trigrams
+        self._vocabulary = sorted(self._word_products)
+        self._sorted_codes = sorted(self._code_products)
+
+    def _prefixed(self, keys, prefix):
+        """Keys of a sorted list starting with prefix"""
+        start = bisect_left(keys, prefix)
+        stop = bisect_left(keys, prefix + '\uffff')
+        return keys[start:stop]
+
+    def _literal(self, query):
+        if len(query) < 3:
+            candidates = range(len(self._texts))
+        else:
+            grams = sorted((self._text_trigrams.get(gram, set()) for gram in _trigrams(query)), key=len)
+            candidates = set.intersection(*grams) if grams else set()
+        return {product for product in candidates if query in self._texts[product]}
+
+    def _word_prefix(self, words):
+        matches = None
+        for word in words:
+            products = set()
+            for match in self._prefixed(self._vocabulary, word):
+                products |= self._word_products[match]
+            matches = products if matches is None else matches & products
+            if not matches:
+                break
+        return matches or set()
+
+    def _fuzzy(self, words):
+        """Products matching every word within its typo budget, with the total typo count"""
+        matches = None
+        for word in words:
+            limit = _max_typos(word)
+            if limit == 0:
+                products = {product: 0 for match in self._prefixed(self._vocabulary, word)
+                            for product in self._word_products[match]}
+            else:
+                # Each typo breaks at most three of the padded word's trigrams
+                grams = _trigrams(f' {word} ')
+                shared = {}
+                for gram in grams:
+                    for candidate in self._word_trigrams.get(gram, ()):
+                        shared[candidate] = shared.get(candidate, 0) + 1
+                products = {}
+                for candidate, count in shared.items():
+                    if count < len(grams) - 3 * limit:
+                        continue
+                    distance = _edit_distance(word, candidate, limit)
+                    if distance <= limit:
+                        for product in self._word_products[candidate]:
+                            products[product] = min(products.get(product, distance), distance)
+
+            if matches is None:
+                matches = products
+            else:
+                matches = {product: typos + products[product]
+                           for product, typos in matches.items() if product in products}
+            if not matches:
+                break
+        return matches or {}
+
+    def rank(self, query):
+        """Products matching a query, best first
+
+        Args:
+            query: Search text, taken literally
+
+        Returns:
+            List of product numbers
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        words = _words(query)
+
+        scores = {}
+
+        def add(products, score):
+            for product in products:
+                if scores.get(product, (0,))[0] < score[0]:
+                    scores[product] = score
+
+        add(self._code_products.get(query, ()), (EXACT_CODE, 0))
+        for code in self._prefixed(self._sorted_codes, query):
+            add(self._code_products[code], (CODE_PREFIX, 0))
+        if words:
+            add(self._word_prefix(words), (WORD_PREFIX, 0))
+        add(self._literal(query), (LITERAL, 0))
+        if words:
+            for product, typos in self._fuzzy(words).items():
+                add((product,), (FUZZY, -typos))
+
+        return sorted(scores, key=lambda product: (-scores[product][0], -scores[product][1], self._codes[product]))
+
+    def positions(self, query):
+        """Row positions of the products matching a query, best product first"""
+        ranked = self.rank(query)
+        if not ranked:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([self._rows[product] for product in ranked])
+
+    def search(self, query):
+        """Rows of the DataFrame matching a query, best product first"""
+        with stage('search') as timing:
+            rows = self.positions(query)
+            timing.rows += len(rows)
+            return self.df.take(rows)
+
+
+def get_search_index(df):
+    """Return the SearchIndex of df, built once per dataset"""
+    return dataset_cached(df, 'search_index', lambda: SearchIndex(df))
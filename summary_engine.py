@@ -0,0 +1,105 @@
+"""
+Summary Engine Module
+Vectorized rollups shared by the Summary tab, Items by Door Type tab and
+the Excel export
+
+Quantity is an integer column from parse time, so every rollup uses
+pandas' built-in aggregators instead of a Python lambda per group. The
+row-level data is scanned once into a (Door Type, Code, Product
+Description[, Finish]) product rollup and a distinct door table; every
+other rollup is derived from those much smaller frames. Results are memoized
+per dataset, so reruns and the Excel export reuse them.
+
+Usage:
+    from summary_engine import get_summary
+
+    summary = get_summary(df)
+    st.dataframe(summary.products)
+"""
+
+from typing import NamedTuple, Optional
+
+import pandas as pd
+
+from extract_cache import dataset_cached
+from instrumentation import stage
+from records import normalize_columns
+
+
+class ScheduleSummary(NamedTuple):
+    """All rollups of one extracted schedule, each in group-key order"""
+    doors_by_area: pd.DataFrame       # Area, Door Count
+    doors_by_type: pd.DataFrame       # Door Type, Door Count
+    doors_by_room: pd.DataFrame       # Room Type, Door Count
+    products: pd.DataFrame            # Code, Description, Total Quantity
+    products_per_door: pd.DataFrame   # Door, Product Count
+    area_by_type: pd.DataFrame        # Area, Door Type, Door Count
+    door_type_products: pd.DataFrame  # Door Type, Code, Product Description, Total Quantity, Doors Using Item
+    products_by_finish: Optional[pd.DataFrame]  # Code, Description, Finish, Total Quantity
+
+
+def build_summary(df):
+    """Compute every rollup of an extracted schedule in one pass
+
+    Args:
+        df: Extracted DataFrame (integer Quantity column)
+
+    Returns:
+        ScheduleSummary
+    """
+    with stage('summary') as timing:
+        timing.rows += len(df)
+        return _build_summary(normalize_columns(df))
+
+
+def _build_summary(df):
+    door_columns = [name for name in ['Door', 'Area', 'Door Type', 'Description'] if name in df.columns]
+
+    # Product level: one scan of the rows, at the finest grain any rollup
+    # needs. Missing keys are kept here so coarser totals still include them.
+    product_keys = ['Door Type', 'Code', 'Product Description']
+    if 'Finish' in df.columns:
+        product_keys.append('Finish')
+    fine = df.groupby(product_keys, dropna=False, observed=True).agg(
+        **{'Total Quantity': ('Quantity', 'sum'), 'Doors Using Item': ('Door', 'count')}
+    ).reset_index()
+
+    type_products = fine.groupby(['Door Type', 'Code', 'Product Description'], observed=True)[
+        ['Total Quantity', 'Doors Using Item']].sum().reset_index()
+
+    products = fine.groupby(['Code', 'Product Description'], observed=True)['Total Quantity'].sum().reset_index()
+    products.columns = ['Code', 'Description', 'Total Quantity']
+
+    products_by_finish = None
+    if 'Finish' in df.columns:
+        products_by_finish = fine.groupby(['Code', 'Product Description', 'Finish'], observed=True)['Total Quantity'].sum().reset_index()
+        products_by_finish.columns = ['Code', 'Description', 'Finish', 'Total Quantity']
+
+    # Door level: distinct door/attribute combinations, a fraction of the rows
+    doors = df[door_columns].drop_duplicates()
+
+    def door_count(keys, names):
+        if not all(key in doors.columns for key in keys):
+            return pd.DataFrame(columns=names)
+        summary = doors.groupby(keys, observed=True)['Door'].nunique().reset_index()
+        summary.columns = names
+        return summary
+
+    products_per_door = df.groupby('Door', observed=True).size().reset_index()
+    products_per_door.columns = ['Door', 'Product Count']
+
+    return ScheduleSummary(
+        doors_by_area=door_count(['Area'], ['Area', 'Door Count']),
+        doors_by_type=door_count(['Door Type'], ['Door Type', 'Door Count']),
+        doors_by_room=door_count(['Description'], ['Room Type', 'Door Count']),
+        products=products,
+        products_per_door=products_per_door,
+        area_by_type=door_count(['Area', 'Door Type'], ['Area', 'Door Type', 'Door Count']),
+        door_type_products=type_products,
+        products_by_finish=products_by_finish,
+    )
+
+
+def get_summary(df):
+    """Return the ScheduleSummary of df, computed once per dataset"""
+    return dataset_cached(df, 'summary', lambda: build_summary(df))
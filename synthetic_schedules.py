@@ -0,0 +1,302 @@
+"""
+Synthetic Schedules
+Generator of synthetic ARA, Supreme and "Doors with hardware" schedule PDFs
+
+Renders schedules of any size (10 to 50,000+ doors) with the door-ID,
+area and product-line shapes the parsers in app_ara.py, app_supreme.py and
+app.py expect, so extraction speed can be measured well beyond the one
+real sample in the repo. The PDFs are written directly (Helvetica text and
+ruled table lines, no extra dependencies) and are deterministic for a given
+seed.
+
+Usage:
+    python synthetic_schedules.py ara 5000 -o ara_5000.pdf
+    python synthetic_schedules.py doors 200 --seed 7
+
+    from synthetic_schedules import generate_schedule
+
+    schedule = generate_schedule('supreme', 1000)
+    print(schedule.pages, schedule.doors, schedule.products)
+"""
+
+import argparse
+import random
+import sys
+import zlib
+from typing import NamedTuple
+
+VENDORS = ('ara', 'supreme', 'doors')
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+FONT_SIZE = 8
+LINE_HEIGHT = 12
+TOP, BOTTOM, LEFT = 800, 40, 30
+
+# Products per door are drawn from this range
+PRODUCTS_PER_DOOR = (2, 6)
+
+# (code, description, finish) - codes can't be mistaken for door IDs
+CATALOG = [
+    ('LW10075LLSSS', 'LW HINGE 100MMX75MMX2.5MM LIFT OFF - LH MOQ=30', 'SSS'),
+    ('LW10075RLSSS', 'LW HINGE 100MMX75MMX2.5MM LIFT OFF - RH MOQ=30', 'SSS'),
+    ('VSR1/L5SC', 'LW VSR1-L5 Accession Lvr Rnd Rose Passage set SC', 'SC'),
+    ('VSR2/L5SC', 'LW VSR2-L5 Accession Lvr Rnd Rose Privacy set SC', 'SC'),
+    ('2616DASSS', 'LW 2616DA Cam Action Door Closer 1-6 SSS', 'SSS'),
+    ('724SIL', 'Lockwood 724 Size 2-4 Closer Adj. BC SIL', 'SIL'),
+    ('DS50', 'ARA DS50 Floor Mounted Door Stop 1 Piece SC', 'SC'),
+    ('DS85SSS', 'ARA DS85 Wall Mounted Door Stop 85mm SSS', 'SSS'),
+    ('MS2604PT', 'dormakaba MS2604PT Privacy latch', 'SSS'),
+    ('L9D11S', 'Legge L9D11S Escape Mortice Deadlock', 'SCP'),
+    ('6649RH/30SSS', 'dormakaba Noosa Lever Ext Ind Emr', 'SSS'),
+    ('EF200', 'Door closer with backcheck', 'SIL'),
+    ('CS100', 'Cavity slider track gear kit', 'PF'),
+    ('B3000/180/SS', 'Briton 3000 180mm Door Selector', 'SSS'),
+    ('L142X600SSS', 'LW 142X600 Entrance Handles BTB 600mm SSS', 'SSS'),
+    ('PLS', '24 PRO Precision PLS 24 PRO Magnetic Disc set 24mm SS', 'SSS'),
+]
+
+ROOMS = ['Apartment Entry', 'Bathroom', 'Bedroom', 'Ensuite', 'Laundry', 'Wardrobe',
+         'Office', 'Store', 'Classroom', 'Accessible WC', 'Circulation', 'Stairs']
+
+ARA_DOOR_TYPES = ['Timber', 'Aluminium', 'Alum-Ext', 'Cavity Slider', 'INAL']
+SUPREME_DOOR_TYPES = ['Timber', 'Alum', 'INAL', 'Aluminium', 'Cavity Slider']
+DOORS_DOOR_TYPES = ['Timber', 'Alum', 'INAL']
+
+# Column edges of the "Doors with hardware" table: code, qty, description, finish
+DOORS_TABLE_COLUMNS = [LEFT, 120, 200, 490, 565]
+
+
+class SyntheticSchedule(NamedTuple):
+    """A generated schedule and the counts a correct parser should extract"""
+    pdf: bytes
+    vendor: str
+    pages: int
+    doors: int
+    products: int
+
+
+class _Page:
+    """Text lines and ruled lines of one page"""
+
+    def __init__(self):
+        self.texts = []   # (x, y, text)
+        self.rules = []   # (x1, y1, x2, y2)
+        self.y = TOP
+
+    def room_for(self, lines):
+        return self.y - lines * LINE_HEIGHT >= BOTTOM
+
+    def line(self, text, x=LEFT):
+        self.texts.append((x, self.y, text))
+        self.y -= LINE_HEIGHT
+
+
+def _pdf_string(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)').encode('latin-1')
+
+
+def _render_pdf(pages):
+    """Serialize pages into a minimal PDF with one Helvetica font"""
+    objects = [None, None]  # 1: catalog, 2: page tree
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    font = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    page_ids = []
+    for page in pages:
+        ops = [b'0.5 w']
+        for x1, y1, x2, y2 in page.rules:
+            ops.append(b'%d %d m %d %d l S' % (x1, y1, x2, y2))
+        ops.append(b'BT /F1 %d Tf' % FONT_SIZE)
+        for x, y, text in page.texts:
+            ops.append(b'1 0 0 1 %d %d Tm (%s) Tj' % (x, y, _pdf_string(text)))
+        ops.append(b'ET')
+
+        stream = zlib.compress(b'\n'.join(ops))
+        contents = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+        page_ids.append(add(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> '
+            b'/Contents %d 0 R >>' % (PAGE_WIDTH, PAGE_HEIGHT, font, contents)
+        ))
+
+    objects[0] = b'<< /Type /Catalog /Pages 2 0 R >>'
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _products(rng):
+    """Random (code, description, finish, quantity) lines for one door"""
+    count = rng.randint(*PRODUCTS_PER_DOOR)
+    return [item + (rng.randint(1, 4),) for item in rng.sample(CATALOG, count)]
+
+
+def _text_pages(blocks, header_lines):
+    """Lay out blocks of lines top to bottom, keeping each block on one page
+
+    Args:
+        blocks: Lists of lines, one per door (or section header)
+        header_lines: Lines at the top of the first page only
+    """
+    pages = [_Page()]
+    for line in header_lines:
+        pages[-1].line(line)
+    for block in blocks:
+        if not pages[-1].room_for(len(block)):
+            pages.append(_Page())
+        for line in block:
+            pages[-1].line(line)
+    return pages
+
+
+def _ara_pages(door_count, rng):
+    blocks = []
+    products = 0
+    for n in range(door_count):
+        # Cycle through the three ARA door ID / area shapes
+        shape = n % 3
+        if shape == 0:
+            area = f'{n // 40 + 1:03d}'
+            door_id = f'{n // 40 + 1:03d}.D{n % 40 + 1:03d}A'
+        elif shape == 1:
+            block = 'CDE'[n % 3]
+            area = f'Block {block} - 2B-T{n % 12 + 1:02d}-S'
+            door_id = f'{n % 20 + 1}.{block}.{"EI"[n % 2]}D-{n:02d}'
+        else:
+            area = f'Level {n // 100:02d}'
+            door_id = f'D{n:03d}{"ABCD"[n % 4]}'
+
+        block_lines = []
+        if shape == 1 and n % 30 == 1:
+            block_lines.append(area)
+        block_lines.append(f'{door_id} {area} {rng.choice(ROOMS)} {rng.choice(ARA_DOOR_TYPES)}')
+        if n % 25 == 0:
+            block_lines.append('Notes: Hardware to suit fire rated door')
+        for code, description, _, quantity in _products(rng):
+            block_lines.append(f'{code} {description} {quantity}')
+            products += 1
+        blocks.append(block_lines)
+
+    header = [
+        'T012345.1: Synthetic Project - Stage 1',
+        'Door Area Description Rating Handing Door Type',
+        'Code Description Product',
+    ]
+    return _text_pages(blocks, header), products
+
+
+def _supreme_pages(door_count, rng):
+    blocks = []
+    products = 0
+    for n in range(door_count):
+        level = n // 50
+        block_lines = []
+        if n % 50 == 0:
+            block_lines.append(f'Area: Level {level}')
+        block_lines.append(f'D{level}.{n % 50 + 1:02d} {rng.choice(ROOMS)} {rng.choice(SUPREME_DOOR_TYPES)}')
+        block_lines.append('Code Description Finish')
+        if n % 20 == 0:
+            block_lines.append('Grab rail supplied by others')
+        for code, description, finish, quantity in _products(rng):
+            block_lines.append(f'{code} {description} {quantity} {finish}')
+            products += 1
+        blocks.append(block_lines)
+
+    header = ['SLH2410025: Synthetic School Block D', 'Hardware Schedule']
+    return _text_pages(blocks, header), products
+
+
+def _doors_pages(door_count, rng):
+    """One ruled table per page under a "Doors with hardware" title"""
+    pages = []
+    products = 0
+    page = None
+
+    def table_row(cells):
+        left, right = DOORS_TABLE_COLUMNS[0], DOORS_TABLE_COLUMNS[-1]
+        top = page.y + LINE_HEIGHT - 3
+        bottom = top - LINE_HEIGHT
+        page.rules.append((left, bottom, right, bottom))
+        for x in DOORS_TABLE_COLUMNS:
+            page.rules.append((x, bottom, x, top))
+        for x, text in zip(DOORS_TABLE_COLUMNS, cells):
+            if text:
+                page.texts.append((x + 3, page.y, text))
+        page.y -= LINE_HEIGHT
+
+    for n in range(door_count):
+        rows = [(f'D{n // 100}.{n % 100 + 1:02d}', rng.choice(ROOMS[:9]), rng.choice(DOORS_DOOR_TYPES), '')]
+        for code, description, finish, quantity in _products(rng):
+            rows.append((code, str(quantity), description, finish))
+            products += 1
+
+        if page is None or not page.room_for(len(rows)):
+            page = _Page()
+            pages.append(page)
+            page.line('Doors with hardware')
+            page.y -= LINE_HEIGHT // 2
+            # Top border of the table
+            top = page.y + LINE_HEIGHT - 3
+            page.rules.append((DOORS_TABLE_COLUMNS[0], top, DOORS_TABLE_COLUMNS[-1], top))
+
+        for row in rows:
+            table_row(row)
+
+    return pages, products
+
+
+def generate_schedule(vendor, doors, seed=0):
+    """Render a synthetic schedule PDF
+
+    Args:
+        vendor: 'ara', 'supreme' or 'doors'
+        doors: Number of doors
+        seed: Random seed; the same arguments always give the same PDF
+
+    Returns:
+        SyntheticSchedule with the PDF bytes and expected counts
+    """
+    builders = {'ara': _ara_pages, 'supreme': _supreme_pages, 'doors': _doors_pages}
+    if vendor not in builders:
+        raise ValueError(f"Unknown vendor format: {vendor}")
+
+    rng = random.Random(f'{vendor}-{doors}-{seed}')
+    pages, products = builders[vendor](doors, rng)
+    return SyntheticSchedule(_render_pdf(pages), vendor, len(pages), doors, products)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic hardware schedule PDF")
+    parser.add_argument('vendor', choices=VENDORS, help="Schedule format")
+    parser.add_argument('doors', type=int, help="Number of doors")
+    parser.add_argument('-o', '--output', default=None,
+                        help="Output PDF path (default: synthetic_<vendor>_<doors>.pdf)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    schedule = generate_schedule(args.vendor, args.doors, seed=args.seed)
+    output = args.output or f"synthetic_{args.vendor}_{args.doors}.pdf"
+    with open(output, 'wb') as f:
+        f.write(schedule.pdf)
+
+    print(f"Wrote {output}: {schedule.pages} pages, {schedule.doors} doors, {schedule.products} products")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
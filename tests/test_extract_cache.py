@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extract_cache import dataset_key
+
+
+def schedule(job_number, job_name):
+    df = pd.DataFrame({'Door': ['D1'], 'Code': ['8492-MSB'], 'Quantity': [2]})
+    df.attrs.update(job_number=job_number, job_name=job_name)
+    return df
+
+
+def test_same_rows_of_different_jobs_get_different_keys():
+    assert dataset_key(schedule('T1', 'North')) != dataset_key(schedule('T2', 'North'))
+    assert dataset_key(schedule('T1', 'North')) != dataset_key(schedule('T1', 'South'))
+
+
+def test_same_job_gets_the_same_key():
+    assert dataset_key(schedule('T1', 'North')) == dataset_key(schedule('T1', 'North'))
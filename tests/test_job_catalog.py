@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_catalog import find_products, ingest_job, list_jobs, product_usage
+
+
+def doors_schedule(quantity):
+    # Doors-format schedules carry no job number
+    return pd.DataFrame({'Door': ['D1', 'D2'], 'Code': ['8492-MSB', 'LW10075'],
+                         'Product Description': ['Lever', 'Hinge'], 'Quantity': [quantity, 4]})
+
+
+def test_job_without_number_is_replaced_by_a_revision_of_the_same_file(tmp_path):
+    path = tmp_path / 'catalog.sqlite'
+    ingest_job(doors_schedule(1), vendor='doors', source='plan.pdf', path=path)
+    ingest_job(doors_schedule(3), vendor='doors', source='plan.pdf', path=path)
+
+    assert len(list_jobs(path=path)) == 1
+    usage = product_usage(path=path, code='8492-MSB')
+    assert usage['Total Quantity'].tolist() == [3]
+
+
+def test_jobs_without_number_are_identified_by_source(tmp_path):
+    path = tmp_path / 'catalog.sqlite'
+    ingest_job(doors_schedule(1), vendor='doors', source='plan.pdf', path=path)
+    ingest_job(doors_schedule(2), vendor='doors', source='other.pdf', path=path)
+
+    assert product_usage(path=path, code='8492-MSB')['Job Number'].tolist() == ['other.pdf', 'plan.pdf']
+    assert find_products(path=path, code='8492-msb')['Job Number'].tolist() == ['other.pdf', 'plan.pdf']
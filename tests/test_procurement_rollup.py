@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from procurement_rollup import build_rollup
+
+
+def schedule(job_number, codes, descriptions, quantities):
+    df = pd.DataFrame({'Code': codes, 'Product Description': descriptions,
+                       'Quantity': pd.array(quantities, dtype='Int64')})
+    df.attrs['job_number'] = job_number
+    return df
+
+
+def test_lines_without_code_or_description_are_rolled_up():
+    rollup = build_rollup([
+        schedule('J1', ['8492-MSB', None, 'LW10075'], ['Lever', 'Hinge', None], [3, 5, 2]),
+        schedule('J2', ['8492-MSB', None], ['Lever', 'Hinge'], [1, 4]),
+    ])
+
+    assert rollup.products['Total Quantity'].sum() == 15
+    assert rollup.products[['J1', 'J2']].sum().tolist() == rollup.jobs['Total Quantity'].tolist() == [10, 5]
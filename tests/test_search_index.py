@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+
+
+def test_missing_code_and_description_are_not_indexed_as_nan():
+    df = pd.DataFrame({
+        'Door': ['D1', 'D2', 'D3'],
+        'Code': pd.Categorical(['8492-MSB', None, 'LW10075']),
+        'Product Description': pd.Categorical(['Lever', 'Hinge', None]),
+        'Quantity': [1, 2, 3],
+    })
+
+    assert SearchIndex(df).search('nan').empty
+    assert SearchIndex(df).search('hinge')['Door'].tolist() == ['D2']
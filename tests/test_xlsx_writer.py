@@ -0,0 +1,39 @@
+import io
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from xlsx_writer import workbook_bytes
+
+
+def sheet_xml(data, sheet=1):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return archive.read(f'xl/worksheets/sheet{sheet}.xml').decode()
+
+
+def test_nullable_integer_missing_values_are_empty_cells():
+    frame = pd.DataFrame({'Quantity': pd.array([1, None, 3], dtype='Int64')})
+    xml = sheet_xml(workbook_bytes({'Sheet': frame}))
+    assert '<row><c><v>1</v></c></row><row><c/></row><row><c><v>3</v></c></row>' in xml
+
+
+def test_float_nan_and_infinite_values_are_empty_cells():
+    frame = pd.DataFrame({'Value': [1.5, np.nan, np.inf]})
+    xml = sheet_xml(workbook_bytes({'Sheet': frame}))
+    assert '<row><c><v>1.5</v></c></row><row><c/></row><row><c/></row>' in xml
+
+
+def test_missing_quantity_in_schedule_export():
+    frame = pd.DataFrame({
+        'Door': pd.Categorical(['D1', 'D2']),
+        'Code': pd.Categorical(['A', 'B']),
+        'Quantity': pd.array([2, None], dtype='Int64'),
+    })
+    xml = sheet_xml(workbook_bytes({'Door Hardware': frame}))
+    assert '<c><v>2</v></c>' in xml
+    assert 'nan' not in xml.lower()
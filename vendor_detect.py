@@ -0,0 +1,185 @@
+"""
+Vendor Detect Module
+Automatic schedule-format detection and routing to the matching parser
+
+Only the first couple of pages are read, so the format is known before
+committing to a full parse with the wrong extractor.
+
+Usage:
+    from vendor_detect import detect_vendor, extract_schedule
+
+    detection = detect_vendor("schedule.pdf")
+    print(detection.vendor, detection.confidence)
+
+    vendor, df = extract_schedule("schedule.pdf")
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+from instrumentation import stage
+from line_classifier import ARA_LINES, SUPREME_LINES, DOORS_LINES, ARA_HEADER_LINES
+
+# Bump whenever the detection rules change so cached results are not reused
+DETECTOR_VERSION = "detect-1.0"
+
+# Pages read when detecting the vendor format
+DETECT_PAGES = 2
+
+# Detections below this confidence are treated as unknown when routing
+MIN_CONFIDENCE = 0.6
+
+# Score at which the evidence for a format counts as conclusive
+CONCLUSIVE_SCORE = 10.0
+
+VENDOR_NAMES = {
+    'ara': "ARA",
+    'supreme': "Supreme",
+    'doors': "Doors with hardware",
+}
+
+VENDOR_APPS = {
+    'ara': "ARA Hardware Schedule Extractor (app_ara.py)",
+    'supreme': "Supreme Hardware Schedule Extractor (app_supreme.py)",
+    'doors': "Door Hardware Schedule Extractor (app.py)",
+}
+
+_SUPREME_JOB_LINE = re.compile(r'^[A-Z]{2,}[0-9]+\s*:\s*\S')
+
+
+class Detection(NamedTuple):
+    """Result of detect_vendor()"""
+    vendor: Optional[str]
+    confidence: float
+    scores: dict
+
+
+def score_lines(lines):
+    """Score how strongly a set of text lines matches each vendor format
+
+    Args:
+        lines: Stripped text lines from the start of a schedule
+
+    Returns:
+        Dict of vendor -> score
+    """
+    scores = {vendor: 0.0 for vendor in VENDOR_NAMES}
+
+    for line in lines:
+        if not line:
+            continue
+
+        # The "Doors with hardware" section marker is decisive on its own
+        if "Doors with hardware" in line:
+            scores['doors'] += CONCLUSIVE_SCORE
+
+        # ARA column headers and door IDs like 8.C.ED-02 or 001.D001A
+        if line in ARA_HEADER_LINES:
+            scores['ara'] += 3.0
+        elif ARA_LINES.classify(line)[0] == 'door':
+            scores['ara'] += 2.0
+
+        # Supreme "Area:" headers, "SLH2410025: Name" job lines, D0.01 doors
+        supreme_kind = SUPREME_LINES.classify(line)[0]
+        if supreme_kind == 'area':
+            scores['supreme'] += 3.0
+        elif supreme_kind == 'door':
+            scores['supreme'] += 1.0
+        if _SUPREME_JOB_LINE.match(line):
+            scores['supreme'] += 2.0
+
+        # Doors with hardware product lines: CODE QTY Description FINISH
+        if DOORS_LINES.classify(line)[0] == 'product':
+            scores['doors'] += 1.0
+
+    return scores
+
+
+def detect_vendor_from_text(text):
+    """Detect the vendor format from already extracted text
+
+    Returns:
+        Detection with the best matching vendor (None if nothing matched),
+        a confidence between 0 and 1, and the per-vendor scores
+    """
+    scores = score_lines([line.strip() for line in text.split('\n')])
+
+    total = sum(scores.values())
+    if total == 0:
+        return Detection(None, 0.0, scores)
+
+    vendor = max(scores, key=scores.get)
+    # Confidence combines how clearly the winner beats the others with how
+    # much evidence there is for it at all
+    share = scores[vendor] / total
+    strength = min(1.0, scores[vendor] / CONCLUSIVE_SCORE)
+    return Detection(vendor, round(share * strength, 3), scores)
+
+
+def detect_vendor(pdf, max_pages=DETECT_PAGES):
+    """Detect the vendor format of a schedule from its first pages
+
+    Args:
+        pdf: Path to the PDF file, its contents as a bytes-like object, or
+            a binary file-like object
+        max_pages: Number of pages to read
+
+    Returns:
+        Detection (see detect_vendor_from_text)
+    """
+    # pdfplumber is loaded by the first detection, not by the apps' landing page
+    from pdf_source import open_pdf
+
+    with stage('detect') as timing:
+        with open_pdf(pdf) as doc:
+            pages = doc.pages[:max_pages]
+            text = '\n'.join(page.extract_text() or '' for page in pages)
+        timing.pages += len(pages)
+        return detect_vendor_from_text(text)
+
+
+def schedule_extractor(vendor):
+    """The extractor of a vendor format
+
+    Returns:
+        Tuple of (extract, parser_version); extract is called as
+        extract(pdf, progress=None, **kwargs)
+    """
+    # Imported here so only the parser that is needed gets loaded
+    if vendor == 'ara':
+        from app_ara import PARSER_VERSION, extract_ara_hardware_data_v2
+        return extract_ara_hardware_data_v2, PARSER_VERSION
+    if vendor == 'supreme':
+        from app_supreme import PARSER_VERSION, extract_supreme_hardware_data
+        return extract_supreme_hardware_data, PARSER_VERSION
+    if vendor == 'doors':
+        from app import PARSER_VERSION, extract_door_hardware_data_v2
+        return extract_door_hardware_data_v2, PARSER_VERSION
+    raise ValueError(f"Unknown vendor format: {vendor}")
+
+
+def extract_schedule(pdf, vendor=None, **kwargs):
+    """Extract a schedule with the parser that matches its format
+
+    Args:
+        pdf: Path to the PDF file, or its contents as a bytes-like object
+        vendor: 'ara', 'supreme' or 'doors' to skip detection
+        **kwargs: Passed to the extractor (workers, progress, engine)
+
+    Returns:
+        Tuple of (vendor, DataFrame). The DataFrame is empty and vendor is
+        None when the format can't be detected with enough confidence.
+    """
+    if vendor is None:
+        detection = detect_vendor(pdf)
+        if detection.confidence < MIN_CONFIDENCE:
+            import pandas as pd
+            return None, pd.DataFrame()
+        vendor = detection.vendor
+
+    extract, _ = schedule_extractor(vendor)
+    if vendor == 'doors':
+        # Table detection runs in process, on pdfplumber's own layout
+        kwargs.pop('workers', None)
+        kwargs.pop('engine', None)
+    return vendor, extract(pdf, **kwargs)